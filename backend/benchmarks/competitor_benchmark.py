@@ -0,0 +1,67 @@
+"""Benchmark the TF-IDF competes_with batch build and single-profile re-scoring
+
+Run from backend/:  python -m benchmarks.competitor_benchmark [--sizes 1000 10000 100000]
+
+Profiles are synthetic: each draws most of its words from one of many small
+topic vocabularies (startups in the same niche) and the rest from a Zipf
+distributed background vocabulary, so every startup has a handful of real
+text competitors and the common words have to be weighted away.
+"""
+import argparse
+import itertools
+import random
+import time
+
+from memory.memory import MemoryGraph
+
+VOCABULARY = [f"term{i}" for i in range(30000)]
+BACKGROUND = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(VOCABULARY))))
+TOPIC_SIZE = 40
+TOPIC_SHARE = 0.6  # Share of a profile's words drawn from its topic
+
+
+def synthetic_profiles(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    topics = [rng.sample(VOCABULARY[200:], TOPIC_SIZE) for _ in range(count // 20 + 1)]
+
+    def text(topic, words):
+        return " ".join(rng.choice(topic) if rng.random() < TOPIC_SHARE
+                        else rng.choices(VOCABULARY, cum_weights=BACKGROUND)[0] for _ in range(words))
+
+    for i in range(count):
+        topic = rng.choice(topics)
+        yield {
+            "startup_id": f"STARTUP_{i:06d}",
+            "problem_statement": text(topic, 30),
+            "solution_description": text(topic, 30),
+            "target_market": text(topic, 10),
+        }
+
+
+def run(count: int, rescored: int):
+    graph = MemoryGraph()
+    for profile in synthetic_profiles(count):
+        graph.add_entity(profile["startup_id"], "startup", profile)
+    print(f"\n{count:,} startups")
+
+    started = time.perf_counter()
+    edges = graph.build_competitor_relationships()
+    elapsed = time.perf_counter() - started
+    print(f"  batch build:  {elapsed:8.3f}s  {edges:,} competes_with edges")
+
+    startup_ids = [graph.store.ids[node] for node in sorted(graph.store.type_members["startup"])][:rescored]
+    started = time.perf_counter()
+    for startup_id in startup_ids:
+        graph.refresh_startup_competitors(startup_id)
+    elapsed = time.perf_counter() - started
+    print(f"  re-score:     {elapsed / max(len(startup_ids), 1) * 1000:8.3f}ms per profile "
+          f"({len(startup_ids)} profiles)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--rescored", type=int, default=100)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.rescored)
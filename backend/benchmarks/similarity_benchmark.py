@@ -0,0 +1,93 @@
+"""Benchmark the blocked similarity build against the original pairwise loop
+
+Run from backend/:  python -m benchmarks.similarity_benchmark [--sizes 1000 10000 100000]
+
+The legacy nested loop is only timed up to --legacy-max startups (it is
+quadratic). Above --emit-max the vectorized engine counts similar pairs
+without adding them to a graph, since a realistic 100k dataset produces
+hundreds of millions of similar_to edges.
+"""
+import argparse
+import random
+import time
+
+from memory.memory import MemoryGraph
+from memory.similarity import SIMILARITY_THRESHOLD
+
+INDUSTRIES = [f"Industry {i}" for i in range(25)]
+STAGES = ["Idea", "MVP", "Early Revenue", "Growth", "Scale", None]
+FUNDING_STAGES = ["Bootstrapped", "Pre-seed", "Seed", "Series A", "Series B", None]
+CITIES = [f"City {i}" for i in range(80)] + [None]
+
+
+def synthetic_startups(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(count):
+        revenue = 0 if rng.random() < 0.35 else round(rng.lognormvariate(9, 1.5), -2)
+        yield {
+            "startup_id": f"STARTUP_{i:06d}",
+            "industry_sector": rng.choice(INDUSTRIES),
+            "stage": rng.choice(STAGES),
+            "funding_stage": rng.choice(FUNDING_STAGES),
+            "location_city": rng.choice(CITIES),
+            "monthly_revenue": revenue,
+        }
+
+
+def build_graph(count: int) -> MemoryGraph:
+    graph = MemoryGraph()
+    for startup in synthetic_startups(count):
+        graph.add_entity(startup["startup_id"], "startup", startup)
+    return graph
+
+
+def legacy_pairs(graph: MemoryGraph):
+    """The original O(n^2) loop from _build_similarity_relationships"""
+    startups = [graph.store.ids[node] for node in graph.store.type_members["startup"]]
+    pairs = []
+    for i, startup1 in enumerate(startups):
+        for startup2 in startups[i + 1:]:
+            score = graph._calculate_startup_similarity(startup1, startup2)
+            if score > SIMILARITY_THRESHOLD:
+                pairs.append((startup1, startup2, score))
+    return pairs
+
+
+def run(count: int, legacy_max: int, emit_max: int):
+    graph = build_graph(count)
+    print(f"\n{count:,} startups")
+
+    if count <= emit_max:
+        started = time.perf_counter()
+        graph._build_similarity_relationships()
+        elapsed = time.perf_counter() - started
+        edges = graph.store.edge_count
+        print(f"  vectorized build: {elapsed:8.3f}s  {edges:,} similar_to edges"
+              f"  ({graph.store.memory_bytes() / 1e6:.1f} MB edge storage)")
+    else:
+        store = graph.store
+        startups = list(store.type_members["startup"])
+        started = time.perf_counter()
+        graph.similarity.load(startups, [store.records[node].properties for node in startups])
+        edges = sum(len(scores) for _, _, scores in graph.similarity.iter_similar_pairs(startups))
+        elapsed = time.perf_counter() - started
+        print(f"  vectorized score: {elapsed:8.3f}s  {edges:,} similar pairs (not emitted)")
+
+    if count <= legacy_max:
+        started = time.perf_counter()
+        expected = legacy_pairs(graph)
+        legacy_elapsed = time.perf_counter() - started
+        actual = [(r["source"], r["target"], r["weight"]) for r in graph.relationships]
+        status = "identical" if actual == expected else "MISMATCH"
+        print(f"  legacy loop:      {legacy_elapsed:8.3f}s  {len(expected):,} edges ({status}),"
+              f" {legacy_elapsed / elapsed:.0f}x slower")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--legacy-max", type=int, default=1000)
+    parser.add_argument("--emit-max", type=int, default=10000)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.legacy_max, args.emit_max)
@@ -4,7 +4,12 @@ load_dotenv()
 import os
 from database.DatabaseManager import DatabaseManager
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any
+from collections import deque, defaultdict, Counter
+import math
+import re
+import threading
+import time
 import uuid
 import json
 from dataclasses import dataclass
@@ -13,6 +18,16 @@ from dataclasses import dataclass
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 
+# BM25 parameters for get_relevant_history
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, dropping short words"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if len(token) > 2]
+
 @dataclass
 class ConversationRecord:
     session_id: str
@@ -27,17 +42,98 @@ class ConversationRecord:
 class ConversationMemory:
     """Enhanced conversation memory management for AI agents"""
     
-    def __init__(self,session_id: str = None):
-        self.history = []
-        self.context_window = 15  # Increased for better context
-        self.db_manager = DatabaseManager(SUPABASE_URL,SUPABASE_KEY)
+    def __init__(self, session_id: str = None, db_manager: DatabaseManager = None, context_window: int = 15):
+        self.context_window = context_window  # Increased for better context
+        self.history = deque(maxlen=self.context_window)  # Ring buffer, oldest exchange drops off
+        self._exchanges = {}  # exchange id -> exchange, for O(1) dedupe and lookup
+        self._approx_bytes = 0
+        # Incremental BM25 index over query + response of each held exchange
+        self._term_freqs = {}  # exchange id -> Counter of term frequencies
+        self._doc_lengths = {}  # exchange id -> number of terms
+        self._sequence = {}  # exchange id -> insertion order, for the recency boost
+        self._postings = defaultdict(set)  # term -> exchange ids containing it
+        self._total_terms = 0
+        self._next_sequence = 0
+        self._lock = threading.RLock()
+        self.db_manager = db_manager or DatabaseManager(SUPABASE_URL,SUPABASE_KEY)
         self.session_id = session_id or self._generate_session_id()
         self.current_startup_id = None
+        self.last_accessed = time.monotonic()
         self.conversation_metadata = {
             "started_at": datetime.now().isoformat(),
             "total_exchanges": 0,
             "startup_focused": False
         }
+
+    @property
+    def approx_bytes(self) -> int:
+        """Rough size of the in-memory history, used for memory budgeting"""
+        return self._approx_bytes
+
+    def _exchange_size(self, exchange: Dict[str, Any]) -> int:
+        """Approximate footprint of one exchange (text payload plus dict overhead)"""
+        return 512 + sum(len(value) for value in exchange.values() if isinstance(value, str))
+
+    def _append_exchange(self, exchange: Dict[str, Any]):
+        """Append to the ring buffer, keeping id set and size accounting in sync. Caller holds the lock"""
+        if len(self.history) == self.history.maxlen:
+            self._evict_exchange(self.history[0])
+        self.history.append(exchange)
+        self._exchanges[exchange["id"]] = exchange
+        self._approx_bytes += self._exchange_size(exchange)
+        self._index_exchange(exchange)
+
+    def _evict_exchange(self, exchange: Dict[str, Any]):
+        """Drop bookkeeping for an exchange about to fall off the ring buffer"""
+        self._exchanges.pop(exchange["id"], None)
+        self._approx_bytes -= self._exchange_size(exchange)
+        self._unindex_exchange(exchange["id"])
+
+    def _index_exchange(self, exchange: Dict[str, Any]):
+        """Tokenize an exchange once and add it to the inverted index"""
+        exchange_id = exchange["id"]
+        term_freqs = Counter(tokenize(f"{exchange['query']} {exchange['response']}"))
+        self._term_freqs[exchange_id] = term_freqs
+        self._doc_lengths[exchange_id] = sum(term_freqs.values())
+        self._sequence[exchange_id] = self._next_sequence
+        self._next_sequence += 1
+        self._total_terms += self._doc_lengths[exchange_id]
+        for term in term_freqs:
+            self._postings[term].add(exchange_id)
+
+    def _unindex_exchange(self, exchange_id: str):
+        """Remove an exchange's terms from the inverted index"""
+        term_freqs = self._term_freqs.pop(exchange_id, None)
+        if term_freqs is None:
+            return
+        self._total_terms -= self._doc_lengths.pop(exchange_id, 0)
+        self._sequence.pop(exchange_id, None)
+        for term in term_freqs:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.discard(exchange_id)
+                if not postings:
+                    del self._postings[term]
+
+    def _reset_buffer(self):
+        """Empty the ring buffer and all derived indexes. Caller holds the lock"""
+        self.history.clear()
+        self._exchanges.clear()
+        self._approx_bytes = 0
+        self._term_freqs.clear()
+        self._doc_lengths.clear()
+        self._sequence.clear()
+        self._postings.clear()
+        self._total_terms = 0
+
+    def _snapshot(self) -> List[Dict[str, Any]]:
+        """Copy of the history that is safe to iterate while other requests append"""
+        with self._lock:
+            return list(self.history)
+
+    def touch(self):
+        """Mark the session as recently used"""
+        self.last_accessed = time.monotonic()
     
     def _generate_session_id(self) -> str:
         """Generate unique session ID"""
@@ -79,15 +175,13 @@ class ConversationMemory:
                 "session_id": self.session_id
             }
             
-            self.history.append(exchange)
-            self.conversation_metadata["total_exchanges"] += 1
-            
-            # Maintain sliding window
-            if len(self.history) > self.context_window:
-                self.history = self.history[-self.context_window:]
+            with self._lock:
+                self._append_exchange(exchange)
+                self.conversation_metadata["total_exchanges"] += 1
+                self.touch()
             
-            # Save to database if available
-            if self.db_manager and self.db_manager.is_connected():
+            # Persist via the write-behind queue (batched off the request thread, spooled if the DB is down)
+            if self.db_manager:
                 conversation_record = ConversationRecord(
                     session_id=self.session_id,
                     user_query=query,
@@ -99,11 +193,8 @@ class ConversationMemory:
                     agent_type=agent_type
                 )
                 
-                success = self.db_manager.save_conversation_with_context(conversation_record)
-                if success:
-                    print(f" Conversation saved to database")
-                else:
-                    print(" Failed to save conversation to database")
+                if not self.db_manager.queue_conversation(conversation_record):
+                    print(" Failed to queue conversation for database")
             
             return True
             
@@ -113,10 +204,11 @@ class ConversationMemory:
     
     def get_context_string(self, max_exchanges: int = 5, include_metadata: bool = True) -> str:
         """Get formatted conversation history for AI context"""
-        if not self.history:
+        recent_history = self._snapshot()[-max_exchanges:]
+
+        if not recent_history:
             return "No previous conversation history."
         
-        recent_history = self.history[-max_exchanges:]
         context_parts = []
         
         # Add metadata if requested
@@ -143,7 +235,7 @@ class ConversationMemory:
         
         # Filter history for specific startup
         startup_history = [
-            exchange for exchange in self.history 
+            exchange for exchange in self._snapshot() 
             if exchange.get('startup_id') == target_startup
         ]
         
@@ -167,48 +259,49 @@ class ConversationMemory:
                            current_query: str, 
                            max_results: int = 3,
                            min_relevance: float = 0.1) -> List[Dict]:
-        """Enhanced relevance matching with better scoring"""
-        if not self.history:
+        """BM25 relevance over the session's exchanges, only scoring exchanges that share a query term"""
+        query_terms = set(tokenize(current_query))
+        if not query_terms:
             return []
         
-        query_words = set(current_query.lower().split())
-        query_words = {word for word in query_words if len(word) > 2}  # Filter short words
-        
-        if not query_words:
-            return []
-        
-        relevant_exchanges = []
-        
-        for exchange in self.history:
-            # Combine query and response for matching
-            exchange_text = f"{exchange['query']} {exchange['response']}"
-            exchange_words = set(exchange_text.lower().split())
-            exchange_words = {word for word in exchange_words if len(word) > 2}
-            
-            if not exchange_words:
-                continue
+        with self._lock:
+            total_docs = len(self._term_freqs)
+            if not total_docs:
+                return []
+            avg_length = (self._total_terms / total_docs) or 1.0
+            recent_cutoff = self._next_sequence - 5
             
-            # Calculate relevance scores
-            common_words = query_words.intersection(exchange_words)
+            scores = defaultdict(float)
+            matched_terms = defaultdict(list)
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                doc_freq = len(postings)
+                idf = math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+                for exchange_id in postings:
+                    term_freq = self._term_freqs[exchange_id][term]
+                    length_norm = 1 - BM25_B + BM25_B * self._doc_lengths[exchange_id] / avg_length
+                    scores[exchange_id] += idf * term_freq * (BM25_K1 + 1) / (term_freq + BM25_K1 * length_norm)
+                    matched_terms[exchange_id].append(term)
             
-            if common_words:
-                # Multiple scoring factors
-                word_overlap = len(common_words) / len(query_words)
-                text_similarity = len(common_words) / len(exchange_words.union(query_words))
+            relevant_exchanges = []
+            for exchange_id, score in scores.items():
+                exchange = self._exchanges[exchange_id]
                 
                 # Boost score if same startup context
                 startup_boost = 1.5 if (exchange.get('startup_id') == self.current_startup_id and self.current_startup_id) else 1.0
                 
                 # Recent conversations get slight boost
-                time_boost = 1.2 if self.history.index(exchange) >= len(self.history) - 5 else 1.0
+                time_boost = 1.2 if self._sequence[exchange_id] >= recent_cutoff else 1.0
                 
-                relevance_score = (word_overlap * 0.6 + text_similarity * 0.4) * startup_boost * time_boost
+                relevance_score = score * startup_boost * time_boost
                 
                 if relevance_score >= min_relevance:
                     relevant_exchanges.append({
                         **exchange,
                         'relevance_score': relevance_score,
-                        'common_words': list(common_words)
+                        'common_words': matched_terms[exchange_id]
                     })
         
         # Sort by relevance and return top results
@@ -217,16 +310,17 @@ class ConversationMemory:
     
     def get_conversation_summary(self) -> Dict[str, Any]:
         """Get conversation statistics and summary"""
-        if not self.history:
+        history = self._snapshot()
+        if not history:
             return {"status": "No conversation history"}
         
         # Calculate basic stats
-        total_exchanges = len(self.history)
+        total_exchanges = len(history)
         query_intents = {}
         agent_types = {}
         startup_discussions = set()
         
-        for exchange in self.history:
+        for exchange in history:
             intent = exchange.get('query_intent', 'unknown')
             agent_type = exchange.get('agent_type', 'chatbot')
             startup_id = exchange.get('startup_id')
@@ -275,30 +369,10 @@ class ConversationMemory:
             )
             
             if db_history:
-                # Convert database records to memory format
-                for record in reversed(db_history):  # Reverse to maintain chronological order
-                    exchange = {
-                        "id": record.get('id', str(uuid.uuid4())),
-                        "timestamp": record.get('timestamp'),
-                        "query": record.get('query', ''),
-                        "response": record.get('response', ''),
-                        "context": record.get('context', ''),
-                        "agent_type": record.get('agent_type', 'chatbot'),
-                        "query_intent": record.get('query_intent', ''),
-                        "startup_id": record.get('startup_id'),
-                        "user_id": record.get('user_id'),
-                        "session_id": record.get('session_id')
-                    }
-                    
-                    if exchange not in self.history:  # Avoid duplicates
-                        self.history.append(exchange)
+                with self._lock:
+                    loaded = self._merge_db_records(db_history)
                 
-                # Update current startup context if found
-                startup_ids = [h.get('startup_id') for h in self.history if h.get('startup_id')]
-                if startup_ids:
-                    self.current_startup_id = startup_ids[-1]  # Use most recent
-                
-                print(f" Loaded {len(db_history)} conversation records from database")
+                print(f" Loaded {loaded} conversation records from database")
                 return True
             
             return False
@@ -306,22 +380,62 @@ class ConversationMemory:
         except Exception as e:
             print(f" Error loading conversation history: {str(e)}")
             return False
+
+    def _merge_db_records(self, db_history: List[Dict[str, Any]]) -> int:
+        """Merge newest-first database rows into the ring buffer, skipping ids already held"""
+        loaded_exchanges = []
+        # Reverse to maintain chronological order
+        for record in reversed(db_history):
+            record_id = str(record.get('id') or uuid.uuid4())
+            if record_id in self._exchanges:  # Avoid duplicates
+                continue
+
+            loaded_exchanges.append({
+                "id": record_id,
+                "timestamp": record.get('timestamp'),
+                "query": record.get('query', ''),
+                "response": record.get('response', ''),
+                "context": record.get('context', ''),
+                "agent_type": record.get('agent_type', 'chatbot'),
+                "query_intent": record.get('query_intent', ''),
+                "startup_id": record.get('startup_id'),
+                "user_id": record.get('user_id'),
+                "session_id": record.get('session_id')
+            })
+
+        if not loaded_exchanges:
+            return 0
+
+        # Older persisted exchanges go before anything already in memory
+        existing = list(self.history)
+        self._reset_buffer()
+        for exchange in loaded_exchanges + existing:
+            self._append_exchange(exchange)
+
+        # Update current startup context if found
+        if not self.current_startup_id:
+            startup_ids = [h.get('startup_id') for h in self.history if h.get('startup_id')]
+            if startup_ids:
+                self.current_startup_id = startup_ids[-1]  # Use most recent
+
+        return len(loaded_exchanges)
     
     def clear_history(self, keep_last: int = 0):
         """Clear conversation history, optionally keeping recent exchanges"""
-        if keep_last > 0:
-            self.history = self.history[-keep_last:]
-        else:
-            self.history = []
-        
-        self.conversation_metadata["total_exchanges"] = len(self.history)
+        with self._lock:
+            kept = list(self.history)[-keep_last:] if keep_last > 0 else []
+            self._reset_buffer()
+            for exchange in kept:
+                self._append_exchange(exchange)
+            
+            self.conversation_metadata["total_exchanges"] = len(self.history)
         print(f"🧹 Conversation history cleared, kept {len(self.history)} recent exchanges")
     
     def export_conversation(self, format: str = "json") -> str:
         """Export conversation history"""
         export_data = {
             "session_info": self.get_conversation_summary(),
-            "conversation_history": self.history
+            "conversation_history": self._snapshot()
         }
         
         if format.lower() == "json":
@@ -331,7 +445,7 @@ class ConversationMemory:
             lines.append(f"Generated: {datetime.now().isoformat()}")
             lines.append("-" * 50)
             
-            for exchange in self.history:
+            for exchange in export_data["conversation_history"]:
                 lines.append(f"\n[{exchange['timestamp']}]")
                 lines.append(f"Human: {exchange['query']}")
                 lines.append(f"Assistant: {exchange['response']}")
@@ -347,7 +461,7 @@ def create_conversation_memory(db_manager: DatabaseManager = None,
                              session_id: str = None,
                              load_existing: bool = True) -> ConversationMemory:
     """Factory function to create conversation memory with proper setup"""
-    memory = ConversationMemory(db_manager, session_id)
+    memory = ConversationMemory(session_id=session_id, db_manager=db_manager)
     
     if load_existing and db_manager:
         memory.load_history_from_db()
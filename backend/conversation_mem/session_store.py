@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any
+import uuid
+
+from conversation_mem.convo_mem import ConversationMemory
+
+
+class SessionMemoryStore:
+    """Session-keyed conversation memory with LRU eviction and lazy DB rehydration
+
+    Each chat session gets its own ConversationMemory (a bounded ring buffer).
+    Sessions are created on first use, rehydrated once from the conversations
+    table, and evicted least-recently-used first when the store exceeds its
+    session count, its memory budget, or a session sits idle past the TTL.
+    """
+
+    def __init__(self,
+                 db_manager=None,
+                 context_window: int = 15,
+                 max_sessions: int = 2000,
+                 memory_budget_bytes: int = 64 * 1024 * 1024,
+                 idle_ttl_seconds: float = 2 * 60 * 60):
+        self.db_manager = db_manager
+        self.context_window = context_window
+        self.max_sessions = max_sessions
+        self.memory_budget_bytes = memory_budget_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+
+        self._sessions = OrderedDict()  # session_id -> ConversationMemory, oldest first
+        self._session_bytes = {}  # last accounted size per session
+        self._total_bytes = 0
+        self._loading = {}  # session_id -> Event while a DB rehydration is in flight
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "misses": 0, "rehydrated": 0, "evictions": 0}
+
+    def generate_session_id(self) -> str:
+        """Generate unique session ID"""
+        return f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+    def get_session(self, session_id: str, startup_id: str = None) -> ConversationMemory:
+        """Return the memory for a session, creating and rehydrating it on first use"""
+        session_id = session_id or self.generate_session_id()
+
+        while True:
+            with self._lock:
+                memory = self._sessions.get(session_id)
+                if memory is not None:
+                    self._sessions.move_to_end(session_id)
+                    self._stats["hits"] += 1
+                    break
+
+                pending = self._loading.get(session_id)
+                if pending is None:
+                    # This request owns the rehydration
+                    pending = threading.Event()
+                    self._loading[session_id] = pending
+                    self._stats["misses"] += 1
+                    owner = True
+                else:
+                    owner = False
+
+            if not owner:
+                # Another request is loading this session; wait and retry the lookup
+                pending.wait(timeout=10)
+                continue
+
+            try:
+                memory = self._load_session(session_id)
+                with self._lock:
+                    self._sessions[session_id] = memory
+                    self._account(session_id, memory)
+                    self._enforce_budget(keep=session_id)
+            finally:
+                with self._lock:
+                    self._loading.pop(session_id, None)
+                pending.set()
+            break
+
+        memory.touch()
+        if startup_id and memory.current_startup_id != startup_id:
+            memory.set_startup_context(startup_id)
+        return memory
+
+    def _load_session(self, session_id: str) -> ConversationMemory:
+        """Build a session memory and pull its recent exchanges from the database"""
+        memory = ConversationMemory(
+            session_id=session_id,
+            db_manager=self.db_manager,
+            context_window=self.context_window
+        )
+        if self.db_manager and self.db_manager.is_connected():
+            if memory.load_history_from_db():
+                with self._lock:
+                    self._stats["rehydrated"] += 1
+        return memory
+
+    def add_exchange(self, session_id: str, query: str, response: str, **kwargs) -> bool:
+        """Record an exchange on a session and re-check the memory budget"""
+        memory = self.get_session(session_id, kwargs.pop("startup_id", None))
+        added = memory.add_exchange(query, response, **kwargs)
+
+        with self._lock:
+            if session_id in self._sessions:
+                self._account(session_id, memory)
+                self._enforce_budget(keep=session_id)
+        return added
+
+    def drop_session(self, session_id: str) -> bool:
+        """Forget a session's in-process memory (persisted rows are untouched)"""
+        with self._lock:
+            return self._remove(session_id)
+
+    def evict_idle(self) -> int:
+        """Evict sessions idle for longer than the TTL, returns number evicted"""
+        with self._lock:
+            return self._evict_idle()
+
+    def _account(self, session_id: str, memory: ConversationMemory):
+        """Refresh the byte total after a session's history changed. Caller holds the lock"""
+        size = memory.approx_bytes
+        self._total_bytes += size - self._session_bytes.get(session_id, 0)
+        self._session_bytes[session_id] = size
+
+    def _remove(self, session_id: str) -> bool:
+        """Drop a session and its accounting. Caller holds the lock"""
+        if self._sessions.pop(session_id, None) is None:
+            return False
+        self._total_bytes -= self._session_bytes.pop(session_id, 0)
+        return True
+
+    def _evict_idle(self) -> int:
+        """Evict from the LRU end while sessions are past the idle TTL. Caller holds the lock"""
+        cutoff = time.monotonic() - self.idle_ttl_seconds
+        evicted = 0
+        while self._sessions:
+            session_id, memory = next(iter(self._sessions.items()))
+            if memory.last_accessed > cutoff:
+                break
+            self._remove(session_id)
+            evicted += 1
+        self._stats["evictions"] += evicted
+        return evicted
+
+    def _enforce_budget(self, keep: str = None):
+        """Evict idle sessions, then least-recently-used ones until under both limits"""
+        self._evict_idle()
+        while self._sessions and (len(self._sessions) > self.max_sessions
+                                  or self._total_bytes > self.memory_budget_bytes):
+            session_id = next(iter(self._sessions))
+            if session_id == keep:
+                if len(self._sessions) == 1:
+                    break
+                # Never evict the session serving the current request
+                self._sessions.move_to_end(session_id)
+                continue
+            self._remove(session_id)
+            self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Session count, memory usage against budget, and hit/miss counters"""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "approx_bytes": self._total_bytes,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                **self._stats
+            }
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
@@ -4,20 +4,43 @@ import sys
 import os
 
 
-from memory.memory import MemoryGraph
+from memory.memory import MemoryGraph, memory_graph, SIMILAR_STARTUPS_LIMIT
+from memory.shared_graph import SharedMemoryGraph
+from database.write_behind import ConversationWriteBehind
+from database.profile_cache import ProfileCache
+from database.search_engine import PostgresStartupSearch
+from database.embeddings import StartupEmbeddingPipeline, PgVectorStartupIndex
+from agno.vectordb.search import SearchType
 
 from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 import json
 from supabase import create_client
 from dataclasses import dataclass
 import uuid
+import threading
+from collections import defaultdict
 
 SUPABASE_DB_PASSWORD = os.environ.get("SUPABASE_DB_PASSWORD")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 SUPABASE_URL = os.environ.get("SUPABASE_URL") 
+# Binary snapshot of the memory graph; changes since it was written go to <path>.log
+MEMORY_GRAPH_SNAPSHOT = os.environ.get("MEMORY_GRAPH_SNAPSHOT", "memory_graph.snapshot")
+# Set when running several uvicorn workers: one builds and publishes, the rest attach read-only
+MEMORY_GRAPH_SHARED_DIR = os.environ.get("MEMORY_GRAPH_SHARED_DIR")
+# Re-snapshot (and truncate the change log) once the log has this many entries or is this old
+MEMORY_GRAPH_CHECKPOINT_ENTRIES = int(os.environ.get("MEMORY_GRAPH_CHECKPOINT_ENTRIES", 20000))
+MEMORY_GRAPH_CHECKPOINT_SECONDS = float(os.environ.get("MEMORY_GRAPH_CHECKPOINT_SECONDS", 6 * 3600))
+MEMORY_GRAPH_CHECKPOINT_POLL = 60.0
 
-memory_graph = MemoryGraph()
+# Shared by every DatabaseManager in the process so writes invalidate all readers
+profile_cache = ProfileCache()
+# Startup columns the memory graph is hydrated from
+INVESTOR_REQUIRED_FIELDS = ['name', 'phone', 'email', 'location']
+STARTUP_REQUIRED_FIELDS = ['company_name', 'industry_sector', 'contact_email']
+# Columns of startup listings (get_all_startups)
+STARTUP_LIST_COLUMNS = 'startup_id, company_name, industry_sector, stage, funding_stage, location_city, location_state, monthly_revenue, funding_amount_required, team_size, created_at'
+GRAPH_STARTUP_COLUMNS = 'startup_id, company_name, industry_sector, stage, funding_stage, location_city, location_state, monthly_revenue, funding_amount_required, team_size, created_at, problem_statement, solution_description, target_market'
 # Data Classes
 
 @dataclass
@@ -62,8 +85,20 @@ class DatabaseManager:
         self.supabase_url = SUPABASE_URL
         self.supabase_key = SUPABASE_KEY
         self.memory_graph = memory_graph
+        self.shared_graph = None  # SharedMemoryGraph when MEMORY_GRAPH_SHARED_DIR is set
+        self.profile_cache = profile_cache
         self.supabase = None
         self.connected = False
+        self.conversation_writer = None  # Created on first queued conversation
+        self._resolve_rpc_available = True
+        self.search_engine = PostgresStartupSearch(self)
+        self._search_rpc_available = True
+        self.embedding_pipeline = None  # Created on first embed or semantic search
+        self._semantic_rpc_available = True
+        self._embedded_select_available = True
+        self._writer_lock = threading.Lock()
+        self._checkpoint_stop = threading.Event()
+        self._checkpoint_thread = None  # Re-snapshots the memory graph in single-process mode
         self._init_connection()
     
     def _init_connection(self):
@@ -90,8 +125,8 @@ class DatabaseManager:
     def get_conversation_history(self, session_id: str, limit: int = 10):
         """Get conversation history for a session"""
         try:
-            # Assuming you have a conversation_history table
-            response = self.supabase.table('conversation_history').select('*').eq('session_id', session_id).order('created_at', desc=True).limit(limit).execute()
+            # Exchanges are written to the conversations table by save_conversation_with_context
+            response = self.supabase.table('conversations').select('*').eq('session_id', session_id).order('timestamp', desc=True).limit(limit).execute()
             
             return response.data if response.data else []
                 
@@ -118,32 +153,13 @@ class DatabaseManager:
             return None
         
         # Validate required fields
-        required_fields = ['name', 'phone', 'email','location']
-        for field in required_fields:
-            if not investor_data.get(field):
-                print(f" Missing required field: {field}")
-                return None
+        missing = self._missing_field(investor_data, INVESTOR_REQUIRED_FIELDS)
+        if missing:
+            print(f" Missing required field: {missing}")
+            return None
             
         try:
-            # Generate investor_id if not provided
-            if not investor_data.get('investor_id'):
-                investor_data['investor_id'] = self.generate_investor_id(investor_data['name'])
-            
-            # Prepare Investor profile data with proper JSON serialization
-            profile_data = {
-                'investor_id': investor_data['investor_id'],
-                'name': investor_data.get('name'),
-                'email': investor_data.get('email'),
-                'phone': investor_data.get('phone'),
-                'location': investor_data.get('location'),
-                'type': investor_data.get('type'),
-                'min_investment': investor_data.get('min_investment'),
-                'max_investment': investor_data.get('max_investment'),
-                'preferred_industries': investor_data.get('preferred_industries'),
-                'geographic_focus': investor_data.get('geographic_focus'),
-    
-
-            }
+            profile_data = self._investor_row(investor_data)
             
             # Insert Investor profile
             result = self.supabase.table('investor_profiles').insert(profile_data).execute()
@@ -162,6 +178,31 @@ class DatabaseManager:
             print(f" Error saving Investor profile: {str(e)}")
             return None
 
+    def _missing_field(self, data: Dict[str, Any], required_fields: List[str]) -> Optional[str]:
+        """First required field that is empty in data, or None"""
+        for field in required_fields:
+            if not data.get(field):
+                return field
+        return None
+
+    def _investor_row(self, investor_data: Dict[str, Any]) -> Dict[str, Any]:
+        """investor_profiles row, generating investor_id (on investor_data too) if not provided"""
+        if not investor_data.get('investor_id'):
+            investor_data['investor_id'] = self.generate_investor_id(investor_data['name'])
+
+        return {
+            'investor_id': investor_data['investor_id'],
+            'name': investor_data.get('name'),
+            'email': investor_data.get('email'),
+            'phone': investor_data.get('phone'),
+            'location': investor_data.get('location'),
+            'type': investor_data.get('type'),
+            'min_investment': investor_data.get('min_investment'),
+            'max_investment': investor_data.get('max_investment'),
+            'preferred_industries': investor_data.get('preferred_industries'),
+            'geographic_focus': investor_data.get('geographic_focus'),
+        }
+
 
         
     #  STARTUP PROFILE MANAGEMENT METHODS
@@ -179,72 +220,13 @@ class DatabaseManager:
             return None
         
         # Validate required fields
-        required_fields = ['company_name', 'industry_sector', 'contact_email']
-        for field in required_fields:
-            if not startup_data.get(field):
-                print(f" Missing required field: {field}")
-                return None
+        missing = self._missing_field(startup_data, STARTUP_REQUIRED_FIELDS)
+        if missing:
+            print(f" Missing required field: {missing}")
+            return None
             
         try:
-            # Generate startup_id if not provided
-            if not startup_data.get('startup_id'):
-                startup_data['startup_id'] = self.generate_startup_id(startup_data['company_name'])
-            
-            # Prepare startup profile data with proper JSON serialization
-            profile_data = {
-                'startup_id': startup_data['startup_id'],
-                'company_name': startup_data.get('company_name'),
-                'brand_name': startup_data.get('brand_name', startup_data.get('company_name')),
-                'registration_status': startup_data.get('registration_status', 'Unregistered'),
-                'industry_sector': startup_data.get('industry_sector'),
-                'stage': startup_data.get('stage', 'Idea'),
-                'location_city': startup_data.get('location_city', ''),
-                'location_state': startup_data.get('location_state', ''),
-                'website': startup_data.get('website'),
-                'contact_email': startup_data.get('contact_email'),
-                'contact_phone': startup_data.get('contact_phone'),
-                
-                # Business Model & Product
-                'problem_statement': startup_data.get('problem_statement', ''),
-                'solution_description': startup_data.get('solution_description', ''),
-                'target_market': startup_data.get('target_market', ''),
-                'revenue_model': startup_data.get('revenue_model', ''),
-                'pricing_strategy': startup_data.get('pricing_strategy', ''),
-                'competitive_advantage': startup_data.get('competitive_advantage', ''),
-                
-                # Market & Traction (with safe conversions)
-                'market_size_tam': self._safe_float_conversion(startup_data.get('market_size_tam')),
-                'market_size_sam': self._safe_float_conversion(startup_data.get('market_size_sam')),
-                'current_customers': self._safe_int_conversion(startup_data.get('current_customers', 0)),
-                'monthly_revenue': self._safe_float_conversion(startup_data.get('monthly_revenue', 0)),
-                'growth_rate': self._safe_float_conversion(startup_data.get('growth_rate')),
-                'key_achievements': self._safe_json_conversion(startup_data.get('key_achievements', [])),
-                
-                # Financial Information
-                'monthly_burn_rate': self._safe_float_conversion(startup_data.get('monthly_burn_rate')),
-                'current_cash_position': self._safe_float_conversion(startup_data.get('current_cash_position')),
-                'revenue_projections': self._safe_json_conversion(startup_data.get('revenue_projections', {})),
-                'break_even_timeline': startup_data.get('break_even_timeline'),
-                
-                # Funding Requirements
-                'funding_amount_required': self._safe_float_conversion(startup_data.get('funding_amount_required', 0)),
-                'funding_stage': startup_data.get('funding_stage', 'Pre-seed'),
-                'previous_funding': self._safe_float_conversion(startup_data.get('previous_funding', 0)),
-                'use_of_funds': self._safe_json_conversion(startup_data.get('use_of_funds', {})),
-                'equity_dilution': self._safe_float_conversion(startup_data.get('equity_dilution')),
-                'valuation_expectations': self._safe_float_conversion(startup_data.get('valuation_expectations')),
-                
-                # Team & Operations
-                'team_size': self._safe_int_conversion(startup_data.get('team_size', 1)),
-                'technology_stack': self._safe_json_conversion(startup_data.get('technology_stack', [])),
-                'operational_metrics': self._safe_json_conversion(startup_data.get('operational_metrics', {})),
-                
-                # Metadata
-                'is_active': True,
-                'is_verified': False,
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
-            }
+            profile_data = self._startup_row(startup_data)
             
             # Insert startup profile
             result = self.supabase.table('startup_profiles').insert(profile_data).execute()
@@ -255,6 +237,8 @@ class DatabaseManager:
                 
             startup_id = result.data[0]['startup_id']
             print(f" Startup profile saved with ID: {startup_id}")
+
+            self._after_startup_saved(startup_id, profile_data)
             
             # Save founders separately
             if startup_data.get('founders'):
@@ -270,7 +254,77 @@ class DatabaseManager:
             print(f" Error saving startup profile: {str(e)}")
             return None
     
+    def _after_startup_saved(self, startup_id: str, profile_data: Dict[str, Any]):
+        """Cache invalidation and background embedding once a startup row is inserted"""
+        # A new row can change which startup a fuzzy name lookup resolves to
+        self.profile_cache.invalidate(startup_id)
+        self.profile_cache.invalidate_names()
+
+        # Embed the text fields in the background so signup doesn't wait on the embedding API
+        self.embed_startup_async({**profile_data, 'startup_id': startup_id})
+
     # =================== UTILITY METHODS ===================
+
+    def _startup_row(self, startup_data: Dict[str, Any]) -> Dict[str, Any]:
+        """startup_profiles row with safe conversions, generating startup_id (on startup_data too) if not provided"""
+        if not startup_data.get('startup_id'):
+            startup_data['startup_id'] = self.generate_startup_id(startup_data['company_name'])
+
+        # Prepare startup profile data with proper JSON serialization
+        return {
+            'startup_id': startup_data['startup_id'],
+            'company_name': startup_data.get('company_name'),
+            'brand_name': startup_data.get('brand_name', startup_data.get('company_name')),
+            'registration_status': startup_data.get('registration_status', 'Unregistered'),
+            'industry_sector': startup_data.get('industry_sector'),
+            'stage': startup_data.get('stage', 'Idea'),
+            'location_city': startup_data.get('location_city', ''),
+            'location_state': startup_data.get('location_state', ''),
+            'website': startup_data.get('website'),
+            'contact_email': startup_data.get('contact_email'),
+            'contact_phone': startup_data.get('contact_phone'),
+            
+            # Business Model & Product
+            'problem_statement': startup_data.get('problem_statement', ''),
+            'solution_description': startup_data.get('solution_description', ''),
+            'target_market': startup_data.get('target_market', ''),
+            'revenue_model': startup_data.get('revenue_model', ''),
+            'pricing_strategy': startup_data.get('pricing_strategy', ''),
+            'competitive_advantage': startup_data.get('competitive_advantage', ''),
+            
+            # Market & Traction (with safe conversions)
+            'market_size_tam': self._safe_float_conversion(startup_data.get('market_size_tam')),
+            'market_size_sam': self._safe_float_conversion(startup_data.get('market_size_sam')),
+            'current_customers': self._safe_int_conversion(startup_data.get('current_customers', 0)),
+            'monthly_revenue': self._safe_float_conversion(startup_data.get('monthly_revenue', 0)),
+            'growth_rate': self._safe_float_conversion(startup_data.get('growth_rate')),
+            'key_achievements': self._safe_json_conversion(startup_data.get('key_achievements', [])),
+            
+            # Financial Information
+            'monthly_burn_rate': self._safe_float_conversion(startup_data.get('monthly_burn_rate')),
+            'current_cash_position': self._safe_float_conversion(startup_data.get('current_cash_position')),
+            'revenue_projections': self._safe_json_conversion(startup_data.get('revenue_projections', {})),
+            'break_even_timeline': startup_data.get('break_even_timeline'),
+            
+            # Funding Requirements
+            'funding_amount_required': self._safe_float_conversion(startup_data.get('funding_amount_required', 0)),
+            'funding_stage': startup_data.get('funding_stage', 'Pre-seed'),
+            'previous_funding': self._safe_float_conversion(startup_data.get('previous_funding', 0)),
+            'use_of_funds': self._safe_json_conversion(startup_data.get('use_of_funds', {})),
+            'equity_dilution': self._safe_float_conversion(startup_data.get('equity_dilution')),
+            'valuation_expectations': self._safe_float_conversion(startup_data.get('valuation_expectations')),
+            
+            # Team & Operations
+            'team_size': self._safe_int_conversion(startup_data.get('team_size', 1)),
+            'technology_stack': self._safe_json_conversion(startup_data.get('technology_stack', [])),
+            'operational_metrics': self._safe_json_conversion(startup_data.get('operational_metrics', {})),
+            
+            # Metadata
+            'is_active': True,
+            'is_verified': False,
+            'created_at': datetime.now().isoformat(),
+            'updated_at': datetime.now().isoformat()
+        }
     
     def _safe_float_conversion(self, value) -> Optional[float]:
         """Safely convert value to float"""
@@ -310,19 +364,21 @@ class DatabaseManager:
             if not startup_data:
                 return None
             
-            # Parse JSON fields for AI processing
-            startup_data['key_achievements'] = json.loads(startup_data.get('key_achievements', '[]'))
-            startup_data['revenue_projections'] = json.loads(startup_data.get('revenue_projections', '{}'))
-            startup_data['use_of_funds'] = json.loads(startup_data.get('use_of_funds', '{}'))
-            startup_data['technology_stack'] = json.loads(startup_data.get('technology_stack', '[]'))
-            startup_data['operational_metrics'] = json.loads(startup_data.get('operational_metrics', '{}'))
-            
-            return startup_data
+            return self._parse_profile_json(startup_data)
             
         except Exception as e:
             print(f"Error getting startup for insights: {str(e)}")
             return None
     
+    def _parse_profile_json(self, startup_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse the JSON text columns of a profile row for AI processing"""
+        startup_data['key_achievements'] = json.loads(startup_data.get('key_achievements', '[]'))
+        startup_data['revenue_projections'] = json.loads(startup_data.get('revenue_projections', '{}'))
+        startup_data['use_of_funds'] = json.loads(startup_data.get('use_of_funds', '{}'))
+        startup_data['technology_stack'] = json.loads(startup_data.get('technology_stack', '[]'))
+        startup_data['operational_metrics'] = json.loads(startup_data.get('operational_metrics', '{}'))
+        return startup_data
+
     def save_startup_insights(self, startup_id: str, insights_data: Dict[str, Any]) -> Optional[str]:
         """Save AI-generated insights for a startup"""
         if not self.is_connected():
@@ -336,27 +392,35 @@ class DatabaseManager:
                 .execute()
             
             # Insert new insights
-            insight_data = {
-                'startup_id': startup_id,
-                'executive_summary': insights_data.get('executive_summary'),
-                'key_strengths': json.dumps(insights_data.get('key_strengths', [])),
-                'major_risks': json.dumps(insights_data.get('major_risks', [])),
-                'market_analysis': insights_data.get('market_analysis'),
-                'financial_outlook': insights_data.get('financial_outlook'),
-                'investment_recommendation': insights_data.get('investment_recommendation'),
-                'recommendation_score': insights_data.get('recommendation_score'),
-                'generated_by': insights_data.get('generated_by', 'AI_Agent_v1'),
-                'generated_at': datetime.now().isoformat(),
-                'is_current': True
-            }
-            
-            result = self.supabase.table('startup_insights').insert(insight_data).execute()
+            result = self.supabase.table('startup_insights').insert(self._insight_row(startup_id, insights_data)).execute()
+            self.profile_cache.invalidate(startup_id)
             return result.data[0]['id'] if result.data else None
             
         except Exception as e:
             print(f"Error saving startup insights: {str(e)}")
             return None
     
+    def _insight_row(self, startup_id: str, insights_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Current startup_insights row for AI-generated insights"""
+        # Structured recommendations from the agent are stored as JSON text
+        recommendation = insights_data.get('investment_recommendation')
+        if isinstance(recommendation, (dict, list)):
+            recommendation = self._safe_json_conversion(recommendation)
+
+        return {
+            'startup_id': startup_id,
+            'executive_summary': insights_data.get('executive_summary'),
+            'key_strengths': json.dumps(insights_data.get('key_strengths', [])),
+            'major_risks': json.dumps(insights_data.get('major_risks', [])),
+            'market_analysis': insights_data.get('market_analysis'),
+            'financial_outlook': insights_data.get('financial_outlook'),
+            'investment_recommendation': recommendation,
+            'recommendation_score': insights_data.get('recommendation_score'),
+            'generated_by': insights_data.get('generated_by', 'AI_Agent_v1'),
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'is_current': True
+        }
+
     def get_startup_insights(self, startup_id: str) -> Optional[Dict[str, Any]]:
         """Get current AI insights for a startup"""
         if not self.is_connected():
@@ -367,22 +431,30 @@ class DatabaseManager:
                 .select('*')\
                 .eq('startup_id', startup_id)\
                 .eq('is_current', True)\
+                .order('generated_at', desc=True)\
+                .limit(1)\
                 .execute()
             
-            if result.data:
-                insights = result.data[0]
-                # Parse JSON fields
-                insights['key_strengths'] = json.loads(insights.get('key_strengths', '[]'))
-                insights['major_risks'] = json.loads(insights.get('major_risks', '[]'))
-                return insights
-            
-            return None
+            return self._parse_insights(result.data[0]) if result.data else None
             
         except Exception as e:
             print(f"Error getting startup insights: {str(e)}")
             return None
         
     
+    def _parse_insights(self, insights: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse the JSON fields of a startup_insights row"""
+        for field in ('key_strengths', 'major_risks'):
+            if not isinstance(insights.get(field), list):
+                insights[field] = json.loads(insights.get(field) or '[]')
+        recommendation = insights.get('investment_recommendation')
+        if isinstance(recommendation, str) and recommendation.strip().startswith('{'):
+            try:
+                insights['investment_recommendation'] = json.loads(recommendation)
+            except json.JSONDecodeError:
+                pass
+        return insights
+
     # CHATBOT SPECIFIC METHODS
     
     def save_conversation_with_context(self, conversation_data: ConversationRecord) -> Optional[str]:
@@ -392,16 +464,7 @@ class DatabaseManager:
             return None
             
         try:
-            conv_data = {
-                'session_id': conversation_data.session_id,
-                'startup_id': conversation_data.startup_id,
-                'query': conversation_data.user_query,
-                'response': conversation_data.agent_response,
-                'context': conversation_data.context_used,
-                'agent_type': conversation_data.agent_type,
-                'user_id': conversation_data.user_id,
-                'timestamp': datetime.now().isoformat()
-            }
+            conv_data = self._conversation_row(conversation_data)
             
             result = self.supabase.table('conversations').insert(conv_data).execute()
             return result.data[0]['id'] if result.data else None
@@ -409,6 +472,46 @@ class DatabaseManager:
         except Exception as e:
             print(f"Error saving conversation: {str(e)}")
             return None
+
+    def _conversation_row(self, conversation_data: ConversationRecord) -> Dict[str, Any]:
+        """Build a conversations table row, timestamped when the exchange happened"""
+        return {
+            'session_id': conversation_data.session_id,
+            'startup_id': conversation_data.startup_id,
+            'query': conversation_data.user_query,
+            'response': conversation_data.agent_response,
+            'context': conversation_data.context_used,
+            'agent_type': conversation_data.agent_type,
+            'user_id': conversation_data.user_id,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def queue_conversation(self, conversation_data: ConversationRecord) -> bool:
+        """Queue a conversation for batched write-behind persistence (no round trip on the caller)"""
+        try:
+            if self.conversation_writer is None:
+                with self._writer_lock:
+                    if self.conversation_writer is None:
+                        self.conversation_writer = ConversationWriteBehind(self)
+            return self.conversation_writer.enqueue(self._conversation_row(conversation_data))
+        except Exception as e:
+            print(f"Error queueing conversation: {str(e)}")
+            return False
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the shared profile cache"""
+        return self.profile_cache.stats()
+
+    def close(self):
+        """Flush queued conversation writes before shutdown"""
+        if self.conversation_writer is not None:
+            self.conversation_writer.close()
+        if self.shared_graph is not None:
+            self.shared_graph.close()
+        self._checkpoint_stop.set()
+        if self._checkpoint_thread is not None:
+            self._checkpoint_thread.join(timeout=MEMORY_GRAPH_CHECKPOINT_POLL)
+        memory_graph.close()
     
     def get_startup_conversation_context(self, startup_id: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Get recent conversations for a specific startup as context"""
@@ -458,11 +561,16 @@ class DatabaseManager:
     # =================== SEARCH & RETRIEVAL =====================
 
     def get_startup_profile(self, startup_id: str):
-        """Get startup data by startup_id (original method)"""
+        """Get startup data by startup_id (original method), read through the profile cache"""
+        cached = self.profile_cache.get(startup_id)
+        if cached is not None:
+            return cached
+
         try:
             response = self.supabase.table('startup_profiles').select('*').eq('startup_id', startup_id).execute()
             
             if response.data and len(response.data) > 0:
+                self.profile_cache.put(response.data[0])
                 return response.data[0]
             else:
                 return None
@@ -477,31 +585,13 @@ class DatabaseManager:
             return None
             
         try:
-            for founder in founders:
-                if not isinstance(founder, dict):
-                    print(f" Invalid founder data (not a dict): {founder}")
-                    continue  # Skip invalid items
-
-                if not founder.get('name'):
-                    continue  # Skip founders without names
-                    
-                founder_data = {
-                    'startup_id': startup_id,
-                    'name': founder.get('name'),
-                    'role': founder.get('role', 'Founder'),
-                    'education_degree': founder.get('education_degree'),
-                    'education_institution': founder.get('education_institution'),
-                    'professional_experience': founder.get('professional_experience'),
-                    'years_of_experience': self._safe_int_conversion(founder.get('years_of_experience')),
-                    'equity_stake': self._safe_float_conversion(founder.get('equity_stake')),
-                    'linkedin_profile': founder.get('linkedin_profile'),
-                    'is_primary_founder': founder.get('is_primary_founder', False),
-                    'created_at': datetime.now().isoformat()
-                }
+            for founder_data in self._founder_rows(startup_id, founders):
                 self.supabase.table('founders').insert(founder_data).execute()
                 
         except Exception as e:
             print(f" Error saving founders: {str(e)}")
+        finally:
+            self.profile_cache.invalidate(startup_id)
     
     def save_team_members(self, startup_id: str, team_members: List[Dict[str, Any]]):
         """Save team member information with validation"""
@@ -509,25 +599,56 @@ class DatabaseManager:
             return None
             
         try:
-            for member in team_members:
-                if not member.get('name'):
-                    continue  # Skip members without names
-                    
-                member_data = {
-                    'startup_id': startup_id,
-                    'name': member.get('name'),
-                    'role': member.get('role', 'Team Member'),
-                    'department': member.get('department'),
-                    'experience': member.get('experience'),
-                    'skills': self._safe_json_conversion(member.get('skills', [])),
-                    'is_key_member': member.get('is_key_member', False),
-                    'created_at': datetime.now().isoformat()
-                }
+            for member_data in self._team_member_rows(startup_id, team_members):
                 self.supabase.table('team_members').insert(member_data).execute()
                 
         except Exception as e:
             print(f" Error saving team members: {str(e)}")
+        finally:
+            self.profile_cache.invalidate(startup_id)
     
+    def _founder_rows(self, startup_id: str, founders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """founders rows, skipping invalid items and founders without names"""
+        rows = []
+        for founder in founders:
+            if not isinstance(founder, dict):
+                print(f" Invalid founder data (not a dict): {founder}")
+                continue  # Skip invalid items
+
+            if not founder.get('name'):
+                continue  # Skip founders without names
+
+            rows.append({
+                'startup_id': startup_id,
+                'name': founder.get('name'),
+                'role': founder.get('role', 'Founder'),
+                'education_degree': founder.get('education_degree'),
+                'education_institution': founder.get('education_institution'),
+                'professional_experience': founder.get('professional_experience'),
+                'years_of_experience': self._safe_int_conversion(founder.get('years_of_experience')),
+                'equity_stake': self._safe_float_conversion(founder.get('equity_stake')),
+                'linkedin_profile': founder.get('linkedin_profile'),
+                'is_primary_founder': founder.get('is_primary_founder', False),
+                'created_at': datetime.now().isoformat()
+            })
+        return rows
+
+    def _team_member_rows(self, startup_id: str, team_members: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """team_members rows, skipping members without names"""
+        return [
+            {
+                'startup_id': startup_id,
+                'name': member.get('name'),
+                'role': member.get('role', 'Team Member'),
+                'department': member.get('department'),
+                'experience': member.get('experience'),
+                'skills': self._safe_json_conversion(member.get('skills', [])),
+                'is_key_member': member.get('is_key_member', False),
+                'created_at': datetime.now().isoformat()
+            }
+            for member in team_members if member.get('name')
+        ]
+
     # EXISTING METHODS
     
     def get_all_startups(self, filters: Dict[str, Any] = None, limit: int = 50) -> List[Dict[str, Any]]:
@@ -536,37 +657,159 @@ class DatabaseManager:
             return []
             
         try:
-            query = self.supabase.table('startup_profiles')\
-                .select('startup_id, company_name, industry_sector, stage, funding_stage, location_city, location_state, monthly_revenue, funding_amount_required, team_size, created_at')\
-                .eq('is_active', True)
-            
-            # Apply filters
-            if filters:
-                if 'industry_sector' in filters and filters['industry_sector']:
-                    query = query.eq('industry_sector', filters['industry_sector'])
-                if 'stage' in filters and filters['stage']:
-                    query = query.eq('stage', filters['stage'])
-                if 'funding_stage' in filters and filters['funding_stage']:
-                    query = query.eq('funding_stage', filters['funding_stage'])
-                if 'location_city' in filters and filters['location_city']:
-                    query = query.eq('location_city', filters['location_city'])
-                if 'min_funding' in filters and filters['min_funding']:
-                    query = query.gte('funding_amount_required', filters['min_funding'])
-                if 'max_funding' in filters and filters['max_funding']:
-                    query = query.lte('funding_amount_required', filters['max_funding'])
-            
-            result = query.order('created_at', desc=True).limit(limit).execute()
+            result = self._startups_query(self.supabase, filters, limit).execute()
             return result.data or []
             
         except Exception as e:
             print(f" Error retrieving startups: {str(e)}")
             return []
     
+    def _startups_query(self, client, filters: Optional[Dict[str, Any]], limit: int):
+        """Filtered startup listing query on client (sync or async supabase client), not yet executed"""
+        query = client.table('startup_profiles')\
+            .select(STARTUP_LIST_COLUMNS)\
+            .eq('is_active', True)
+        
+        # Apply filters
+        if filters:
+            if 'industry_sector' in filters and filters['industry_sector']:
+                query = query.eq('industry_sector', filters['industry_sector'])
+            if 'stage' in filters and filters['stage']:
+                query = query.eq('stage', filters['stage'])
+            if 'funding_stage' in filters and filters['funding_stage']:
+                query = query.eq('funding_stage', filters['funding_stage'])
+            if 'location_city' in filters and filters['location_city']:
+                query = query.eq('location_city', filters['location_city'])
+            if 'min_funding' in filters and filters['min_funding']:
+                query = query.gte('funding_amount_required', filters['min_funding'])
+            if 'max_funding' in filters and filters['max_funding']:
+                query = query.lte('funding_amount_required', filters['max_funding'])
+        
+        return query.order('created_at', desc=True).limit(limit)
+
+    def get_startup_graph_page(self, after_id: str = None, limit: int = 500) -> List[Dict[str, Any]]:
+        """One keyset page of active startups ordered by startup_id, for graph hydration
+
+        founders and team_members are embedded in each row when PostgREST knows the
+        foreign keys; otherwise rows come back without them and
+        attach_founders_and_team fills them in with one bulk query per table.
+        """
+        if self._embedded_select_available:
+            try:
+                return self._graph_page_query(self.supabase, True, after_id, limit).execute().data or []
+            except Exception as e:
+                if not self._embedded_select_unavailable(e):
+                    raise
+
+        return self._graph_page_query(self.supabase, False, after_id, limit).execute().data or []
+
+    def _graph_page_query(self, client, embedded: bool, after_id: Optional[str], limit: int):
+        columns = f"{GRAPH_STARTUP_COLUMNS}, founders(*), team_members(*)" if embedded else GRAPH_STARTUP_COLUMNS
+        query = client.table('startup_profiles').select(columns).eq('is_active', True)
+        if after_id is not None:
+            query = query.gt('startup_id', after_id)
+        return query.order('startup_id').limit(limit)
+
+    def _embedded_select_unavailable(self, error: Exception) -> bool:
+        """True (and stop embedding) when PostgREST does not know the founders/team_members foreign keys"""
+        if 'PGRST200' not in str(error) and 'relationship' not in str(error):
+            return False
+        print(" Embedded founders/team_members select unavailable, using bulk queries per page")
+        self._embedded_select_available = False
+        return True
+
+    def attach_founders_and_team(self, startups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fill founders/team_members on rows that lack them, one query per table for the whole page"""
+        missing = [row['startup_id'] for row in startups if 'founders' not in row or 'team_members' not in row]
+        if not missing:
+            return startups
+
+        founders = self.supabase.table('founders').select('*').in_('startup_id', missing).execute()
+        team_members = self.supabase.table('team_members').select('*').in_('startup_id', missing).execute()
+        return self._attach_people(startups, founders.data, team_members.data)
+
+    def _attach_people(self, startups: List[Dict[str, Any]], founders: Optional[List[Dict[str, Any]]],
+                       team_members: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        people = {}
+        for table, rows in (('founders', founders), ('team_members', team_members)):
+            grouped = defaultdict(list)
+            for person in rows or []:
+                grouped[person['startup_id']].append(person)
+            people[table] = grouped
+
+        for row in startups:
+            row.setdefault('founders', people['founders'].get(row['startup_id'], []))
+            row.setdefault('team_members', people['team_members'].get(row['startup_id'], []))
+        return startups
+
     def search_startups(self, search_term: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Enhanced search with better error handling"""
+        """Ranked full-text search, returns the first page of results"""
+        return self.search_startups_page(search_term, limit=limit)["results"]
+
+    def search_startups_page(self, search_term: str, limit: int = 20, cursor: str = None) -> Dict[str, Any]:
+        """Ranked full-text search with highlighted snippets and keyset pagination
+
+        Returns {"results": [...], "next_cursor": str or None}.
+        """
+        if not self.is_connected() or not search_term or not search_term.strip():
+            return {"results": [], "next_cursor": None}
+
+        if self._search_rpc_available:
+            try:
+                return self.search_engine.search(search_term, limit=limit, cursor=cursor)
+            except ValueError:
+                raise
+            except Exception as e:
+                print(f" Full-text search failed, falling back to ilike search: {str(e)}")
+                if 'PGRST202' in str(e) or 'Could not find the function' in str(e):
+                    # Migration 002_startup_search.sql not applied
+                    self._search_rpc_available = False
+
+        return {"results": self._ilike_search_startups(search_term, limit), "next_cursor": None}
+
+    def get_embedding_pipeline(self) -> StartupEmbeddingPipeline:
+        """Shared embedding pipeline writing to the pgvector startup_embeddings table"""
+        if self.embedding_pipeline is None:
+            with self._writer_lock:
+                if self.embedding_pipeline is None:
+                    self.embedding_pipeline = StartupEmbeddingPipeline(index=PgVectorStartupIndex(self))
+        return self.embedding_pipeline
+
+    def embed_startup_async(self, profile: Dict[str, Any]):
+        """Queue a profile's text fields for embedding (unchanged fields are skipped by hash)"""
+        if not self.is_connected() or not self._semantic_rpc_available:
+            return None
+        try:
+            return self.get_embedding_pipeline().submit(profile)
+        except Exception as e:
+            print(f" Error queueing startup embedding: {str(e)}")
+            return None
+
+    def backfill_startup_embeddings(self, page_size: int = 200) -> Dict[str, int]:
+        """Embed every active startup that is missing vectors or whose text changed"""
         if not self.is_connected():
+            return {"startups": 0, "embedded": 0, "skipped": 0}
+        return self.get_embedding_pipeline().backfill(self, page_size=page_size)
+
+    def semantic_search_startups(self, query: str, limit: int = 20, mode: str = "hybrid") -> List[Dict[str, Any]]:
+        """Concept search over startup descriptions: vector, keyword or hybrid (RRF) ranking"""
+        if not self.is_connected() or not query or not query.strip():
             return []
-            
+        search_type = SearchType(mode)
+
+        if self._semantic_rpc_available:
+            try:
+                return self.get_embedding_pipeline().search(query, limit=limit, search_type=search_type)
+            except Exception as e:
+                print(f" Semantic search failed, falling back to full-text search: {str(e)}")
+                if 'PGRST202' in str(e) or 'Could not find the function' in str(e):
+                    # Migration 003_startup_embeddings.sql not applied
+                    self._semantic_rpc_available = False
+
+        return self.search_startups(query, limit=limit)
+
+    def _ilike_search_startups(self, search_term: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Unranked pattern search, used only when the full-text RPC is unavailable"""
         try:
             search_pattern = f"%{search_term}%"
             result = self.supabase.table('startup_profiles')\
@@ -585,16 +828,71 @@ class DatabaseManager:
         
     # Retrieval Integration - Add these methods to DatabaseManager class
 
-    def initialize_memory_graph(self):
-        """Initialize and populate the memory graph"""
-        
+    def initialize_memory_graph(self, page_size: int = 500, snapshot_path: str = MEMORY_GRAPH_SNAPSHOT,
+                                rebuild: bool = False):
+        """Initialize and populate the memory graph
+
+        Restarts load the last snapshot and replay its change log instead of
+        re-reading every startup. rebuild=True (or a missing snapshot) builds
+        from the database and writes a fresh snapshot. With
+        MEMORY_GRAPH_SHARED_DIR set the graph is shared between workers instead.
+        """
+        if MEMORY_GRAPH_SHARED_DIR:
+            self.shared_graph = SharedMemoryGraph(memory_graph, MEMORY_GRAPH_SHARED_DIR)
+            role = self.shared_graph.start(build=lambda graph: self._build_memory_graph(graph, page_size))
+            print(f" Shared memory graph attached as {role} (generation {memory_graph.generation})")
+            return memory_graph
+
+        if snapshot_path and not rebuild and os.path.exists(snapshot_path):
+            stats = memory_graph.restore(snapshot_path)
+            if stats:
+                print(f" Memory graph loaded from snapshot generation {stats['generation']} "
+                      f"in {stats['load_ms']}ms ({stats['replayed']} logged changes replayed)")
+                self._start_checkpoints(snapshot_path)
+                return memory_graph
+
+        if not self._build_memory_graph(memory_graph, page_size):
+            return None
+        if snapshot_path:
+            try:
+                stats = memory_graph.save_snapshot(snapshot_path)
+                print(f" Memory graph snapshot written ({stats['bytes']:,} bytes in {stats['seconds']}s)")
+                self._start_checkpoints(snapshot_path)
+            except Exception as e:
+                print(f" Error writing memory graph snapshot: {str(e)}")
+        return memory_graph
+
+    def _build_memory_graph(self, graph: MemoryGraph, page_size: int) -> bool:
+        """Hydrate graph from the database. False if the build could not finish, so callers don't snapshot it"""
         if not self.is_connected():
             print(" Database not connected. Cannot initialize memory graph.")
-            return None
+            return False
         
         # Build the graph from existing data
-        memory_graph.build_startup_graph_from_db(self)
-        return memory_graph
+        stats = graph.build_startup_graph_from_db(self, page_size=page_size)
+        if stats.get("error"):
+            print(f" Memory graph build stopped early: {stats['error']}. Not snapshotting the partial graph.")
+            return False
+        return True
+
+    def _start_checkpoints(self, snapshot_path: str):
+        """Periodically re-snapshot so the change log (and restart replay) stays bounded"""
+        if self._checkpoint_thread is not None:
+            return
+        self._checkpoint_thread = threading.Thread(target=self._checkpoint_loop, args=(snapshot_path,),
+                                                   name="memory-graph-checkpoint", daemon=True)
+        self._checkpoint_thread.start()
+
+    def _checkpoint_loop(self, snapshot_path: str):
+        while not self._checkpoint_stop.wait(MEMORY_GRAPH_CHECKPOINT_POLL):
+            try:
+                stats = memory_graph.checkpoint(snapshot_path, MEMORY_GRAPH_CHECKPOINT_ENTRIES,
+                                                MEMORY_GRAPH_CHECKPOINT_SECONDS)
+                if stats:
+                    print(f" Memory graph checkpoint: generation {stats['generation']} "
+                          f"({stats['bytes']:,} bytes in {stats['seconds']}s)")
+            except Exception as e:
+                print(f" Error checkpointing memory graph: {str(e)}")
 
     def get_enhanced_chatbot_context(self, startup_id: str, query: str) -> Dict[str, Any]:
         """Get enhanced context using both database and memory graph"""
@@ -608,18 +906,26 @@ class DatabaseManager:
         conversation_history = self.get_startup_conversation_context(startup_id, limit=5)
         
         # Get graph-based context
-        graph_context = memory_graph.get_chatbot_context(startup_id, query)
+        graph_context = self._graph_context(startup_id, query)
         
+        return self._enhanced_context(startup_data, conversation_history, graph_context)
+
+    def _graph_context(self, startup_id: str, query: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Memory graph chat context and similar startups"""
+        return (memory_graph.get_chatbot_context(startup_id, query),
+                memory_graph.find_similar_startups(startup_id, limit=SIMILAR_STARTUPS_LIMIT))
+
+    def _enhanced_context(self, startup_data: Dict[str, Any], conversation_history: List[Dict[str, Any]],
+                          graph_context: Tuple[Dict[str, Any], List[Dict[str, Any]]]) -> Dict[str, Any]:
         # Combine all contexts
-        enhanced_context = {
+        relationships, similar_startups = graph_context
+        return {
             "startup_data": startup_data,
             "conversation_history": conversation_history,
-            "graph_relationships": graph_context,
-            "similar_startups": memory_graph.find_similar_startups(startup_id),
-            "query_focus": graph_context.get("focus", "general")
+            "graph_relationships": relationships,
+            "similar_startups": similar_startups,
+            "query_focus": relationships.get("focus", "general")
         }
-        
-        return enhanced_context
 
     def save_startup_with_graph_update(self, startup_data: Dict[str, Any]) -> Optional[str]:
         """Save startup and update memory graph"""
@@ -628,36 +934,32 @@ class DatabaseManager:
         startup_id = self.save_startup_profile(startup_data)
         
         if startup_id:
-            # Add to memory graph
-            memory_graph.add_entity(
-                entity_id=startup_id,
-                entity_type="startup",
-                properties=startup_data
-            )
-            
-            # Add relationships
-            if startup_data.get('industry_sector'):
-                industry_id = f"industry_{startup_data['industry_sector'].replace(' ', '_').lower()}"
-                memory_graph.add_entity(
-                    entity_id=industry_id,
-                    entity_type="industry",
-                    properties={"name": startup_data['industry_sector']}
-                )
-                memory_graph.add_relationship(startup_id, industry_id, "operates_in")
-            
-            # Add founder relationships
-            if startup_data.get('founders'):
-                for founder in startup_data['founders']:
-                    founder_id = f"founder_{founder.get('name', '').replace(' ', '_').lower()}"
-                    memory_graph.add_entity(
-                        entity_id=founder_id,
-                        entity_type="founder",
-                        properties=founder
-                    )
-                    memory_graph.add_relationship(startup_id, founder_id, "founded_by")
+            self._add_startup_to_graph(startup_id, startup_data)
         
         return startup_id
 
+    def _add_startup_to_graph(self, startup_id: str, startup_data: Dict[str, Any]):
+        """Add a saved startup to the memory graph the way hydration does, then score its similar and competing startups
+
+        Going through add_startup_from_row with the row hydration would read
+        back gives a signup the same entity, properties and in_stage /
+        located_in / employs / experience edges it gets after a restart.
+        """
+        memory_graph.add_startup_from_row(self._graph_row(startup_id, startup_data))
+
+        # Score the new startup against its candidate block so it shows up in similar-startup results now
+        memory_graph.refresh_startup_similarity(startup_id)
+        # ... and re-score its text competitors against the last batch build
+        memory_graph.refresh_startup_competitors(startup_id)
+
+    def _graph_row(self, startup_id: str, startup_data: Dict[str, Any]) -> Dict[str, Any]:
+        """GRAPH_STARTUP_COLUMNS of the saved startup_profiles row plus its founders and team_members rows"""
+        profile = self._startup_row({**startup_data, 'startup_id': startup_id})
+        row = {column: profile.get(column) for column in GRAPH_STARTUP_COLUMNS.split(', ')}
+        row['founders'] = self._founder_rows(startup_id, startup_data.get('founders') or [])
+        row['team_members'] = self._team_member_rows(startup_id, startup_data.get('team_members') or [])
+        return row
+
     # Usage example in your agent/chatbot
     def get_intelligent_response(startup_id: str, user_query: str) -> str:
         """Example of how to use enhanced context in your chatbot"""
@@ -696,7 +998,11 @@ class DatabaseManager:
         return context_string  # Feed this to your AI agent
     
     def get_startup_by_company_name(self, company_name: str):
-        """Get startup data by company name (case-insensitive search)"""
+        """Get startup data by company name (case-insensitive search), read through the profile cache"""
+        cached = self.profile_cache.get_by_name(company_name)
+        if cached is not None:
+            return cached
+
         try:
             # Using ilike for case-insensitive search
             response = self.supabase.table('startup_profiles').select('*').ilike('company_name', f'%{company_name}%').execute()
@@ -704,6 +1010,7 @@ class DatabaseManager:
             if response.data and len(response.data) > 0:
                 # If multiple matches, return the first one
                 # You might want to add logic to handle multiple matches differently
+                self.profile_cache.put(response.data[0], name=company_name)
                 return response.data[0]
             else:
                 return None
@@ -713,28 +1020,125 @@ class DatabaseManager:
             return None
 
     def get_startup_by_name_or_id(self, identifier: str):
-            """Get startup data by either company name or startup_id"""
-            try:
-                print(f"Searching for startup with identifier: {identifier}")
-                
-                # First, try to get by startup_id
-                startup_data = self.get_startup_profile(identifier)
-                if startup_data:
-                    print(f"Found startup by ID: {startup_data.get('company_name')}")
-                    return startup_data
-                
-                # If not found by ID, try searching by company name
-                startup_data = self.get_startup_by_company_name(identifier)
-                if startup_data:
-                    print(f"Found startup by name: {startup_data.get('company_name')}")
-                    return startup_data
-                
-                print(f"No startup found with identifier: {identifier}")
-                return None
-                
-            except Exception as e:
-                print(f"Error in get_startup_by_name_or_id: {e}")
-                return None
+        """Get startup data by either company name or startup_id"""
+        return self.resolve_startup(identifier)
+
+    def resolve_startup(self, identifier) -> Optional[Dict[str, Any]]:
+        """Resolve a startup by id or name in a single round trip
+
+        Accepts a startup_id, a company name, or an already-resolved profile row
+        (returned as-is). Exact id beats exact normalized name beats fuzzy match,
+        with deterministic tie-breaking, so the same identifier always resolves
+        to the same row.
+        """
+        if isinstance(identifier, dict):
+            return identifier if identifier.get('startup_id') else None
+        if not identifier or not str(identifier).strip():
+            return None
+        identifier = str(identifier).strip()
+
+        cached = self.profile_cache.resolve(identifier)
+        if cached is not None:
+            return cached
+
+        if not self.is_connected():
+            return None
+
+        try:
+            startup_data = None
+            use_fallback = not self._resolve_rpc_available
+            if self._resolve_rpc_available:
+                try:
+                    response = self.supabase.rpc('resolve_startup', {'p_identifier': identifier}).execute()
+                    startup_data = response.data[0] if response.data else None
+                except Exception as e:
+                    print(f" resolve_startup RPC failed, falling back to PostgREST filter: {e}")
+                    use_fallback = True
+                    if 'PGRST202' in str(e) or 'Could not find the function' in str(e):
+                        # Migration 001_resolve_startup.sql not applied; stop trying the RPC
+                        self._resolve_rpc_available = False
+
+            if use_fallback:
+                # Exact id or name first, so a common name's exact match can't be cut by the substring query's limit
+                for exact in (True, False):
+                    response = self._resolve_query(self.supabase, identifier, exact).execute()
+                    startup_data = self._best_startup_match(identifier, response.data or [], exact)
+                    if startup_data:
+                        break
+
+            return self._resolved(identifier, startup_data)
+
+        except Exception as e:
+            print(f"Error in resolve_startup: {e}")
+            return None
+
+    def _resolve_query(self, client, identifier: str, exact: bool):
+        """PostgREST fallback for resolve_startup: rows matching the id, or whose name equals (exact) or contains it
+
+        Words of the normalized name are joined with * so the column's case
+        and spacing don't matter. Rows are ordered by name and id before the
+        limit, so the candidates _best_startup_match ranks are deterministic.
+        """
+        pattern = '*'.join(self._like_escape(word) for word in ProfileCache.normalize_name(identifier).split())
+        if not exact:
+            pattern = f'*{pattern}*'
+        return client.table('startup_profiles')\
+            .select('*')\
+            .or_(f"startup_id.eq.{self._postgrest_quote(identifier)},"
+                 f"company_name.ilike.{self._postgrest_quote(pattern)}")\
+            .order('company_name')\
+            .order('startup_id')\
+            .limit(25)
+
+    def _like_escape(self, value: str) -> str:
+        """Escape LIKE metacharacters so user input matches literally
+
+        PostgREST turns every * into %, so a literal * cannot be expressed; it
+        becomes the single-character wildcard _ and _best_startup_match drops
+        rows that do not really match the name.
+        """
+        escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return escaped.replace('*', '_')
+
+    def _resolved(self, identifier: str, startup_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Cache and log the outcome of resolve_startup"""
+        if startup_data:
+            self.profile_cache.put(startup_data, name=identifier)
+            print(f"Resolved startup {identifier!r} -> {startup_data.get('startup_id')}")
+        else:
+            print(f"No startup found with identifier: {identifier}")
+        return startup_data
+
+    def _postgrest_quote(self, value: str) -> str:
+        """Quote a value for a PostgREST or=() filter so commas and parentheses are literal"""
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        return f'"{escaped}"'
+
+    def _best_startup_match(self, identifier: str, rows: List[Dict[str, Any]],
+                            exact: bool = False) -> Optional[Dict[str, Any]]:
+        """Pick the deterministic best row: id, exact name, prefix, then substring match (only the first two if exact)"""
+        needle = ProfileCache.normalize_name(identifier)
+
+        def rank(row):
+            name = ProfileCache.normalize_name(row.get('company_name') or '')
+            if row.get('startup_id') == identifier:
+                match_rank = 0
+            elif name == needle:
+                match_rank = 1
+            elif name.startswith(needle):
+                match_rank = 2
+            else:
+                match_rank = 3
+            return (match_rank, not row.get('is_active', True), len(name),
+                    str(row.get('created_at') or ''), str(row.get('startup_id')))
+
+        def matches(row):
+            name = ProfileCache.normalize_name(row.get('company_name') or '')
+            return name == needle if exact else needle in name
+
+        # The fallback pattern can over-match (see _like_escape), keep only real id or name matches
+        rows = [row for row in rows if row.get('startup_id') == identifier or matches(row)]
+        return min(rows, key=rank) if rows else None
         
     def search_startups_by_name(self, company_name: str, limit: int = 5):
         """Search for multiple startups by company name (returns list of matches)"""
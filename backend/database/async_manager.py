@@ -0,0 +1,492 @@
+import asyncio
+from typing import Dict, List, Any, Optional
+
+from supabase import acreate_client
+
+from database.DatabaseManager import (DatabaseManager, ConversationRecord, MEMORY_GRAPH_SNAPSHOT,
+                                      INVESTOR_REQUIRED_FIELDS, STARTUP_REQUIRED_FIELDS)
+from database.search_engine import PostgresStartupSearch
+
+
+class AsyncDatabaseManager:
+    """asyncio counterpart of DatabaseManager on the async supabase/postgrest client
+
+    Same method surface, with every database call a coroutine, so FastAPI
+    routes can await them on the event loop instead of holding a threadpool
+    thread per request. Row building, the profile cache, the RPC
+    availability flags and the background pieces (conversation write-behind,
+    embedding pipeline, memory graph hydration) are shared with the
+    DatabaseManager it wraps. Independent reads run concurrently with
+    asyncio.gather: get_enhanced_chatbot_context takes as long as its
+    slowest fetch rather than the sum. Work without an async client (the
+    embedding pipeline, graph hydration) and CPU-bound memory graph calls
+    run in a worker thread.
+
+    The async client belongs to an event loop, so connect() is awaited from
+    the loop that serves requests (the FastAPI startup event).
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+        self.memory_graph = db_manager.memory_graph
+        self.profile_cache = db_manager.profile_cache
+        self.search_engine = PostgresStartupSearch(self)
+        self.supabase = None
+        self.connected = False
+
+    @property
+    def shared_graph(self):
+        return self.db.shared_graph
+
+    async def connect(self) -> bool:
+        """Create the async client and test it"""
+        try:
+            self.supabase = await acreate_client(self.db.supabase_url, self.db.supabase_key)
+            await self.supabase.table('startup_profiles').select('startup_id').limit(1).execute()
+            self.connected = True
+            print(" Async database connection successful")
+        except Exception as e:
+            print(f" Async database connection failed: {str(e)}")
+            self.connected = False
+            self.supabase = None
+        return self.connected
+
+    def is_connected(self) -> bool:
+        """Check if the async client is connected"""
+        return self.connected and self.supabase is not None
+
+    async def get_conversation_history(self, session_id: str, limit: int = 10):
+        """Get conversation history for a session"""
+        try:
+            response = await self.supabase.table('conversations').select('*').eq('session_id', session_id)\
+                .order('timestamp', desc=True).limit(limit).execute()
+            return response.data if response.data else []
+        except Exception as e:
+            print(f"Error getting conversation history: {e}")
+            return []
+
+    # INVESTOR AND STARTUP PROFILE MANAGEMENT
+
+    def generate_investor_id(self, investor_name: str) -> str:
+        return self.db.generate_investor_id(investor_name)
+
+    def generate_startup_id(self, company_name: str) -> str:
+        return self.db.generate_startup_id(company_name)
+
+    async def save_investor_profile(self, investor_data: Dict[str, Any]) -> Optional[str]:
+        """Save complete Investor profile to database with validation"""
+        if not self.is_connected():
+            print(" Database not connected")
+            return None
+
+        missing = self.db._missing_field(investor_data, INVESTOR_REQUIRED_FIELDS)
+        if missing:
+            print(f" Missing required field: {missing}")
+            return None
+
+        try:
+            result = await self.supabase.table('investor_profiles').insert(self.db._investor_row(investor_data)).execute()
+            if not result.data:
+                print(" Failed to insert Investor profile")
+                return None
+
+            investor_id = result.data[0]['investor_id']
+            print(f" Investor profile saved with ID: {investor_id}")
+            return investor_id
+
+        except Exception as e:
+            print(f" Error saving Investor profile: {str(e)}")
+            return None
+
+    async def save_startup_profile(self, startup_data: Dict[str, Any]) -> Optional[str]:
+        """Save complete startup profile to database with validation, then founders and team members together"""
+        if not self.is_connected():
+            print(" Database not connected")
+            return None
+
+        missing = self.db._missing_field(startup_data, STARTUP_REQUIRED_FIELDS)
+        if missing:
+            print(f" Missing required field: {missing}")
+            return None
+
+        try:
+            profile_data = self.db._startup_row(startup_data)
+            result = await self.supabase.table('startup_profiles').insert(profile_data).execute()
+            if not result.data:
+                print(" Failed to insert startup profile")
+                return None
+
+            startup_id = result.data[0]['startup_id']
+            print(f" Startup profile saved with ID: {startup_id}")
+            self.db._after_startup_saved(startup_id, profile_data)
+
+            await asyncio.gather(
+                self.save_founders(startup_id, startup_data.get('founders') or []),
+                self.save_team_members(startup_id, startup_data.get('team_members') or [])
+            )
+            return startup_id
+
+        except Exception as e:
+            print(f" Error saving startup profile: {str(e)}")
+            return None
+
+    # AI AGENT SPECIFIC METHODS
+
+    async def get_startup_for_insights(self, startup_id: str) -> Optional[Dict[str, Any]]:
+        """Get startup data formatted for AI insights generation"""
+        if not self.is_connected():
+            return None
+
+        try:
+            startup_data = await self.get_startup_profile(startup_id)
+            return self.db._parse_profile_json(startup_data) if startup_data else None
+        except Exception as e:
+            print(f"Error getting startup for insights: {str(e)}")
+            return None
+
+    async def save_startup_insights(self, startup_id: str, insights_data: Dict[str, Any]) -> Optional[str]:
+        """Save AI-generated insights for a startup"""
+        if not self.is_connected():
+            return None
+
+        try:
+            # Mark previous insights as not current first, so the new row stays current
+            await self.supabase.table('startup_insights')\
+                .update({'is_current': False})\
+                .eq('startup_id', startup_id)\
+                .execute()
+            result = await self.supabase.table('startup_insights')\
+                .insert(self.db._insight_row(startup_id, insights_data))\
+                .execute()
+            self.profile_cache.invalidate(startup_id)
+            return result.data[0]['id'] if result.data else None
+
+        except Exception as e:
+            print(f"Error saving startup insights: {str(e)}")
+            return None
+
+    async def get_startup_insights(self, startup_id: str) -> Optional[Dict[str, Any]]:
+        """Get current AI insights for a startup"""
+        if not self.is_connected():
+            return None
+
+        try:
+            result = await self.supabase.table('startup_insights')\
+                .select('*')\
+                .eq('startup_id', startup_id)\
+                .eq('is_current', True)\
+                .order('generated_at', desc=True)\
+                .limit(1)\
+                .execute()
+            return self.db._parse_insights(result.data[0]) if result.data else None
+
+        except Exception as e:
+            print(f"Error getting startup insights: {str(e)}")
+            return None
+
+    # CHATBOT SPECIFIC METHODS
+
+    async def save_conversation_with_context(self, conversation_data: ConversationRecord) -> Optional[str]:
+        """Save conversation with enhanced context for chatbot"""
+        if not self.is_connected():
+            return None
+
+        try:
+            result = await self.supabase.table('conversations')\
+                .insert(self.db._conversation_row(conversation_data))\
+                .execute()
+            return result.data[0]['id'] if result.data else None
+        except Exception as e:
+            print(f"Error saving conversation: {str(e)}")
+            return None
+
+    def queue_conversation(self, conversation_data: ConversationRecord) -> bool:
+        """Queue a conversation for batched write-behind persistence (never waits on the database)"""
+        return self.db.queue_conversation(conversation_data)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.db.cache_stats()
+
+    async def close(self):
+        """Close the async client's connections; the wrapped DatabaseManager is closed by its owner"""
+        if self.supabase is not None:
+            await self.supabase.postgrest.aclose()
+            self.supabase = None
+            self.connected = False
+
+    async def get_startup_conversation_context(self, startup_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get recent conversations for a specific startup as context"""
+        if not self.is_connected():
+            return []
+
+        try:
+            result = await self.supabase.table('conversations')\
+                .select('query', 'response', 'timestamp')\
+                .eq('startup_id', startup_id)\
+                .order('timestamp', desc=True)\
+                .limit(limit)\
+                .execute()
+            return result.data
+        except Exception as e:
+            print(f"Error getting conversation context: {str(e)}")
+            return []
+
+    async def get_similar_startups_for_context(self, startup_id: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """Get similar startups for comparative context in chatbot"""
+        if not self.is_connected():
+            return []
+
+        try:
+            current_startup = await self.get_startup_profile(startup_id)
+            if not current_startup:
+                return []
+
+            result = await self.supabase.table('startup_profiles')\
+                .select('startup_id', 'company_name', 'industry_sector', 'stage', 'monthly_revenue', 'funding_stage')\
+                .eq('industry_sector', current_startup['industry_sector'])\
+                .neq('startup_id', startup_id)\
+                .eq('is_active', True)\
+                .order('created_at', desc=True)\
+                .limit(limit)\
+                .execute()
+            return result.data
+        except Exception as e:
+            print(f"Error getting similar startups: {str(e)}")
+            return []
+
+    # =================== SEARCH & RETRIEVAL =====================
+
+    async def get_startup_profile(self, startup_id: str):
+        """Get startup data by startup_id, read through the profile cache"""
+        cached = self.profile_cache.get(startup_id)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await self.supabase.table('startup_profiles').select('*').eq('startup_id', startup_id).execute()
+            if response.data:
+                self.profile_cache.put(response.data[0])
+                return response.data[0]
+            return None
+        except Exception as e:
+            print(f"Error getting startup by ID: {e}")
+            return None
+
+    async def _insert_rows(self, table: str, rows: List[Dict[str, Any]], what: str):
+        """Insert rows one request each, concurrently; a failed row does not stop the others"""
+        results = await asyncio.gather(
+            *(self.supabase.table(table).insert(row).execute() for row in rows),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f" Error saving {what}: {str(result)}")
+
+    async def save_founders(self, startup_id: str, founders: List[Dict[str, Any]]):
+        """Save founder information with validation"""
+        if not self.is_connected():
+            return None
+
+        try:
+            await self._insert_rows('founders', self.db._founder_rows(startup_id, founders), "founders")
+        finally:
+            self.profile_cache.invalidate(startup_id)
+
+    async def save_team_members(self, startup_id: str, team_members: List[Dict[str, Any]]):
+        """Save team member information with validation"""
+        if not self.is_connected():
+            return None
+
+        try:
+            await self._insert_rows('team_members', self.db._team_member_rows(startup_id, team_members),
+                                    "team members")
+        finally:
+            self.profile_cache.invalidate(startup_id)
+
+    async def get_all_startups(self, filters: Dict[str, Any] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get all startup profiles with optional filters"""
+        if not self.is_connected():
+            return []
+
+        try:
+            result = await self.db._startups_query(self.supabase, filters, limit).execute()
+            return result.data or []
+        except Exception as e:
+            print(f" Error retrieving startups: {str(e)}")
+            return []
+
+    async def get_startup_graph_page(self, after_id: str = None, limit: int = 500) -> List[Dict[str, Any]]:
+        """One keyset page of active startups ordered by startup_id (see DatabaseManager.get_startup_graph_page)"""
+        if self.db._embedded_select_available:
+            try:
+                return (await self.db._graph_page_query(self.supabase, True, after_id, limit).execute()).data or []
+            except Exception as e:
+                if not self.db._embedded_select_unavailable(e):
+                    raise
+
+        return (await self.db._graph_page_query(self.supabase, False, after_id, limit).execute()).data or []
+
+    async def attach_founders_and_team(self, startups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fill founders/team_members on rows that lack them, both tables queried at once"""
+        missing = [row['startup_id'] for row in startups if 'founders' not in row or 'team_members' not in row]
+        if not missing:
+            return startups
+
+        founders, team_members = await asyncio.gather(
+            self.supabase.table('founders').select('*').in_('startup_id', missing).execute(),
+            self.supabase.table('team_members').select('*').in_('startup_id', missing).execute()
+        )
+        return self.db._attach_people(startups, founders.data, team_members.data)
+
+    async def search_startups(self, search_term: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Ranked full-text search, returns the first page of results"""
+        return (await self.search_startups_page(search_term, limit=limit))["results"]
+
+    async def search_startups_page(self, search_term: str, limit: int = 20, cursor: str = None) -> Dict[str, Any]:
+        """Ranked full-text search with highlighted snippets and keyset pagination"""
+        if not self.is_connected() or not search_term or not search_term.strip():
+            return {"results": [], "next_cursor": None}
+
+        if self.db._search_rpc_available:
+            try:
+                return await self.search_engine.search_async(search_term, limit=limit, cursor=cursor)
+            except ValueError:
+                raise
+            except Exception as e:
+                print(f" Full-text search failed, falling back to ilike search: {str(e)}")
+                if 'PGRST202' in str(e) or 'Could not find the function' in str(e):
+                    # Migration 002_startup_search.sql not applied
+                    self.db._search_rpc_available = False
+
+        return {"results": await self._ilike_search_startups(search_term, limit), "next_cursor": None}
+
+    def get_embedding_pipeline(self):
+        return self.db.get_embedding_pipeline()
+
+    def embed_startup_async(self, profile: Dict[str, Any]):
+        """Queue a profile's text fields for embedding (already runs in the background)"""
+        return self.db.embed_startup_async(profile)
+
+    async def backfill_startup_embeddings(self, page_size: int = 200) -> Dict[str, int]:
+        """Embed every active startup that is missing vectors or whose text changed"""
+        return await asyncio.to_thread(self.db.backfill_startup_embeddings, page_size)
+
+    async def semantic_search_startups(self, query: str, limit: int = 20, mode: str = "hybrid") -> List[Dict[str, Any]]:
+        """Concept search over startup descriptions; the embedding call and pgvector RPC run in a worker thread"""
+        return await asyncio.to_thread(self.db.semantic_search_startups, query, limit, mode)
+
+    async def _ilike_search_startups(self, search_term: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Unranked pattern search, used only when the full-text RPC is unavailable"""
+        try:
+            search_pattern = f"%{search_term}%"
+            result = await self.supabase.table('startup_profiles')\
+                .select('startup_id, company_name, industry_sector, problem_statement, solution_description, stage, funding_stage')\
+                .or_(f"company_name.ilike.{search_pattern},industry_sector.ilike.{search_pattern},problem_statement.ilike.{search_pattern}")\
+                .eq('is_active', True)\
+                .order('created_at', desc=True)\
+                .limit(limit)\
+                .execute()
+            return result.data or []
+        except Exception as e:
+            print(f" Error searching startups: {str(e)}")
+            return []
+
+    # =================== MEMORY GRAPH =====================
+
+    async def initialize_memory_graph(self, page_size: int = 500, snapshot_path: str = MEMORY_GRAPH_SNAPSHOT,
+                                      rebuild: bool = False):
+        """Load or build the memory graph in a worker thread (hydration uses the blocking client)"""
+        return await asyncio.to_thread(self.db.initialize_memory_graph, page_size, snapshot_path, rebuild)
+
+    async def get_enhanced_chatbot_context(self, startup_id: str, query: str) -> Dict[str, Any]:
+        """Profile, conversation history and graph context, fetched concurrently"""
+        startup_data, conversation_history, graph_context = await asyncio.gather(
+            self.get_startup_for_insights(startup_id),
+            self.get_startup_conversation_context(startup_id, limit=5),
+            asyncio.to_thread(self.db._graph_context, startup_id, query)
+        )
+        if not startup_data:
+            return {}
+        return self.db._enhanced_context(startup_data, conversation_history, graph_context)
+
+    async def save_startup_with_graph_update(self, startup_data: Dict[str, Any]) -> Optional[str]:
+        """Save startup and update memory graph"""
+        startup_id = await self.save_startup_profile(startup_data)
+        if startup_id:
+            await asyncio.to_thread(self.db._add_startup_to_graph, startup_id, startup_data)
+        return startup_id
+
+    # =================== LOOKUPS =====================
+
+    async def get_startup_by_company_name(self, company_name: str):
+        """Get startup data by company name (case-insensitive search), read through the profile cache"""
+        cached = self.profile_cache.get_by_name(company_name)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await self.supabase.table('startup_profiles').select('*')\
+                .ilike('company_name', f'%{company_name}%').execute()
+            if response.data:
+                self.profile_cache.put(response.data[0], name=company_name)
+                return response.data[0]
+            return None
+        except Exception as e:
+            print(f"Error searching by company name: {e}")
+            return None
+
+    async def get_startup_by_name_or_id(self, identifier: str):
+        """Get startup data by either company name or startup_id"""
+        return await self.resolve_startup(identifier)
+
+    async def resolve_startup(self, identifier) -> Optional[Dict[str, Any]]:
+        """Resolve a startup by id or name in a single round trip (see DatabaseManager.resolve_startup)"""
+        if isinstance(identifier, dict):
+            return identifier if identifier.get('startup_id') else None
+        if not identifier or not str(identifier).strip():
+            return None
+        identifier = str(identifier).strip()
+
+        cached = self.profile_cache.resolve(identifier)
+        if cached is not None:
+            return cached
+
+        if not self.is_connected():
+            return None
+
+        try:
+            startup_data = None
+            use_fallback = not self.db._resolve_rpc_available
+            if self.db._resolve_rpc_available:
+                try:
+                    response = await self.supabase.rpc('resolve_startup', {'p_identifier': identifier}).execute()
+                    startup_data = response.data[0] if response.data else None
+                except Exception as e:
+                    print(f" resolve_startup RPC failed, falling back to PostgREST filter: {e}")
+                    use_fallback = True
+                    if 'PGRST202' in str(e) or 'Could not find the function' in str(e):
+                        # Migration 001_resolve_startup.sql not applied; stop trying the RPC
+                        self.db._resolve_rpc_available = False
+
+            if use_fallback:
+                for exact in (True, False):
+                    response = await self.db._resolve_query(self.supabase, identifier, exact).execute()
+                    startup_data = self.db._best_startup_match(identifier, response.data or [], exact)
+                    if startup_data:
+                        break
+
+            return self.db._resolved(identifier, startup_data)
+
+        except Exception as e:
+            print(f"Error in resolve_startup: {e}")
+            return None
+
+    async def search_startups_by_name(self, company_name: str, limit: int = 5):
+        """Search for multiple startups by company name (returns list of matches)"""
+        try:
+            response = await self.supabase.table('startup_profiles').select('*')\
+                .ilike('company_name', f'%{company_name}%').limit(limit).execute()
+            return response.data if response.data else []
+        except Exception as e:
+            print(f"Error searching startups by name: {e}")
+            return []
@@ -0,0 +1,352 @@
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+from agno.vectordb.search import SearchType
+
+EMBEDDING_FIELDS = ['problem_statement', 'solution_description', 'target_market', 'competitive_advantage']
+EMBEDDING_DIMENSIONS = 1536  # Must match the vector(...) column in 003_startup_embeddings.sql
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "text-embedding-3-small")
+RESULT_COLUMNS = ['startup_id', 'company_name', 'industry_sector', 'problem_statement',
+                  'solution_description', 'stage', 'funding_stage']
+RRF_K = 60  # Reciprocal rank fusion constant, same default as most hybrid retrievers
+MAX_RESULTS = 100
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def field_texts(profile: Dict[str, Any]) -> Dict[str, str]:
+    """Non-empty embeddable fields of a profile, whitespace-normalized"""
+    texts = {}
+    for field in EMBEDDING_FIELDS:
+        text = " ".join(str(profile.get(field) or "").split())
+        if text:
+            texts[field] = text
+    return texts
+
+
+class OpenAIBatchEmbedder:
+    """Batched embeddings through agno's OpenAIEmbedder client (one request per batch)"""
+
+    def __init__(self, model: str = EMBEDDING_MODEL, dimensions: int = EMBEDDING_DIMENSIONS):
+        from agno.embedder.openai import OpenAIEmbedder
+
+        self.model = model
+        self.dimensions = dimensions
+        self._embedder = OpenAIEmbedder(id=model, dimensions=dimensions)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        response = self._embedder.client.embeddings.create(
+            input=texts, model=self.model, dimensions=self.dimensions
+        )
+        vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class HashingEmbedder:
+    """Deterministic CPU embedding stand-in for local development and tests
+
+    Signed feature hashing of word unigrams and bigrams, L2-normalized. It has
+    no notion of synonyms, but texts that share vocabulary land close together,
+    which is enough to exercise the pipeline and the indexes without an API key.
+    """
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.model = f"local-hashing-{dimensions}"
+        self.dimensions = dimensions
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _bucket(feature: str, dimensions: int) -> Tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % dimensions, (1.0 if value >> 63 else -1.0)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = re.findall(r"[a-z0-9]+", text.lower())
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            for feature in features:
+                bucket, sign = self._bucket(feature, self.dimensions)
+                vectors[row, bucket] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def default_embedder():
+    """OpenAI embeddings when a key is configured, otherwise the local hashing stand-in"""
+    if os.environ.get("OPENAI_API_KEY"):
+        return OpenAIBatchEmbedder()
+    print(" OPENAI_API_KEY not set, using the local hashing embedder for semantic search")
+    return HashingEmbedder()
+
+
+def _vector_weight(search_type: SearchType, vector_weight: float) -> float:
+    """Fusion weight of the vector ranking; pure modes switch the other side off"""
+    return {SearchType.vector: 1.0, SearchType.keyword: 0.0}.get(search_type, vector_weight)
+
+
+def _fuse(ranked_lists: List[Tuple[List[str], float]], limit: int) -> List[Tuple[str, float]]:
+    """Weighted reciprocal rank fusion of several ranked id lists"""
+    scores = {}
+    for ids, weight in ranked_lists:
+        for position, startup_id in enumerate(ids):
+            scores[startup_id] = scores.get(startup_id, 0.0) + weight / (RRF_K + position + 1)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+class NumpyVectorIndex:
+    """In-memory brute-force stand-in for PgVectorStartupIndex
+
+    Keeps one normalized vector per (startup_id, field) in a dense matrix and
+    scores a query with a single matrix-vector product. A startup's vector
+    score is its best-matching field. Keyword scores are the fraction of query
+    terms found in the startup's text, fused with the vector ranking by RRF
+    exactly like the Postgres function.
+    """
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+        self._keys = []  # (startup_id, field) per matrix row
+        self._rows = {}  # (startup_id, field) -> row
+        self._hashes = {}
+        self._matrix = np.zeros((0, dimensions), dtype=np.float32)
+        self._profiles = {}
+        self._terms = {}
+        self._lock = threading.RLock()
+
+    def get_hashes(self, startup_ids: List[str], model: str) -> Dict[Tuple[str, str], str]:
+        wanted = set(startup_ids)
+        with self._lock:
+            return {key: h for key, h in self._hashes.items() if key[0] in wanted}
+
+    def upsert(self, rows: List[Dict[str, Any]], profiles: Dict[str, Dict[str, Any]] = None):
+        with self._lock:
+            new_vectors = []
+            for row in rows:
+                key = (row['startup_id'], row['field'])
+                vector = np.asarray(row['embedding'], dtype=np.float32)
+                self._hashes[key] = row['content_hash']
+                if key in self._rows:
+                    self._matrix[self._rows[key]] = vector
+                else:
+                    self._rows[key] = len(self._keys)
+                    self._keys.append(key)
+                    new_vectors.append(vector)
+            if new_vectors:
+                self._matrix = np.vstack([self._matrix, np.stack(new_vectors)])
+            for startup_id, profile in (profiles or {}).items():
+                self._profiles[startup_id] = {c: profile.get(c) for c in RESULT_COLUMNS}
+                self._terms[startup_id] = set(re.findall(
+                    r"[a-z0-9]+", " ".join(str(profile.get(c) or "") for c in RESULT_COLUMNS[1:]).lower()
+                ))
+
+    def remove_startup(self, startup_id: str):
+        with self._lock:
+            keep = [i for i, key in enumerate(self._keys) if key[0] != startup_id]
+            self._keys = [self._keys[i] for i in keep]
+            self._matrix = self._matrix[keep]
+            self._rows = {key: i for i, key in enumerate(self._keys)}
+            self._hashes = {key: h for key, h in self._hashes.items() if key[0] != startup_id}
+            self._profiles.pop(startup_id, None)
+            self._terms.pop(startup_id, None)
+
+    def _vector_ranking(self, query_vector: np.ndarray, candidates: int) -> Tuple[List[str], Dict[str, float]]:
+        if not self._keys:
+            return [], {}
+        scores = self._matrix @ query_vector
+        best = {}
+        for position in np.argsort(-scores):
+            startup_id = self._keys[position][0]
+            if startup_id not in best:
+                best[startup_id] = float(scores[position])
+                if len(best) == candidates:
+                    break
+        return list(best), best
+
+    def _keyword_ranking(self, query: str, candidates: int) -> List[str]:
+        terms = set(re.findall(r"[a-z0-9]+", query.lower()))
+        if not terms:
+            return []
+        scored = [(len(terms & words) / len(terms), sid) for sid, words in self._terms.items() if terms & words]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [sid for _, sid in scored[:candidates]]
+
+    def search(self, query: str, query_vector: np.ndarray, model: str, limit: int = 20,
+               search_type: SearchType = SearchType.hybrid, vector_weight: float = 0.7) -> List[Dict[str, Any]]:
+        candidates = max(limit * 4, 50)
+        vector_weight = _vector_weight(search_type, vector_weight)
+        with self._lock:
+            vector_ids, similarity = ([], {})
+            if vector_weight > 0:
+                vector_ids, similarity = self._vector_ranking(np.asarray(query_vector, dtype=np.float32), candidates)
+            keyword_ids = self._keyword_ranking(query, candidates) if vector_weight < 1 else []
+
+            fused = _fuse([(vector_ids, vector_weight), (keyword_ids, 1.0 - vector_weight)], limit)
+            return [
+                {**self._profiles.get(sid, {'startup_id': sid}), 'score': score, 'similarity': similarity.get(sid)}
+                for sid, score in fused
+            ]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class PgVectorStartupIndex:
+    """startup_embeddings table (pgvector + HNSW) accessed through PostgREST and RPC
+
+    Schema and the hybrid search_startups_semantic function live in
+    migrations/003_startup_embeddings.sql.
+    """
+
+    def __init__(self, db_manager, table: str = 'startup_embeddings'):
+        self.db_manager = db_manager
+        self.table = table
+
+    def get_hashes(self, startup_ids: List[str], model: str) -> Dict[Tuple[str, str], str]:
+        if not startup_ids:
+            return {}
+        result = self.db_manager.supabase.table(self.table)\
+            .select('startup_id, field, content_hash')\
+            .eq('model', model)\
+            .in_('startup_id', list(startup_ids))\
+            .execute()
+        return {(row['startup_id'], row['field']): row['content_hash'] for row in result.data or []}
+
+    def upsert(self, rows: List[Dict[str, Any]], profiles: Dict[str, Dict[str, Any]] = None):
+        if rows:
+            self.db_manager.supabase.table(self.table)\
+                .upsert(rows, on_conflict='startup_id,field')\
+                .execute()
+
+    def remove_startup(self, startup_id: str):
+        self.db_manager.supabase.table(self.table).delete().eq('startup_id', startup_id).execute()
+
+    def search(self, query: str, query_vector: np.ndarray, model: str, limit: int = 20,
+               search_type: SearchType = SearchType.hybrid, vector_weight: float = 0.7) -> List[Dict[str, Any]]:
+        response = self.db_manager.supabase.rpc('search_startups_semantic', {
+            'p_query': query,
+            'p_query_embedding': [float(x) for x in query_vector],
+            'p_model': model,
+            'p_limit': limit,
+            'p_vector_weight': _vector_weight(search_type, vector_weight)
+        }).execute()
+        return response.data or []
+
+
+class StartupEmbeddingPipeline:
+    """Embeds startup text fields in batches and keeps the vector index current
+
+    Every field is hashed before embedding, so re-running a backfill or
+    re-saving an unchanged profile costs a hash lookup, not an API call.
+    """
+
+    def __init__(self, embedder=None, index=None, batch_size: int = 64):
+        self.embedder = embedder or default_embedder()
+        self.index = index if index is not None else NumpyVectorIndex(self.embedder.dimensions)
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="startup-embed")
+        self._stats = {"embedded": 0, "skipped": 0, "batches": 0, "failures": 0}
+
+    def embed_startups(self, profiles: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Embed new or changed fields of the given profiles, returns counts for this call"""
+        counts = {"embedded": 0, "skipped": 0}
+        profiles = [p for p in profiles if p and p.get('startup_id')]
+        for start in range(0, len(profiles), self.batch_size):
+            batch = profiles[start:start + self.batch_size]
+            known = self.index.get_hashes([p['startup_id'] for p in batch], self.embedder.model)
+
+            pending = []  # (startup_id, field, text, hash)
+            for profile in batch:
+                for field, text in field_texts(profile).items():
+                    digest = content_hash(text)
+                    if known.get((profile['startup_id'], field)) == digest:
+                        counts["skipped"] += 1
+                    else:
+                        pending.append((profile['startup_id'], field, text, digest))
+
+            if pending:
+                vectors = self.embedder.embed([text for _, _, text, _ in pending])
+                rows = [
+                    {
+                        'startup_id': startup_id,
+                        'field': field,
+                        'model': self.embedder.model,
+                        'content_hash': digest,
+                        'embedding': vector.tolist()
+                    }
+                    for (startup_id, field, _, digest), vector in zip(pending, vectors)
+                ]
+                self.index.upsert(rows, profiles={p['startup_id']: p for p in batch})
+                counts["embedded"] += len(rows)
+                self._stats["batches"] += 1
+            elif isinstance(self.index, NumpyVectorIndex):
+                # Nothing to embed, but keep the keyword side current
+                self.index.upsert([], profiles={p['startup_id']: p for p in batch})
+
+        self._stats["embedded"] += counts["embedded"]
+        self._stats["skipped"] += counts["skipped"]
+        return counts
+
+    def submit(self, profile: Dict[str, Any]):
+        """Embed a freshly saved profile off the request thread"""
+        def run():
+            try:
+                self.embed_startups([profile])
+            except Exception as e:
+                self._stats["failures"] += 1
+                print(f" Error embedding startup {profile.get('startup_id')}: {str(e)}")
+        return self._executor.submit(run)
+
+    def backfill(self, db_manager, page_size: int = 200) -> Dict[str, int]:
+        """Embed every active startup, paging through startup_profiles by startup_id"""
+        totals = {"startups": 0, "embedded": 0, "skipped": 0}
+        last_id = None
+        columns = ', '.join(dict.fromkeys(RESULT_COLUMNS + EMBEDDING_FIELDS))
+        while True:
+            query = db_manager.supabase.table('startup_profiles').select(columns).eq('is_active', True)
+            if last_id is not None:
+                query = query.gt('startup_id', last_id)
+            rows = query.order('startup_id').limit(page_size).execute().data or []
+            if not rows:
+                break
+            counts = self.embed_startups(rows)
+            totals["startups"] += len(rows)
+            totals["embedded"] += counts["embedded"]
+            totals["skipped"] += counts["skipped"]
+            print(f" Embedding backfill: {totals['startups']} startups, "
+                  f"{totals['embedded']} fields embedded, {totals['skipped']} unchanged")
+            last_id = rows[-1]['startup_id']
+            if len(rows) < page_size:
+                break
+        return totals
+
+    def search(self, query: str, limit: int = 20, search_type: SearchType = SearchType.hybrid,
+               vector_weight: float = 0.7) -> List[Dict[str, Any]]:
+        limit = max(1, min(limit, MAX_RESULTS))
+        query_vector = self.embedder.embed([query])[0] if search_type != SearchType.keyword \
+            else np.zeros(self.embedder.dimensions, dtype=np.float32)
+        return self.index.search(query, query_vector, self.embedder.model, limit=limit,
+                                 search_type=search_type, vector_weight=vector_weight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "model": self.embedder.model}
+
+
+if __name__ == "__main__":
+    # Backfill: python -m database.embeddings
+    from database.DatabaseManager import DatabaseManager, SUPABASE_URL, SUPABASE_KEY
+
+    manager = DatabaseManager(SUPABASE_URL, SUPABASE_KEY)
+    if manager.is_connected():
+        print(manager.backfill_startup_embeddings())
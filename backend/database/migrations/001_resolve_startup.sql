@@ -0,0 +1,59 @@
+-- Single round-trip startup resolution by startup_id or company name.
+-- Used by DatabaseManager.resolve_startup via supabase.rpc('resolve_startup', ...).
+
+create extension if not exists pg_trgm;
+
+-- Normalized name: trimmed, lowercased, inner whitespace collapsed
+alter table startup_profiles
+    add column if not exists normalized_name text
+    generated always as (lower(regexp_replace(btrim(company_name), '\s+', ' ', 'g'))) stored;
+
+-- Exact lookups hit the b-tree, fuzzy fallback uses the trigram index
+create index if not exists startup_profiles_normalized_name_idx
+    on startup_profiles (normalized_name);
+create index if not exists startup_profiles_normalized_name_trgm_idx
+    on startup_profiles using gin (normalized_name gin_trgm_ops);
+
+create or replace function resolve_startup(p_identifier text)
+returns setof startup_profiles
+language sql
+stable
+as $$
+    with needle as (
+        select
+            lower(regexp_replace(btrim(p_identifier), '\s+', ' ', 'g')) as name,
+            '%' || replace(replace(replace(lower(regexp_replace(btrim(p_identifier), '\s+', ' ', 'g')),
+                '\', '\\'), '%', '\%'), '_', '\_') || '%' as pattern
+    ),
+    exact as (
+        select sp, 0 as match_rank
+        from startup_profiles sp
+        where sp.startup_id = p_identifier
+        union all
+        select sp, 1
+        from startup_profiles sp, needle
+        where sp.normalized_name = needle.name
+    ),
+    fuzzy as (
+        -- Only scanned when neither the id nor the exact name matched
+        select sp, 2 as match_rank
+        from startup_profiles sp, needle
+        where not exists (select 1 from exact)
+          and sp.normalized_name like needle.pattern
+    ),
+    candidates as (
+        select * from exact
+        union all
+        select * from fuzzy
+    )
+    select (c.sp).*
+    from candidates c, needle
+    order by
+        c.match_rank,
+        (c.sp).is_active desc,
+        similarity((c.sp).normalized_name, needle.name) desc,
+        length((c.sp).normalized_name),
+        (c.sp).created_at,
+        (c.sp).startup_id
+    limit 1;
+$$;
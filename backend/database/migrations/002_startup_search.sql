@@ -0,0 +1,74 @@
+-- Weighted full-text search over startup profiles.
+-- Used by database.search_engine.PostgresStartupSearch via supabase.rpc('search_startups_fts', ...).
+
+-- Name > sector > problem > solution
+alter table startup_profiles
+    add column if not exists search_vector tsvector
+    generated always as (
+        setweight(to_tsvector('english', coalesce(company_name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(industry_sector, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(problem_statement, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(solution_description, '')), 'D')
+    ) stored;
+
+create index if not exists startup_profiles_search_vector_idx
+    on startup_profiles using gin (search_vector);
+
+-- Ranked search with keyset pagination on (rank desc, startup_id asc).
+-- Pass the last row's rank and startup_id to fetch the next page.
+create or replace function search_startups_fts(
+    p_query text,
+    p_limit int default 20,
+    p_after_rank real default null,
+    p_after_id text default null
+)
+returns table (
+    startup_id text,
+    company_name text,
+    industry_sector text,
+    problem_statement text,
+    solution_description text,
+    stage text,
+    funding_stage text,
+    rank real,
+    snippet text
+)
+language sql
+stable
+as $$
+    with q as (
+        select websearch_to_tsquery('english', p_query) as query
+    ),
+    page as (
+        select
+            sp.startup_id::text,
+            sp.company_name::text,
+            sp.industry_sector::text,
+            sp.problem_statement::text,
+            sp.solution_description::text,
+            sp.stage::text,
+            sp.funding_stage::text,
+            ts_rank(sp.search_vector, q.query) as rank
+        from startup_profiles sp, q
+        where sp.is_active
+          and sp.search_vector @@ q.query
+          and (
+              p_after_rank is null
+              or ts_rank(sp.search_vector, q.query) < p_after_rank
+              or (ts_rank(sp.search_vector, q.query) = p_after_rank and sp.startup_id::text > p_after_id)
+          )
+        order by rank desc, sp.startup_id
+        limit least(greatest(p_limit, 1), 100)
+    )
+    -- Highlighting is only computed for the rows on this page
+    select
+        page.*,
+        ts_headline(
+            'english',
+            coalesce(page.problem_statement, '') || ' ' || coalesce(page.solution_description, ''),
+            q.query,
+            'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=24, MinWords=8'
+        ) as snippet
+    from page, q
+    order by page.rank desc, page.startup_id;
+$$;
@@ -0,0 +1,93 @@
+-- Semantic startup search: one embedding per (startup, text field) in pgvector.
+-- Written by database.embeddings.StartupEmbeddingPipeline and queried with
+-- supabase.rpc('search_startups_semantic', ...). Requires 002_startup_search.sql.
+
+create extension if not exists vector;
+
+create table if not exists startup_embeddings (
+    startup_id text not null,
+    field text not null,            -- problem_statement, solution_description, target_market, competitive_advantage
+    model text not null,
+    content_hash text not null,     -- sha256 of the embedded text; unchanged text is not re-embedded
+    embedding vector(1536) not null,
+    updated_at timestamptz not null default now(),
+    primary key (startup_id, field)
+);
+
+create index if not exists startup_embeddings_hnsw_idx
+    on startup_embeddings using hnsw (embedding vector_cosine_ops)
+    with (m = 16, ef_construction = 64);
+
+create index if not exists startup_embeddings_model_idx
+    on startup_embeddings (model, startup_id);
+
+-- Hybrid retrieval: nearest fields by cosine distance (HNSW) and full-text
+-- matches on search_vector, combined by weighted reciprocal rank fusion.
+-- p_vector_weight = 1 is pure vector search, 0 is pure keyword search.
+-- row_number() only numbers the rows; each candidate list needs its own
+-- order by so the limit keeps the best-ranked rows.
+create or replace function search_startups_semantic(
+    p_query text,
+    p_query_embedding vector(1536),
+    p_model text,
+    p_limit int default 20,
+    p_vector_weight real default 0.7
+)
+returns table (
+    startup_id text,
+    company_name text,
+    industry_sector text,
+    problem_statement text,
+    solution_description text,
+    stage text,
+    funding_stage text,
+    score double precision,
+    similarity double precision
+)
+language sql
+stable
+as $$
+    with nearest as (
+        select e.startup_id, 1 - (e.embedding <=> p_query_embedding) as similarity
+        from startup_embeddings e
+        where p_vector_weight > 0
+          and e.model = p_model
+        order by e.embedding <=> p_query_embedding
+        limit greatest(p_limit, 1) * 4 * 4   -- up to 4 fields per startup
+    ),
+    vector_ranked as (
+        select startup_id, max(similarity) as similarity,
+               row_number() over (order by max(similarity) desc) as position
+        from nearest
+        group by startup_id
+        order by position
+        limit greatest(p_limit, 1) * 4
+    ),
+    keyword_ranked as (
+        select sp.startup_id::text as startup_id,
+               row_number() over (order by ts_rank(sp.search_vector, q.query) desc) as position
+        from startup_profiles sp, websearch_to_tsquery('english', p_query) as q(query)
+        where p_vector_weight < 1
+          and sp.is_active
+          and sp.search_vector @@ q.query
+        order by position
+        limit greatest(p_limit, 1) * 4
+    ),
+    fused as (
+        select coalesce(v.startup_id, k.startup_id) as startup_id,
+               coalesce(p_vector_weight / (60 + v.position), 0)
+                 + coalesce((1 - p_vector_weight) / (60 + k.position), 0) as score,
+               v.similarity
+        from vector_ranked v
+        full outer join keyword_ranked k on k.startup_id = v.startup_id
+    )
+    select sp.startup_id::text, sp.company_name::text, sp.industry_sector::text,
+           sp.problem_statement::text, sp.solution_description::text,
+           sp.stage::text, sp.funding_stage::text,
+           f.score, f.similarity
+    from fused f
+    join startup_profiles sp on sp.startup_id::text = f.startup_id
+    where sp.is_active
+    order by f.score desc, sp.startup_id
+    limit least(greatest(p_limit, 1), 100);
+$$;
@@ -0,0 +1,86 @@
+import threading
+from typing import Dict, Any, Optional
+
+from cachetools import TTLCache
+
+
+class ProfileCache:
+    """TTL + LRU cache for startup profile rows
+
+    Profiles are keyed by startup_id. Name lookups go through a secondary
+    normalized-name -> startup_id map, so a name hit still reads the single
+    cached row. Rows are copied on the way in and out because callers mutate
+    the dicts they get back.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 300):
+        self._profiles = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._name_to_id = TTLCache(maxsize=maxsize * 2, ttl=ttl)
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        return " ".join(str(name).lower().split())
+
+    def get(self, startup_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._counted(self._profiles.get(startup_id))
+
+    def get_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._counted(self._by_name(name))
+
+    def resolve(self, identifier: str) -> Optional[Dict[str, Any]]:
+        """Look an identifier up as a startup_id, then as a name, counting one hit or miss"""
+        with self._lock:
+            return self._counted(self._profiles.get(identifier) or self._by_name(identifier))
+
+    def _by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        startup_id = self._name_to_id.get(self.normalize_name(name))
+        return self._profiles.get(startup_id) if startup_id else None
+
+    def _counted(self, profile: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Record the lookup outcome and copy the row out; called with the lock held"""
+        self._stats["hits" if profile is not None else "misses"] += 1
+        return dict(profile) if profile is not None else None
+
+    def put(self, profile: Dict[str, Any], name: str = None):
+        """Cache a profile row, optionally remembering the name it was looked up by"""
+        startup_id = profile.get('startup_id') if profile else None
+        if not startup_id:
+            return
+        with self._lock:
+            self._profiles[startup_id] = dict(profile)
+            if profile.get('company_name'):
+                self._name_to_id[self.normalize_name(profile['company_name'])] = startup_id
+            if name:
+                self._name_to_id[self.normalize_name(name)] = startup_id
+
+    def invalidate(self, startup_id: str):
+        """Drop a startup's cached row and every name that resolves to it"""
+        with self._lock:
+            self._profiles.pop(startup_id, None)
+            for name in [n for n, sid in self._name_to_id.items() if sid == startup_id]:
+                self._name_to_id.pop(name, None)
+            self._stats["invalidations"] += 1
+
+    def invalidate_names(self):
+        """Forget name lookups, e.g. after an insert that could change which row a name matches"""
+        with self._lock:
+            self._name_to_id.clear()
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+            self._name_to_id.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "size": len(self._profiles),
+                "names": len(self._name_to_id)
+            }
@@ -0,0 +1,133 @@
+import base64
+import json
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+SEARCH_COLUMNS = ['company_name', 'industry_sector', 'problem_statement', 'solution_description']
+RESULT_COLUMNS = ['startup_id', 'company_name', 'industry_sector', 'problem_statement',
+                  'solution_description', 'stage', 'funding_stage']
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(rank: float, startup_id: str) -> str:
+    """Opaque keyset cursor for the row after which the next page starts"""
+    return base64.urlsafe_b64encode(json.dumps([rank, startup_id]).encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[Optional[float], Optional[str]]:
+    if not cursor:
+        return None, None
+    try:
+        rank, startup_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), str(startup_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid search cursor")
+
+
+def _page(rows: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    """Wrap a result page with the cursor for the next one (None on the last page)"""
+    next_cursor = None
+    if len(rows) == limit and rows:
+        next_cursor = encode_cursor(rows[-1]['rank'], rows[-1]['startup_id'])
+    return {"results": rows, "next_cursor": next_cursor}
+
+
+class PostgresStartupSearch:
+    """Ranked full-text startup search backed by the search_startups_fts RPC
+
+    Uses the weighted tsvector + GIN index from migration 002_startup_search.sql.
+    Results are ordered by ts_rank with highlighted snippets and paged by keyset.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def _params(self, query: str, limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+        after_rank, after_id = decode_cursor(cursor)
+        return {
+            'p_query': query,
+            'p_limit': limit,
+            'p_after_rank': after_rank,
+            'p_after_id': after_id
+        }
+
+    def search(self, query: str, limit: int = 20, cursor: str = None) -> Dict[str, Any]:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        response = self.db_manager.supabase.rpc('search_startups_fts', self._params(query, limit, cursor)).execute()
+        return _page(response.data or [], limit)
+
+    async def search_async(self, query: str, limit: int = 20, cursor: str = None) -> Dict[str, Any]:
+        """search() for a manager holding the async supabase client"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        response = await self.db_manager.supabase.rpc('search_startups_fts', self._params(query, limit, cursor)).execute()
+        return _page(response.data or [], limit)
+
+
+class SQLiteStartupSearch:
+    """SQLite FTS5 stand-in for PostgresStartupSearch, for local development and tests
+
+    Mirrors the Postgres column weights (name > sector > problem > solution)
+    with bm25, returns the same row shape, snippets and keyset cursors.
+    """
+
+    # bm25 weights in column order: startup_id, 4 search columns, stage, funding_stage
+    _BM25_WEIGHTS = "0.0, 10.0, 4.0, 2.0, 1.0, 0.0, 0.0"
+
+    def __init__(self, path: str = ":memory:"):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS startup_fts USING fts5(
+                    {', '.join(f'{c} UNINDEXED' if c in ('startup_id', 'stage', 'funding_stage') else c for c in RESULT_COLUMNS)},
+                    tokenize = 'porter unicode61'
+                )
+            """)
+
+    def index_startups(self, startups: List[Dict[str, Any]]):
+        """Insert or replace profile rows in the FTS index"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM startup_fts WHERE startup_id = ?",
+                [(row.get('startup_id'),) for row in startups]
+            )
+            self._conn.executemany(
+                f"INSERT INTO startup_fts ({', '.join(RESULT_COLUMNS)}) VALUES ({', '.join('?' for _ in RESULT_COLUMNS)})",
+                [tuple(str(row.get(c) or '') for c in RESULT_COLUMNS) for row in startups]
+            )
+
+    def remove_startup(self, startup_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM startup_fts WHERE startup_id = ?", (startup_id,))
+
+    def _match_expression(self, query: str) -> str:
+        """Turn free text into an FTS5 AND query of quoted terms (like websearch_to_tsquery)"""
+        terms = re.findall(r"\w+", query.lower())
+        return " ".join(f'"{term}"' for term in terms)
+
+    def search(self, query: str, limit: int = 20, cursor: str = None) -> Dict[str, Any]:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        match = self._match_expression(query)
+        if not match:
+            return {"results": [], "next_cursor": None}
+
+        after_rank, after_id = decode_cursor(cursor)
+        sql = f"""
+            SELECT * FROM (
+                SELECT {', '.join(RESULT_COLUMNS)},
+                       -bm25(startup_fts, {self._BM25_WEIGHTS}) AS rank,
+                       snippet(startup_fts, -1, '<mark>', '</mark>', '…', 24) AS snippet
+                FROM startup_fts
+                WHERE startup_fts MATCH ?
+            )
+            WHERE ? IS NULL OR rank < ? OR (rank = ? AND startup_id > ?)
+            ORDER BY rank DESC, startup_id
+            LIMIT ?
+        """
+        with self._lock:
+            cursor_rows = self._conn.execute(sql, (match, after_rank, after_rank, after_rank, after_id, limit))
+            columns = [d[0] for d in cursor_rows.description]
+            rows = [dict(zip(columns, row)) for row in cursor_rows.fetchall()]
+        return _page(rows, limit)
@@ -0,0 +1,288 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+from postgrest.exceptions import APIError
+
+CONVERSATION_SPOOL_PATH = os.environ.get("CONVERSATION_SPOOL_PATH", "conversation_spool.sqlite3")
+
+# Insert outcomes
+WRITTEN = "written"
+UNAVAILABLE = "unavailable"  # Database down or overloaded; retrying later can succeed
+REJECTED = "rejected"  # The database refused the rows themselves; retrying cannot succeed
+
+# SQLSTATE classes that mean "try again later": connection exception, transaction rollback,
+# insufficient resources, operator intervention, system error
+TRANSIENT_SQLSTATE_CLASSES = ('08', '40', '53', '57', '58')
+# PostgREST connection and timeout errors
+TRANSIENT_POSTGREST_CODES = ('PGRST000', 'PGRST001', 'PGRST002', 'PGRST003')
+
+
+def _is_rejection(error: Exception) -> bool:
+    """True when the database refused the rows (bad value, constraint, unknown column) rather than being unavailable"""
+    if not isinstance(error, APIError) or not error.code:
+        return False
+    code = str(error.code)
+    if code.startswith('PGRST'):
+        return code not in TRANSIENT_POSTGREST_CODES
+    return code[:2] not in TRANSIENT_SQLSTATE_CLASSES
+
+
+class ConversationWriteBehind:
+    """Write-behind queue that batches conversation rows into bulk inserts
+
+    Rows are queued by the request thread and written by one background thread,
+    either when batch_size rows are waiting or flush_interval seconds after the
+    first queued row. If the database is unreachable the batch is spooled to a
+    local SQLite (WAL) file and replayed once inserts succeed again.
+
+    A batch the database rejects is retried one row at a time, and the rows it
+    refuses are moved to the spool's dead_letter table instead of being
+    retried forever. Workers can share one spool file: replay claims rows by
+    deleting them before the insert (and puts them back if the database is
+    unavailable), so two workers never replay the same row. A worker that dies
+    mid-replay loses at most the batch it had claimed.
+    """
+
+    def __init__(self,
+                 db_manager,
+                 table: str = 'conversations',
+                 batch_size: int = 50,
+                 flush_interval: float = 2.0,
+                 spool_path: str = CONVERSATION_SPOOL_PATH,
+                 max_queue: int = 10000):
+        self.db_manager = db_manager
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._retry_delay = 1.0
+        self._next_replay_at = 0.0
+        self._spool_has_rows = True  # Unknown until checked; a previous process may have left rows
+        self._last_error = None
+        self._stats = {"queued": 0, "written": 0, "batches": 0, "spooled": 0, "replayed": 0, "failures": 0,
+                       "dead_lettered": 0}
+
+        self._spool_lock = threading.Lock()
+        self._spool = sqlite3.connect(spool_path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._spool.execute("PRAGMA journal_mode=WAL")
+        self._spool.execute("PRAGMA synchronous=NORMAL")
+        self._spool.execute(
+            "CREATE TABLE IF NOT EXISTS spool (id INTEGER PRIMARY KEY AUTOINCREMENT, tbl TEXT NOT NULL, payload TEXT NOT NULL)"
+        )
+        self._spool.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letter (id INTEGER PRIMARY KEY AUTOINCREMENT, tbl TEXT NOT NULL, "
+            "payload TEXT NOT NULL, error TEXT, failed_at REAL NOT NULL)"
+        )
+
+        self._thread = threading.Thread(target=self._run, name="conversation-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def enqueue(self, row: Dict[str, Any]) -> bool:
+        """Queue a row for the next batch. Spools directly if the queue is full
+
+        After close() the spool is gone, so the row is written synchronously
+        and False is returned if that insert fails.
+        """
+        if self._stop.is_set():
+            if self._insert(self.table, [row]) == WRITTEN:
+                self._stats["written"] += 1
+                return True
+            return False
+        try:
+            self._queue.put_nowait(row)
+            self._stats["queued"] += 1
+        except queue.Full:
+            self._spool_rows([row])
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until every queued row has been written or spooled"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline or not self._thread.is_alive():
+                return False
+            time.sleep(0.02)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Flush outstanding rows and stop the writer thread"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+
+        # Anything the thread did not get to is kept for the next process
+        leftovers = []
+        while True:
+            try:
+                leftovers.append(self._queue.get_nowait())
+                self._queue.task_done()
+            except queue.Empty:
+                break
+        if leftovers:
+            self._spool_rows(leftovers)
+
+        with self._spool_lock:
+            self._spool.close()
+
+    def _run(self):
+        """Writer loop: gather a batch by size or time, write it, then try to drain the spool"""
+        batch = []
+        deadline = None
+        while not (self._stop.is_set() and self._queue.empty() and not batch):
+            timeout = self.flush_interval if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size and not self._stop.is_set():
+                    continue
+            except queue.Empty:
+                pass
+
+            if batch:
+                self._write_batch(batch)
+                for _ in batch:
+                    self._queue.task_done()
+                batch = []
+                deadline = None
+
+            self._replay_spool()
+
+    def _insert(self, table: str, rows: List[Dict[str, Any]]) -> str:
+        """Bulk insert rows, returns WRITTEN, UNAVAILABLE or REJECTED"""
+        self._last_error = None
+        if not self.db_manager or not self.db_manager.is_connected():
+            return UNAVAILABLE
+        try:
+            self.db_manager.supabase.table(table).insert(rows).execute()
+            return WRITTEN
+        except Exception as e:
+            print(f" Error writing conversation batch: {str(e)}")
+            self._stats["failures"] += 1
+            self._last_error = str(e)
+            return REJECTED if _is_rejection(e) else UNAVAILABLE
+
+    def _insert_singly(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert rows one at a time after a rejected batch, dead-lettering the ones refused
+
+        Returns how many rows were settled (written or dead-lettered) before
+        the database became unavailable; the rest still need writing.
+        """
+        for index, row in enumerate(rows):
+            outcome = self._insert(self.table, [row])
+            if outcome == UNAVAILABLE:
+                return index
+            if outcome == WRITTEN:
+                self._stats["written"] += 1
+            else:
+                self._dead_letter(row, self._last_error)
+        return len(rows)
+
+    def _write_batch(self, rows: List[Dict[str, Any]]):
+        outcome = self._insert(self.table, rows)
+        if outcome == WRITTEN:
+            self._stats["written"] += len(rows)
+            self._stats["batches"] += 1
+            self._retry_delay = 1.0
+            return
+
+        settled = self._insert_singly(rows) if outcome == REJECTED else 0
+        if settled < len(rows):
+            self._spool_rows(rows[settled:])
+            self._schedule_retry()
+
+    def _schedule_retry(self):
+        """Back off replay attempts exponentially while the database is down"""
+        self._next_replay_at = time.monotonic() + self._retry_delay
+        self._retry_delay = min(self._retry_delay * 2, 60.0)
+
+    def _spool_rows(self, rows: List[Dict[str, Any]]):
+        try:
+            with self._spool_lock:
+                self._spool.executemany(
+                    "INSERT INTO spool (tbl, payload) VALUES (?, ?)",
+                    [(self.table, json.dumps(row, default=str)) for row in rows]
+                )
+            self._stats["spooled"] += len(rows)
+            self._spool_has_rows = True
+        except Exception as e:
+            print(f" Error spooling conversations locally: {str(e)}")
+
+    def _dead_letter(self, row: Dict[str, Any], error: Optional[str]):
+        """Keep a row the database refused for inspection instead of retrying it"""
+        print(f" Conversation row rejected by the database, moved to dead_letter: {error}")
+        try:
+            with self._spool_lock:
+                self._spool.execute(
+                    "INSERT INTO dead_letter (tbl, payload, error, failed_at) VALUES (?, ?, ?, ?)",
+                    (self.table, json.dumps(row, default=str), error, time.time())
+                )
+            self._stats["dead_lettered"] += 1
+        except Exception as e:
+            print(f" Error dead-lettering conversation locally: {str(e)}")
+
+    def _claim_spooled(self) -> List[tuple]:
+        """Atomically take the oldest batch of spooled rows, so other workers sharing the file skip them"""
+        with self._spool_lock:
+            claimed = self._spool.execute(
+                "DELETE FROM spool WHERE id IN (SELECT id FROM spool WHERE tbl = ? ORDER BY id LIMIT ?) "
+                "RETURNING id, payload",
+                (self.table, self.batch_size)
+            ).fetchall()
+        return sorted(claimed)
+
+    def _unclaim(self, claimed: List[tuple]):
+        """Put claimed rows back under their original ids, keeping replay order"""
+        with self._spool_lock:
+            self._spool.executemany(
+                "INSERT INTO spool (id, tbl, payload) VALUES (?, ?, ?)",
+                [(row_id, self.table, payload) for row_id, payload in claimed]
+            )
+
+    def _replay_spool(self):
+        """Replay spooled rows in batches once the database accepts inserts again"""
+        if not self._spool_has_rows or time.monotonic() < self._next_replay_at:
+            return
+        while True:
+            claimed = self._claim_spooled()
+            if not claimed:
+                self._spool_has_rows = False
+                return
+
+            rows = [json.loads(payload) for _, payload in claimed]
+            outcome = self._insert(self.table, rows)
+            if outcome == WRITTEN:
+                self._stats["replayed"] += len(rows)
+            else:
+                settled = self._insert_singly(rows) if outcome == REJECTED else 0
+                if settled < len(rows):
+                    self._unclaim(claimed[settled:])
+                    self._schedule_retry()
+                    return
+            self._retry_delay = 1.0
+
+            # Live rows take priority; the rest of the backlog goes on the next loop
+            if self._stop.is_set() or not self._queue.empty():
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus current queue depth and spool backlog"""
+        try:
+            with self._spool_lock:
+                spool_pending = self._spool.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+                dead_letter = self._spool.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+        except sqlite3.Error:
+            spool_pending = dead_letter = None
+        return {**self._stats, "queue_depth": self._queue.qsize(), "spool_pending": spool_pending,
+                "dead_letter": dead_letter}
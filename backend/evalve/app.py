@@ -6,14 +6,17 @@ from agno.agent import Agent, AgentKnowledge
 from agno.models.openai import OpenAIChat
 from agno.team.team import Team
 from agno.tools.serpapi import SerpApiTools
+from agno.run.response import RunEvent
 
 # Trial
 from agno.models.groq import Groq
 
 from system_prompt.prompt import system_prompt
 from database.DatabaseManager import DatabaseManager
-from conversation_mem.convo_mem import ConversationMemory
+from conversation_mem.session_store import SessionMemoryStore
 from memory.memory import MemoryGraph
+from memory.conversations import (ConversationTier, CONVERSATION_MAX_ENTRIES, CONVERSATION_MEMORY_BUDGET,
+                                  CONVERSATION_TTL)
 
 from agno.knowledge.pdf import PDFKnowledgeBase, PDFReader
 from agno.knowledge.website import WebsiteKnowledgeBase
@@ -24,7 +27,7 @@ from agno.document.chunking.document import DocumentChunking
 from agno.tools import Toolkit
 from supabase import create_client
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 
 # from agno.models.ollama import Ollama
 
@@ -34,7 +37,9 @@ import json
 import re
 import requests
 import urllib.parse
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 
 # SYSTEM PROMPTS
@@ -50,6 +55,10 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 SERPAPI_KEY = os.environ.get("SERPAPI_KEY") 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+# Bounds for the conversation entities each chat turn adds to the agent's graph
+AGENT_CONVERSATION_MAX_ENTRIES = int(os.environ.get("AGENT_CONVERSATION_MAX_ENTRIES", CONVERSATION_MAX_ENTRIES))
+AGENT_CONVERSATION_MEMORY_BUDGET = int(os.environ.get("AGENT_CONVERSATION_MEMORY_BUDGET", CONVERSATION_MEMORY_BUDGET))
+AGENT_CONVERSATION_TTL = float(os.environ.get("AGENT_CONVERSATION_TTL", CONVERSATION_TTL))
 
 # llm = OpenAIChat(id="gpt-4o")
 llm = Groq(id="openai/gpt-oss-20b")
@@ -65,8 +74,19 @@ class EvalveAgent:
 
         # Initialize core components
         self.db_manager = DatabaseManager(SUPABASE_URL, SUPABASE_KEY)
-        self.memory_graph = MemoryGraph()
-        self.conversation_memory = ConversationMemory()
+        # Only holds chat-turn conversations, which live in the in-memory tier,
+        # so the agent's graph is not snapshotted or shared between workers
+        self.memory_graph = MemoryGraph(ConversationTier(
+            max_entries=AGENT_CONVERSATION_MAX_ENTRIES,
+            memory_budget_bytes=AGENT_CONVERSATION_MEMORY_BUDGET,
+            ttl_seconds=AGENT_CONVERSATION_TTL
+        ))
+        self.session_store = SessionMemoryStore(self.db_manager)
+
+        # Background insight regeneration (stale-while-revalidate)
+        self._insight_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="insight-refresh")
+        self._insight_refreshing = set()
+        self._insight_lock = threading.Lock()
         
         # Initialize AI agent
         self.create_agents()
@@ -115,13 +135,16 @@ class EvalveAgent:
             return default
         return str(value)
 
-    def get_startup_by_name_or_id(self, identifier: str):
-        """Get startup data by either company name or startup ID"""
+    def get_startup_by_name_or_id(self, identifier):
+        """Get startup data by either company name or startup ID (an already-resolved row is passed through)"""
         try:
+            if isinstance(identifier, dict):
+                return identifier
+
             print(f"[EvalveAgent] Searching for startup: {identifier}")
             
             # Use the database manager's method
-            startup_data = self.db_manager.get_startup_by_name_or_id(identifier)
+            startup_data = self.db_manager.resolve_startup(identifier)
             
             if startup_data:
                 print(f"[EvalveAgent] Found startup: {startup_data.get('company_name')} (ID: {startup_data.get('startup_id')})")
@@ -203,11 +226,13 @@ class EvalveAgent:
 
     # In your evalve/app.py, update the get_startup_insight method:
 
-    def get_startup_insight(self, company_identifier: str, session_id: str = "default", use_web: bool = False):
-        """Retrieve Specific Startup Insights by company name or startup ID"""
+    def get_startup_insight(self, company_identifier, session_id: str = "default", use_web: bool = False):
+        """Retrieve Specific Startup Insights by company name, startup ID or resolved profile row"""
         try:
-            # Get startup data from database (by name or ID)
+            # Get startup data from database (by name or ID), unless the caller already resolved it
             startup_data = self.get_startup_by_name_or_id(company_identifier)
+            if isinstance(company_identifier, dict):
+                company_identifier = company_identifier.get('company_name') or company_identifier.get('startup_id')
             startup_context = ""
             
             if startup_data:
@@ -241,11 +266,6 @@ class EvalveAgent:
     Return ONLY valid JSON, no additional text or formatting.
     """
             
-            # Get conversation context
-            conversation_context = self.conversation_memory.get_context_string()
-            relevant_history = self.conversation_memory.get_relevant_history(query)
-            
-            
             # Get response from simple agent
             response = self.insights_generator.run(query)
             
@@ -273,7 +293,11 @@ class EvalveAgent:
                 }
             
             # Save conversation
-            self.conversation_memory.add_exchange(query, response_content, startup_context, session_id)
+            self.session_store.add_exchange(
+                session_id, query, response_content,
+                context=startup_context, agent_type="insights",
+                startup_id=startup_data.get('startup_id') if startup_data else None
+            )
             
             return {
                 "response": parsed_response,
@@ -291,15 +315,101 @@ class EvalveAgent:
                 "error": True
             }
 
-    def get_startup_chatbot(self, query: str, company_identifier: str, session_id: str = "default", use_web: bool = True):
-        """Getting Chatbot for Specific Startup by company name or ID"""
+    def get_cached_startup_insight(self, startup_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Serve persisted insights for a startup, regenerating them in the background when stale
+
+        Status is "fresh" when the stored insight is newer than the profile's updated_at,
+        "stale" when the profile changed since generation (cached insight is still returned),
+        and "pending" when nothing has been generated yet.
+        """
+        startup_id = startup_data.get('startup_id')
+        cached = self.db_manager.get_startup_insights(startup_id) if startup_id else None
+
+        if not cached:
+            self._schedule_insight_refresh(startup_data)
+            return {
+                "response": f"AI insights for {startup_data.get('company_name', 'this startup')} are being generated. Check back in a moment.",
+                "status": "pending",
+                "generated_at": None
+            }
+
+        generated_at = self._parse_timestamp(cached.get('generated_at'))
+        updated_at = self._parse_timestamp(startup_data.get('updated_at'))
+        is_stale = generated_at is None or (updated_at is not None and updated_at > generated_at)
+
+        if is_stale:
+            self._schedule_insight_refresh(startup_data)
+
+        return {
+            "response": self._insight_row_to_response(cached),
+            "status": "stale" if is_stale else "fresh",
+            "generated_at": cached.get('generated_at')
+        }
+
+    def _schedule_insight_refresh(self, startup_data: Dict[str, Any]) -> bool:
+        """Queue a background regeneration unless one is already running for this startup"""
+        startup_id = startup_data.get('startup_id')
+        if not startup_id:
+            return False
+
+        with self._insight_lock:
+            if startup_id in self._insight_refreshing:
+                return False
+            self._insight_refreshing.add(startup_id)
+
+        self._insight_executor.submit(self._refresh_startup_insight, startup_data)
+        return True
+
+    def _refresh_startup_insight(self, startup_data: Dict[str, Any]):
+        """Generate fresh insights and persist them to the startup_insights table"""
+        startup_id = startup_data.get('startup_id')
         try:
-            # Get startup data from database (by name or ID)
-            startup_data = self.get_startup_by_name_or_id(company_identifier)
-            startup_context = ""
-            
-            if startup_data:
-                startup_context = f"""
+            result = self.get_startup_insight(startup_data)
+            insights = result.get("response") if isinstance(result, dict) else None
+
+            if result.get("error") or not isinstance(insights, dict) or insights.get("error"):
+                print(f"[EvalveAgent] Skipping insight save for {startup_id}: generation failed")
+                return
+
+            recommendation = insights.get("investment_recommendation")
+            if isinstance(recommendation, dict) and "recommendation_score" not in insights:
+                insights["recommendation_score"] = recommendation.get("score")
+
+            self.db_manager.save_startup_insights(startup_id, insights)
+            print(f"[EvalveAgent] Refreshed insights for {startup_id}")
+        except Exception as e:
+            print(f"[EvalveAgent] Error refreshing insights for {startup_id}: {e}")
+        finally:
+            with self._insight_lock:
+                self._insight_refreshing.discard(startup_id)
+
+    def _insight_row_to_response(self, insight_row: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape a startup_insights row like the JSON returned by get_startup_insight"""
+        fields = ['executive_summary', 'key_strengths', 'major_risks', 'market_analysis',
+                  'financial_outlook', 'investment_recommendation', 'assumptions']
+        return {field: insight_row.get(field) for field in fields if insight_row.get(field) is not None}
+
+    def _parse_timestamp(self, value) -> Optional[datetime]:
+        """Parse an ISO timestamp from the database, dropping tz info so naive and aware values compare"""
+        if not value:
+            return None
+        try:
+            parsed = value if isinstance(value, datetime) else datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            return parsed
+        except (ValueError, TypeError):
+            return None
+
+    def _build_chatbot_prompt(self, query: str, company_identifier: str, session_id: str,
+                              startup_data: Dict[str, Any] = None):
+        """Build the context-enhanced chatbot prompt, returns (enhanced_query, startup_context, startup_id)"""
+        # Get startup data from database (by name or ID), unless the caller already resolved it
+        startup_data = startup_data or self.get_startup_by_name_or_id(company_identifier)
+        startup_context = ""
+        
+        if startup_data:
+            startup_context = f"""
 You are answering questions about this specific startup:
 
 {self.format_startup_context(startup_data)}
@@ -309,8 +419,8 @@ Answer as if you're having a friendly conversation with an investor who wants to
 Be informative but conversational. Use the startup information to provide specific, helpful answers.
 
 """
-            else:
-                startup_context = f"""
+        else:
+            startup_context = f"""
 You are answering questions about: {company_identifier}
 
 Note: No detailed database record found for this startup. Please use web search to find relevant information and provide helpful insights based on available data.
@@ -318,14 +428,41 @@ Note: No detailed database record found for this startup. Please use web search
 IMPORTANT: Provide conversational, natural responses. Do NOT return JSON or structured data.
 Answer as if you're having a friendly conversation with an investor.
 """
-            
-            # Get conversation context
-            conversation_context = self.conversation_memory.get_context_string()
-            relevant_history = self.conversation_memory.get_relevant_history(query)
-            
-            # Enhanced query with startup context
-            query_with_context = f"{startup_context}\n\nUser Question: {query}"
-            enhanced_query = self._enhance_query_with_context(query_with_context, conversation_context, relevant_history)
+        
+        # Get this session's conversation context
+        startup_id = startup_data.get('startup_id') if startup_data else None
+        conversation_memory = self.session_store.get_session(session_id, startup_id)
+        conversation_context = conversation_memory.get_context_string()
+        relevant_history = conversation_memory.get_relevant_history(query)
+        
+        # Enhanced query with startup context
+        query_with_context = f"{startup_context}\n\nUser Question: {query}"
+        enhanced_query = self._enhance_query_with_context(query_with_context, conversation_context, relevant_history)
+        return enhanced_query, startup_context, startup_id
+
+    def _record_chat_exchange(self, query: str, response_content: str, startup_context: str,
+                              session_id: str, startup_id: str = None):
+        """Persist a finished chat exchange to conversation memory and the memory graph"""
+        # Save conversation
+        try:
+            self.session_store.add_exchange(
+                session_id, query, response_content,
+                context=startup_context, agent_type="chatbot", startup_id=startup_id
+            )
+        except Exception as e:
+            print(f"[EvalveAgent] Error saving conversation: {e}")
+        
+        # Update memory graph
+        try:
+            self._update_memory_graph(query, response_content, startup_id)
+        except Exception as e:
+            print(f"[EvalveAgent] Error updating memory graph: {e}")
+
+    def get_startup_chatbot(self, query: str, company_identifier: str, session_id: str = "default", use_web: bool = True,
+                            startup_data: Dict[str, Any] = None):
+        """Getting Chatbot for Specific Startup by company name or ID"""
+        try:
+            enhanced_query, startup_context, startup_id = self._build_chatbot_prompt(query, company_identifier, session_id, startup_data)
             
             # Get response from team
             response = self.startup_chatbot.run(enhanced_query)
@@ -341,17 +478,7 @@ Answer as if you're having a friendly conversation with an investor.
                     if hasattr(tool_call, 'result'):
                         context_used += str(tool_call.result) + "\n"
             
-            # Save conversation
-            try:
-                self.conversation_memory.add_exchange(query, response_content, startup_context, session_id)
-            except Exception as e:
-                print(f"[EvalveAgent] Error saving conversation: {e}")
-            
-            # Update memory graph
-            try:
-                self._update_memory_graph(query, response_content)
-            except Exception as e:
-                print(f"[EvalveAgent] Error updating memory graph: {e}")
+            self._record_chat_exchange(query, response_content, startup_context, session_id, startup_id)
             
             return response_content
             
@@ -360,6 +487,53 @@ Answer as if you're having a friendly conversation with an investor.
 
             print(f"[EvalveAgent] Chatbot error: {error_msg}")
             return f"I apologize, but I'm experiencing technical difficulties right now. However, I can tell you that you're asking about {company_identifier}. Please try asking your question again, or check the startup's detailed profile for more information."
+
+    def stream_startup_chatbot(self, query: str, company_identifier: str, session_id: str = "default",
+                               startup_data: Dict[str, Any] = None) -> Iterator[Dict[str, Any]]:
+        """Stream chatbot output as events: token deltas, tool call start/finish, then done or error
+
+        The exchange is saved to conversation memory only after the stream completes.
+        """
+        response_parts = []
+        try:
+            enhanced_query, startup_context, startup_id = self._build_chatbot_prompt(query, company_identifier, session_id, startup_data)
+
+            run_stream = self.startup_chatbot.run(enhanced_query, stream=True, stream_intermediate_steps=True)
+
+            for event in run_stream:
+                event_type = getattr(event, "event", None)
+
+                if event_type == RunEvent.run_response_content.value:
+                    if event.content:
+                        response_parts.append(str(event.content))
+                        yield {"event": "token", "data": {"content": str(event.content)}}
+
+                elif event_type in (RunEvent.tool_call_started.value, RunEvent.tool_call_completed.value):
+                    tool = getattr(event, "tool", None)
+                    yield {
+                        "event": "tool_call_started" if event_type == RunEvent.tool_call_started.value else "tool_call_completed",
+                        "data": {
+                            "tool_call_id": getattr(tool, "tool_call_id", None),
+                            "tool_name": getattr(tool, "tool_name", None),
+                            "tool_args": getattr(tool, "tool_args", None),
+                            "error": getattr(tool, "tool_call_error", None),
+                        }
+                    }
+
+                elif event_type == RunEvent.run_error.value:
+                    raise RuntimeError(getattr(event, "content", None) or "Model run failed")
+
+            response_content = "".join(response_parts)
+            self._record_chat_exchange(query, response_content, startup_context, session_id, startup_id)
+
+            yield {"event": "done", "data": {"response": response_content}}
+
+        except Exception as e:
+            print(f"[EvalveAgent] Streaming chatbot error: {e}")
+            yield {
+                "event": "error",
+                "data": {"detail": f"Error processing chatbot query: {str(e)}", "partial_response": "".join(response_parts)}
+            }
                     
     def _enhance_query_with_context(self, query: str, conversation_context: str, relevant_history: List[Dict]) -> str:
         """Enhance query with conversation context"""
@@ -376,20 +550,20 @@ Answer as if you're having a friendly conversation with an investor.
         
         return "\n".join(enhanced_parts)
     
-    def _update_memory_graph(self, query: str, response: str):
+    def _update_memory_graph(self, query: str, response: str, startup_id: str = None):
         """Update memory graph with new information"""
         try:
             # Extract entities and relationships (simplified)
             query_id = f"query_{datetime.now().timestamp()}"
             
-            self.memory_graph.add_entity(
+            self.memory_graph.add_conversation(
                 query_id,
-                "conversation",
                 {
                     "query": query,
                     "response": response[:200],  # Truncate for storage
                     "timestamp": datetime.now().isoformat()
-                }
+                },
+                startup_id=startup_id
             )
             
         except Exception as e:
@@ -405,5 +579,6 @@ Answer as if you're having a friendly conversation with an investor.
             "database_connected": self.db_manager.is_connected(),
             "entities_in_graph": len(self.memory_graph.entities),
             "relationships_in_graph": len(self.memory_graph.relationships),
-            "conversation_history_length": len(self.conversation_memory.history)
+            "conversation_tier": self.memory_graph.conversations.stats(),
+            "conversation_sessions": self.session_store.stats()
         }
\ No newline at end of file
@@ -4,19 +4,21 @@ load_dotenv()
 # MAIN FASTAPI ROUTE DONE BY ME
 
 import os
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 import asyncio
+import json
+import threading
 from pydantic import BaseModel,HttpUrl
 from typing import Optional, List, Dict, Any
 
 from database.DatabaseManager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
 from evalve.app import EvalveAgent
-from conversation_mem.convo_mem import ConversationMemory
 from agent_tools.image_model.image_gen_module import img_pipeline 
 
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
@@ -24,11 +26,12 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 
 try:
     dm = DatabaseManager(SUPABASE_URL,SUPABASE_KEY)
+    adm = AsyncDatabaseManager(dm)  # Request-path queries; connected on startup
     ea = EvalveAgent()
-    cm = ConversationMemory()
+    cm = ea.session_store  # Per-session conversation memory shared with the agent
 except Exception as e:
     print(f"Error initializing services: {e}")
-    dm = ea = cm = None
+    dm = adm = ea = cm = None
 
 class ChatModel(BaseModel):
     query : str
@@ -201,6 +204,11 @@ def map_frontend_to_db(frontend_data: dict) -> dict:
     return mapped_startup, mapped_founders
 
 
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
 app = FastAPI(
     title="Evalve API",
     description="API for Startup Platform with AI Insights and Chatbot",
@@ -228,6 +236,7 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -241,29 +250,48 @@ elif os.path.exists("web"):
 else:
     print("⚠️ No frontend directory found")
 
+@app.on_event("startup")
+async def load_memory_graph():
+    """Connect the async client and load the memory graph snapshot (or build it) without blocking startup"""
+    if dm:
+        threading.Thread(target=dm.initialize_memory_graph, name="memory-graph-init", daemon=True).start()
+        await adm.connect()
+
+@app.on_event("shutdown")
+async def flush_pending_writes():
+    """Flush write-behind conversation batches before the worker exits"""
+    if adm:
+        await adm.close()
+    for manager in (dm, ea.db_manager if ea else None):
+        if manager:
+            manager.close()
+
 # Health check endpoint
 @app.get("/api/health")
 async def health_check():
     return {
         "status": "healthy",
         "services": {
-            "database": dm is not None and dm.is_connected() if dm else False,
+            "database": adm.is_connected() if adm else False,
             "ai_agent": ea is not None,
             "conversation_memory": cm is not None
-        }
+        },
+        "profile_cache": dm.cache_stats() if dm else None,
+        "conversation_tier": ea.memory_graph.conversations.stats() if ea else None,
+        "shared_memory_graph": dm.shared_graph.status() if dm and dm.shared_graph else None
     }
 
 # Root endpoint
 @app.get("/")
-def root():
+async def root():
     return {"message": "Welcome To Evalve"}
 
 @app.post("/api/signup/investor")
-def create_inverstor(data: InvestorProfile):
+async def create_inverstor(data: InvestorProfile):
     if not dm:
         raise HTTPException(status_code=503, detail="Database service unavailable")
     try: 
-        new_investor_entry = dm.save_investor_profile(data.model_dump())
+        new_investor_entry = await adm.save_investor_profile(data.model_dump())
         return {"status": "success", "id": new_investor_entry}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -283,9 +311,11 @@ async def create_entrepreneur(request: Request):
         print("Mapped startup data:", startup_data)  # Debug log
 
 
-        # Save Startup
-        new_entry = dm.save_startup_profile(startup_data)
-        startup_id = new_entry
+        # Save Startup with its founders, and add it to the memory graph so it shows up
+        # in similar-startup and competitor results right away
+        if founders_data:
+            startup_data['founders'] = founders_data
+        new_entry = await adm.save_startup_with_graph_update(startup_data)
 
         print("Database save result:", new_entry)  # Debug log
 
@@ -293,21 +323,6 @@ async def create_entrepreneur(request: Request):
         if new_entry is None:
             raise HTTPException(status_code=500, detail="Failed to save startup profile to database")
 
-        # Save founders if provided
-        if founders_data:
-                dm.save_founders(startup_id,founders_data)
-
-                # # Convert equityShare to float if it's a string
-                # if 'equityShare' in founder_data and founder_data['equityShare']:
-                #     try:
-                #         founder_data['equityShare'] = float(founder_data['equityShare'])
-                #     except (ValueError, TypeError):
-                #         founder_data['equityShare'] = None
-                
-                # # Handle LinkedIn URL field name mapping
-                # if 'linkedIn' in founder_data:
-                #     founder_data['linkedin_profile'] = founder_data.pop('linkedIn')
-
         return {"status": "success", "id": new_entry}
     
     except Exception as e:
@@ -315,7 +330,7 @@ async def create_entrepreneur(request: Request):
 
 
 @app.get("/api/startups", response_model=List[Dict[str, Any]])
-def get_all_startup(
+async def get_all_startup(
     limit: int = 50,
     industry_sector: Optional[str] = None,
     stage: Optional[str] = None,
@@ -334,28 +349,167 @@ def get_all_startup(
         if funding_stage:
             filters['funding_stage'] = funding_stage
             
-        response = dm.get_all_startups(filters=filters, limit=limit)
+        response = await adm.get_all_startups(filters=filters, limit=limit)
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching startups: {str(e)}")
 
 
+# Must be registered before /api/startups/{startup_id}, which would otherwise capture "search"
+@app.get("/api/startups/search", response_model=List[Dict[str, Any]])
+async def search_startups(q: str, response: Response, limit: int = 20, cursor: Optional[str] = None):
+    """Search startups by name, industry, or description (ranked, keyset-paginated)
+
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    if not dm:
+        raise HTTPException(status_code=503, detail="Database service unavailable")
+    
+    try:
+        page = await adm.search_startups_page(q, limit=limit, cursor=cursor)
+        if page["next_cursor"]:
+            response.headers["X-Next-Cursor"] = page["next_cursor"]
+        return page["results"]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching startups: {str(e)}")
+
+
+@app.get("/api/startups/semantic-search", response_model=List[Dict[str, Any]])
+async def semantic_search_startups(q: str, limit: int = 20, mode: str = "hybrid"):
+    """Search startups by concept (e.g. "cold-chain logistics for pharma")
+
+    mode is "hybrid" (vector + keyword), "vector" or "keyword".
+    """
+    if not dm:
+        raise HTTPException(status_code=503, detail="Database service unavailable")
+
+    try:
+        return await adm.semantic_search_startups(q, limit=limit, mode=mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching startups: {str(e)}")
+
+
+@app.get("/api/investors/portfolio/summary")
+async def get_fund_portfolio_summary(investor_ids: Optional[str] = None):
+    """Industry and stage distributions across investor portfolios in the memory graph
+
+    investor_ids is an optional comma-separated list; all investors by default.
+    """
+    if not dm:
+        raise HTTPException(status_code=503, detail="Database service unavailable")
+    ids = [investor_id.strip() for investor_id in investor_ids.split(",") if investor_id.strip()] \
+        if investor_ids else None
+    return await asyncio.to_thread(dm.memory_graph.get_fund_portfolio_summary, ids)
+
+
+@app.get("/api/investors/portfolio/compare")
+async def compare_investor_portfolios(investor_ids: str):
+    """Industry/stage mix and co-investment overlap of 2-20 comma-separated investors"""
+    if not dm:
+        raise HTTPException(status_code=503, detail="Database service unavailable")
+    ids = [investor_id.strip() for investor_id in investor_ids.split(",") if investor_id.strip()]
+    if not 2 <= len(ids) <= 20:
+        raise HTTPException(status_code=400, detail="Provide 2-20 investor_ids")
+    return await asyncio.to_thread(dm.memory_graph.compare_investor_portfolios, ids)
+
+
+@app.get("/api/investors/{investor_id}/recommendations")
+async def get_investor_recommendations(investor_id: str, k: int = 10, viewed: Optional[str] = None):
+    """Startups ranked for an investor by personalized PageRank over the memory graph
+
+    Seeded from the investor's portfolio plus viewed, an optional
+    comma-separated list of startup ids they looked at.
+    """
+    if not dm:
+        raise HTTPException(status_code=503, detail="Database service unavailable")
+    if not 1 <= k <= 50:
+        raise HTTPException(status_code=400, detail="k must be 1-50")
+
+    graph = dm.memory_graph
+    viewed_ids = [startup_id.strip() for startup_id in viewed.split(",") if startup_id.strip()] if viewed else []
+    if investor_id not in graph.entities and not any(startup_id in graph.entities for startup_id in viewed_ids):
+        raise HTTPException(status_code=404, detail="Investor not in the memory graph")
+    result = await asyncio.to_thread(graph.recommend_startups, investor_id, viewed_ids, k=k)
+    for row in result["recommendations"]:
+        row["startup"] = row["startup"].to_dict()
+    return result
+
+
+@app.get("/api/investors/{investor_id}/connections/{startup_id}")
+async def get_portfolio_connections(investor_id: str, startup_id: str, k: int = 3, max_depth: int = 4):
+    """How a startup is connected to an investor's portfolio in the memory graph
+
+    Returns up to k paths, strongest relationships first. Searches are
+    bounded; "complete": false means a limit stopped it early.
+    """
+    if not dm:
+        raise HTTPException(status_code=503, detail="Database service unavailable")
+    if not 1 <= k <= 10 or not 1 <= max_depth <= 6:
+        raise HTTPException(status_code=400, detail="k must be 1-10 and max_depth 1-6")
+
+    graph = dm.memory_graph
+    if investor_id not in graph.entities or startup_id not in graph.entities:
+        raise HTTPException(status_code=404, detail="Investor or startup not in the memory graph")
+    return await asyncio.to_thread(graph.find_portfolio_connections, investor_id, startup_id, k=k,
+                                   max_depth=max_depth)
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@app.get("/api/graph/export")
+async def export_memory_graph(format: str = "ndjson", kind: str = "entities", entity_types: Optional[str] = None,
+                              relation_types: Optional[str] = None):
+    """Stream the memory graph as NDJSON (entities then relationships) or one Arrow IPC / Parquet table
+
+    entity_types and relation_types are optional comma-separated filters;
+    kind picks the "entities" or "relationships" table for arrow/parquet.
+    """
+    if not dm:
+        raise HTTPException(status_code=503, detail="Database service unavailable")
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be ndjson, arrow or parquet")
+    if kind not in ("entities", "relationships"):
+        raise HTTPException(status_code=400, detail="kind must be entities or relationships")
+
+    def split(value):
+        return [part.strip() for part in value.split(",") if part.strip()] if value else None
+
+    stream = dm.memory_graph.export_stream(format, kind, split(entity_types), split(relation_types))
+    extension = {"ndjson": "ndjson", "arrow": "arrows", "parquet": "parquet"}[format]
+    name = "memory_graph" if format == "ndjson" else f"memory_graph_{kind}"
+    return StreamingResponse(
+        stream,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'}
+    )
+
+
 @app.get("/api/startups/{startup_id}")
-def get_specific_startup(startup_id:str):
+async def get_specific_startup(startup_id:str):
     """ Get Specific Startup Profile And Insights"""
     if not dm or not ea:
         raise HTTPException(status_code=503, detail="Required services unavailable")
     try:
-        specific_profile = dm.get_startup_by_name_or_id(startup_id)
+        specific_profile = await adm.resolve_startup(startup_id)
 
         if not specific_profile:
             raise HTTPException(status_code=404, detail="Startup not found")
 
         try:
-            specific_profile_insights = ea.get_startup_insight(specific_profile)
+            # Served from startup_insights; regenerated in the background when stale
+            specific_profile_insights = await asyncio.to_thread(ea.get_cached_startup_insight, specific_profile)
         except Exception as e:
             print(f"Error getting insights: {e}")
-            specific_profile_insights = {"error": "Could not generate insights"}
+            specific_profile_insights = {"error": "Could not generate insights", "status": "pending"}
 
         return {"Startup" : specific_profile,
                 "Insights" : specific_profile_insights
@@ -368,20 +522,23 @@ def get_specific_startup(startup_id:str):
 
 
 @app.post("/api/startups/{startup_id}/chat", response_model=ChatResponse)
-def specific_profile_chat(startup_id:str, req: ChatModel):
+async def specific_profile_chat(startup_id:str, req: ChatModel):
     """ Chat about that Specific Startup Profile"""
 
     if not dm or not ea or not cm:
         raise HTTPException(status_code=503, detail="Required services unavailable")
     
     try:
-        startup_profile = dm.get_startup_by_name_or_id(startup_id)
+        startup_profile = await adm.resolve_startup(startup_id)
         if not startup_profile:
             raise HTTPException(status_code=404, detail="Startup not found")
 
-        session_id = req.session_id or cm._generate_session_id()
+        session_id = req.session_id or cm.generate_session_id()
 
-        response = ea.get_startup_chatbot(req.query,startup_id,session_id)
+        # Pass the resolved row through so the agent does not resolve it again; the agent
+        # call blocks on the LLM, so it runs in a worker thread
+        response = await asyncio.to_thread(ea.get_startup_chatbot, req.query, startup_id, session_id,
+                                           startup_data=startup_profile)
 
         return ChatResponse(
             response=response,
@@ -395,27 +552,40 @@ def specific_profile_chat(startup_id:str, req: ChatModel):
         raise HTTPException(status_code=500, detail=f"Error in chat: {str(e)}")
     
 
-@app.get("/api/startups/search", response_model=List[Dict[str, Any]])
-def search_startups(q: str, limit: int = 20):
-    """Search startups by name, industry, or description"""
-    if not dm:
-        raise HTTPException(status_code=503, detail="Database service unavailable")
-    
-    try:
-        results = dm.search_startups(q, limit=limit)
-        return results
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error searching startups: {str(e)}")
+@app.post("/api/startups/{startup_id}/chat/stream")
+async def specific_profile_chat_stream(startup_id:str, req: ChatModel):
+    """ Chat about that Specific Startup Profile, streamed as Server-Sent Events"""
+
+    if not dm or not ea or not cm:
+        raise HTTPException(status_code=503, detail="Required services unavailable")
+
+    startup_profile = await adm.resolve_startup(startup_id)
+    if not startup_profile:
+        raise HTTPException(status_code=404, detail="Startup not found")
+
+    session_id = req.session_id or cm.generate_session_id()
+
+    # Sync generator: StreamingResponse iterates it in a worker thread
+    def event_stream():
+        yield format_sse("session", {"session_id": session_id, "startup_id": startup_id})
+        for event in ea.stream_startup_chatbot(req.query, startup_id, session_id, startup_data=startup_profile):
+            yield format_sse(event["event"], event["data"])
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.get("/api/startup/genimg")
-def business_model_generation(startup_id:str):
+async def business_model_generation(startup_id:str):
     """ Visual Representation of Business Model in form of Business Model Canvas """
     if not dm:
         raise HTTPException(status_code=503, detail="Database service unavailable")
     
     try:
-        startup_profile = dm.get_startup_profile(startup_id)
+        startup_profile = await adm.get_startup_profile(startup_id)
 
         image_gen = img_pipeline()
 
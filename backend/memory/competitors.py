@@ -0,0 +1,265 @@
+import math
+import re
+import threading
+import time
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+TEXT_FIELDS = ("problem_statement", "solution_description", "target_market")
+HASH_FEATURES = 1 << 20  # Hashed unigram and bigram buckets
+COMPETITOR_TOP_K = 10
+COMPETITOR_THRESHOLD = 0.2  # Minimum cosine similarity for a competes_with edge
+COMPETITOR_WEIGHT_KEY = "text_similarity"  # Marks competes_with edges written from text
+MAX_DOCUMENT_SHARE = 0.1  # Terms in a larger share of profiles are dropped like stop words
+MIN_DROPPED_FREQUENCY = 50  # ... but only once they appear in more profiles than this
+BLOCK_PRODUCTS = 4_000_000  # Partial dot products gathered per block of profiles
+BLOCK_CELLS = 4_000_000  # Dense score cells per block
+MAX_PENDING = 1024  # Profiles rescored since the last build before the postings are rebuilt
+
+STOP_WORDS = frozenset((
+    "a an and are as at be but by for from has have in into is it its of on or our that the their them "
+    "they this to was we were which who will with you your"
+).split())
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=262144)
+def _bucket(feature: str) -> int:
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(feature.encode("utf-8")) & (HASH_FEATURES - 1)
+
+
+def profile_terms(properties: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted hashed term buckets of a profile's text fields and their counts"""
+    buckets = []
+    for field in TEXT_FIELDS:
+        words = [word for word in _WORD.findall(str(properties.get(field) or "").lower())
+                 if len(word) > 1 and word not in STOP_WORDS]
+        buckets.extend(_bucket(word) for word in words)
+        buckets.extend(_bucket(f"{first} {second}") for first, second in zip(words, words[1:]))
+    return np.unique(np.asarray(buckets, dtype=np.int32), return_counts=True)
+
+
+class CompetitorIndex:
+    """Text-similarity competitors of every startup, behind the competes_with edges
+
+    Each startup's problem_statement, solution_description and
+    target_market are turned into hashed unigram and bigram terms, weighted
+    by sublinear tf times smoothed idf and L2-normalized, so a dot product
+    is a cosine similarity. The matrix is kept as NumPy CSR arrays (rows are
+    startups) plus an inverted copy (postings per term), so no SciPy is
+    needed. Terms that appear in more than MAX_DOCUMENT_SHARE of the
+    profiles are dropped.
+
+    The batch build multiplies the matrix by its transpose a block of rows
+    at a time: each row's terms are expanded into their postings and the
+    partial products summed with one np.bincount into a dense block. Blocks
+    are sized so neither the products nor the dense cells exceed their
+    budget, which keeps memory flat at any corpus size. Each startup keeps
+    its top_k neighbors at or above threshold, and a pair becomes one edge
+    if either side keeps the other.
+
+    rescore re-vectorizes a single profile with the idf of the last build
+    and scores it against the postings (profiles rescored since then are
+    compared directly). It keeps its own top_k plus any startup whose k-th
+    best score it now reaches, so a rescored profile enters the lists it
+    would win in a full build. k-th scores are only known for startups
+    scored by a build or rescore in this process: after a restart (the
+    index loads lazily from the snapshot's store) a rescored profile joins
+    no other startup's list until it is scored again or the next build.
+    Every MAX_PENDING rescored profiles the postings and idf are rebuilt
+    from the store.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._nodes = np.zeros(0, dtype=np.int64)  # row -> node
+        self._row_of: Dict[int, int] = {}  # node -> row
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._terms = np.zeros(0, dtype=np.int32)
+        self._values = np.zeros(0, dtype=np.float32)
+        self._post_indptr = np.zeros(HASH_FEATURES + 1, dtype=np.int64)
+        self._post_rows = np.zeros(0, dtype=np.int32)
+        self._post_values = np.zeros(0, dtype=np.float32)
+        self._idf = np.zeros(HASH_FEATURES, dtype=np.float64)
+        self._stale = np.zeros(0, dtype=bool)  # rows superseded by a pending vector
+        self._pending: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}  # node -> vector rescored since the build
+        self._floor: Dict[int, float] = {}  # node -> score of its k-th competitor (threshold if fewer)
+        self.loaded = False
+        self._lock = threading.Lock()
+        self.stats = {"builds": 0, "rescored": 0, "last_build_ms": 0.0, "last_rescore_ms": 0.0}
+
+    # ---- vectors ----
+
+    def _startups(self) -> List[int]:
+        return sorted(self.store.type_members.get("startup", ()))
+
+    def _load(self, nodes: List[int]):
+        """Vectorize every profile, fit idf and build the postings. Caller holds the lock"""
+        records = self.store.records
+        parsed = [profile_terms(records[node].properties) for node in nodes]
+        lengths = np.fromiter((len(terms) for terms, _ in parsed), dtype=np.int64, count=len(parsed))
+        terms = np.concatenate([terms for terms, _ in parsed]) if parsed else np.zeros(0, dtype=np.int32)
+        counts = np.concatenate([counts for _, counts in parsed]) if parsed else np.zeros(0, dtype=np.int64)
+        rows = np.repeat(np.arange(len(nodes), dtype=np.int64), lengths)
+
+        documents = len(nodes)
+        frequency = np.bincount(terms, minlength=HASH_FEATURES)
+        self._idf = np.log((1.0 + documents) / (1.0 + frequency)) + 1.0
+        self._idf[frequency > max(MIN_DROPPED_FREQUENCY, MAX_DOCUMENT_SHARE * documents)] = 0.0
+
+        weights = (1.0 + np.log(counts)) * self._idf[terms]
+        keep = weights > 0
+        terms, rows, weights = terms[keep], rows[keep], weights[keep]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=documents))
+        values = (weights / norms[rows]).astype(np.float32)
+
+        self._nodes = np.asarray(nodes, dtype=np.int64)
+        self._row_of = {node: row for row, node in enumerate(nodes)}
+        self._indptr = np.zeros(documents + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=documents), out=self._indptr[1:])
+        self._terms, self._values = terms, values
+
+        order = np.argsort(terms, kind='stable')
+        self._post_indptr = np.zeros(HASH_FEATURES + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=HASH_FEATURES), out=self._post_indptr[1:])
+        self._post_rows = rows[order].astype(np.int32)
+        self._post_values = values[order]
+        self._stale = np.zeros(documents, dtype=bool)
+        self._pending.clear()
+        self.loaded = True
+
+    def _vector(self, properties: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """One profile's normalized tf-idf terms under the idf of the last build"""
+        terms, counts = profile_terms(properties)
+        weights = (1.0 + np.log(counts)) * self._idf[terms]
+        keep = weights > 0
+        terms, weights = terms[keep], weights[keep]
+        norm = np.sqrt(np.dot(weights, weights))
+        return terms, (weights / norm if norm else weights).astype(np.float32)
+
+    def _gather(self, query: np.ndarray, terms: np.ndarray, values: np.ndarray):
+        """(query id, row, partial product) for every posting of every query term"""
+        starts = self._post_indptr[terms]
+        counts = self._post_indptr[terms + 1] - starts
+        total = int(counts.sum())
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+        products = np.repeat(values, counts).astype(np.float64) * self._post_values[positions]
+        return np.repeat(query, counts), self._post_rows[positions], products
+
+    # ---- batch ----
+
+    @staticmethod
+    def _top(rows: np.ndarray, columns: np.ndarray, scores: np.ndarray, top_k: int):
+        """Best top_k (row, column, score) per row, and each full row's k-th score"""
+        order = np.lexsort((columns, -scores, rows))
+        rows, columns, scores = rows[order], columns[order], scores[order]
+        first = np.searchsorted(rows, rows, side='left')
+        rank = np.arange(len(rows)) - first
+        keep = rank < top_k
+        full = rank == top_k - 1
+        return rows[keep], columns[keep], scores[keep], rows[full], scores[full]
+
+    def build(self, top_k: int = COMPETITOR_TOP_K, threshold: float = COMPETITOR_THRESHOLD):
+        """Load every startup and return its competitor pairs (source node < target node, cosine score)"""
+        started = time.perf_counter()
+        with self._lock:
+            self._load(self._startups())
+            documents = len(self._nodes)
+            indptr = self._indptr
+            # Partial products each row expands into, to size the blocks
+            entry_cost = np.zeros(len(self._terms) + 1, dtype=np.int64)
+            np.cumsum(np.diff(self._post_indptr)[self._terms], out=entry_cost[1:])
+            row_cost = entry_cost[indptr]
+            max_rows = max(1, BLOCK_CELLS // max(documents, 1))
+
+            found_rows, found_columns, found_scores = [], [], []
+            self._floor = dict.fromkeys(self._nodes.tolist(), threshold)
+            start = 0
+            while start < documents:
+                end = int(np.searchsorted(row_cost, row_cost[start] + BLOCK_PRODUCTS, side='right')) - 1
+                end = min(max(end, start + 1), start + max_rows, documents)
+                lo, hi = indptr[start], indptr[end]
+                block = end - start
+                query = np.repeat(np.arange(block, dtype=np.int64), np.diff(indptr[start:end + 1]))
+                query, rows, products = self._gather(query, self._terms[lo:hi], self._values[lo:hi])
+                dense = np.bincount(query * documents + rows, weights=products, minlength=block * documents)
+                dense[np.arange(block) * documents + np.arange(start, end)] = 0.0  # Self matches
+                passing = np.flatnonzero(dense >= threshold)
+                rows, columns, scores, full_rows, floors = self._top(
+                    passing // documents + start, passing % documents, dense[passing], top_k)
+                found_rows.append(rows)
+                found_columns.append(columns)
+                found_scores.append(scores)
+                self._floor.update(zip(self._nodes[full_rows].tolist(), floors.tolist()))
+                start = end
+
+        rows = np.concatenate(found_rows) if found_rows else np.zeros(0, dtype=np.int64)
+        columns = np.concatenate(found_columns) if found_columns else np.zeros(0, dtype=np.int64)
+        scores = np.concatenate(found_scores) if found_scores else np.zeros(0, dtype=np.float64)
+        sources = self._nodes[np.minimum(rows, columns)]
+        targets = self._nodes[np.maximum(rows, columns)]
+        # A pair kept by both sides appears twice; keep the first (scores agree up to rounding)
+        keys = sources * (int(self._nodes.max()) + 1 if documents else 1) + targets
+        _, first = np.unique(keys, return_index=True)
+        self.stats["builds"] += 1
+        self.stats["last_build_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return sources[first], targets[first], np.round(scores[first], 6)
+
+    # ---- incremental ----
+
+    def rescore(self, node: int, top_k: int = COMPETITOR_TOP_K,
+                threshold: float = COMPETITOR_THRESHOLD) -> Dict[int, float]:
+        """Re-vectorize one startup and return its competitors ({node: cosine score})"""
+        started = time.perf_counter()
+        store = self.store
+        with self._lock:
+            if not self.loaded or len(self._pending) >= MAX_PENDING:
+                self._load(self._startups())
+            terms, values = self._vector(store.records[node].properties)
+            row = self._row_of.get(node)
+            if row is not None:
+                self._stale[row] = True
+            self._pending[node] = (terms, values)
+
+            _, rows, products = self._gather(np.zeros(len(terms), dtype=np.int64), terms, values)
+            scores = np.bincount(rows, weights=products, minlength=len(self._nodes))
+            scores[self._stale] = 0.0
+            passing = np.flatnonzero(scores >= threshold)
+            candidates = dict(zip(self._nodes[passing].tolist(), scores[passing].tolist()))
+            for other, (other_terms, other_values) in self._pending.items():
+                if other == node:
+                    continue
+                _, mine, theirs = np.intersect1d(terms, other_terms, assume_unique=True, return_indices=True)
+                score = float(np.dot(values[mine].astype(np.float64), other_values[theirs]))
+                if score >= threshold:
+                    candidates[other] = score
+
+            records = store.records
+            ranked = sorted(
+                ((other, score) for other, score in candidates.items()
+                 if records[other] is not None and records[other].type == "startup"),
+                key=lambda item: (-item[1], item[0])
+            )
+            kept = {other: round(score, 6) for other, score in ranked[:top_k]}
+            # Startups whose own list this one now makes; an unknown floor (no build since
+            # a restart) admits nothing rather than everything above threshold
+            for other, score in ranked[top_k:]:
+                if score >= self._floor.get(other, math.inf):
+                    kept[other] = round(score, 6)
+            self._floor[node] = ranked[top_k - 1][1] if len(ranked) >= top_k else threshold
+        self.stats["rescored"] += 1
+        self.stats["last_rescore_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return kept
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "profiles": len(self._nodes),
+            "terms": len(self._terms),
+            "pending": len(self._pending),
+            **self.stats
+        }
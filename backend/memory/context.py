@@ -0,0 +1,189 @@
+import re
+import threading
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+
+# Intents in priority order: the first one with a keyword anywhere in the query wins
+CHAT_INTENTS = (
+    ("competitors", ("competitor", "competition", "rival")),
+    ("similar_startups", ("similar", "like", "comparable")),
+    ("team", ("founder", "team", "who")),
+    ("funding", ("funding", "investment", "investor")),
+    ("market", ("market", "industry", "sector")),
+)
+
+# Sections built for each intent; "general" is a query with no intent keyword
+INTENT_SECTIONS = {
+    "competitors": ("competitors",),
+    "similar_startups": ("similar_startups",),
+    "team": ("founders", "team_members"),
+    "funding": ("investors",),
+    "market": ("market_connections",),
+    "general": ("founders", "team_members", "investors", "competitors", "market_connections",
+                "technology_stack", "partnerships"),
+}
+
+# Direct-relation sections: (neighbor entity type, relationship)
+DIRECT_SECTIONS = {
+    "founders": ("founder", "founded_by"),
+    "team_members": ("team_member", "employs"),
+    "investors": ("investor", "invested_by"),
+    "market_connections": ("industry", "operates_in"),
+    "technology_stack": ("technology", "uses_technology"),
+    "partnerships": ("startup", "partners_with"),
+}
+
+SECTION_LIMIT = 10  # Rows per context section
+CONTEXT_CACHE_SIZE = 4096
+# Touching more nodes than this at once drops every cached context
+BULK_TOUCH_LIMIT = 50_000
+
+
+class IntentMatcher:
+    """Classifies a chat query with one precompiled alternation over every intent keyword"""
+
+    def __init__(self, intents=CHAT_INTENTS):
+        self._priority = {}
+        keywords = []
+        for priority, (intent, words) in enumerate(intents):
+            for word in words:
+                self._priority.setdefault(word, (priority, intent))
+                keywords.append(re.escape(word))
+        # Longest first so overlapping keywords match whole
+        self._pattern = re.compile("|".join(sorted(keywords, key=len, reverse=True)))
+
+    def match(self, query: str) -> Optional[str]:
+        best = None
+        for found in self._pattern.finditer(query.lower()):
+            candidate = self._priority[found.group(0)]
+            if best is None or candidate < best:
+                best = candidate
+                if best[0] == 0:
+                    break
+        return best[1] if best else None
+
+
+class ChatContextBuilder:
+    """Builds MemoryGraph.get_chatbot_context one intent at a time
+
+    Only the sections an intent needs are computed, each capped at
+    SECTION_LIMIT rows. Contexts are cached per (startup, intent). The
+    builder watches the GraphStore and records when each node was last
+    touched, and a cached context is reused only while none of the nodes
+    it read from have been touched since it was built.
+    """
+
+    def __init__(self, graph, section_limit: int = SECTION_LIMIT, cache_size: int = CONTEXT_CACHE_SIZE):
+        self.graph = graph
+        self.store = graph.store
+        self.section_limit = section_limit
+        self.matcher = IntentMatcher()
+        self._cache = LRUCache(maxsize=cache_size)
+        self._touched: Dict[int, int] = {}  # node -> tick it last changed at
+        self._tick = 0
+        self._cleared_at = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+        self.store.watchers.append(self)
+
+    def touch(self, nodes):
+        """Store callback: these nodes' edges or entity types changed"""
+        with self._lock:
+            self._tick += 1
+            if isinstance(nodes, np.ndarray):
+                if len(nodes) > BULK_TOUCH_LIMIT:
+                    self._cleared_at = self._tick
+                    self._cache.clear()
+                    return
+                nodes = nodes.tolist()
+            for node in nodes:
+                self._touched[node] = self._tick
+
+    # ---- sections ----
+
+    def _direct_sections(self, startup_id: str, sections: Tuple[str, ...]) -> Dict[str, List[Dict]]:
+        wanted = {DIRECT_SECTIONS[name]: name for name in sections}
+        codes = [pair[1] for pair in wanted]
+        built = {name: [] for name in sections}
+        for rel in self.graph.get_related_entities(startup_id, codes):
+            name = wanted.get((rel["entity"].type, rel["relationship"]))
+            if name is not None and len(built[name]) < self.section_limit:
+                built[name].append(rel)
+        return built
+
+    def _competitors(self, startup_id: str) -> Tuple[List[Dict], List[int]]:
+        """First SECTION_LIMIT competes_with / similar_to rows of the 2-hop expansion, plus the nodes read
+
+        Same breadth-first order as get_related_entities(max_depth=2), stopped
+        once the section is full instead of expanding the whole neighborhood.
+        """
+        relation_types = ["competes_with", "similar_to"]
+        visited, expanded, rows = set(), [], []
+        queue = deque([(startup_id, 0)])
+        while queue and len(rows) < self.section_limit:
+            current_id, depth = queue.popleft()
+            if current_id in visited or depth >= 2:
+                continue
+            visited.add(current_id)
+            expanded.append(self.store.node_of[current_id])
+            for rel in self.graph._get_direct_relations(current_id, relation_types):
+                if rel["entity_id"] not in visited:
+                    rel["depth"] = depth + 1
+                    rows.append(rel)
+                    queue.append((rel["entity_id"], depth + 1))
+        return rows[:self.section_limit], expanded
+
+    def _build(self, startup_id: str, node: int, intent: str) -> Tuple[Dict[str, Any], List[int]]:
+        """Context for one intent, plus every node it was read from"""
+        sections = INTENT_SECTIONS[intent]
+        context = {"startup": self.store.records[node]}
+        scope = [node]
+        direct = tuple(name for name in sections if name in DIRECT_SECTIONS)
+        if direct:
+            context.update(self._direct_sections(startup_id, direct))
+        if "competitors" in sections:
+            context["competitors"], scope = self._competitors(startup_id)
+        # Rows hold the neighbors' records, so a replaced neighbor invalidates too
+        node_of = self.store.node_of
+        for name in sections:
+            for rel in context.get(name, ()):
+                scope.append(node_of[rel["entity_id"]])
+        return context, scope
+
+    # ---- lookups ----
+
+    def _current(self, entry: Tuple[int, Tuple[int, ...], Dict]) -> bool:
+        built_at, scope, _ = entry
+        return built_at >= self._cleared_at and all(self._touched.get(node, 0) <= built_at for node in scope)
+
+    def get(self, startup_id: str, query: str) -> Dict[str, Any]:
+        intent = self.matcher.match(query) or "general"
+        store = self.store
+        node = store.node_of.get(startup_id)
+        if node is None or store.records[node] is None:
+            context = {}
+        else:
+            with self._lock:
+                entry = self._cache.get((node, intent))
+                if entry is not None and not self._current(entry):
+                    entry = None
+                tick = self._tick
+            if entry is None:
+                self.stats["misses"] += 1
+                context, scope = self._build(startup_id, node, intent)
+                entry = (tick, tuple(scope), context)
+                with self._lock:
+                    self._cache[(node, intent)] = entry
+            else:
+                self.stats["hits"] += 1
+            context = dict(entry[2])
+
+            # Similar startups come from the signature index, which has its own cache
+            if "similar_startups" in INTENT_SECTIONS[intent]:
+                context["similar_startups"] = self.graph.find_similar_startups(startup_id, limit=self.section_limit)
+        if intent != "general":
+            context["focus"] = intent
+        return context
@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+from memory.graph_store import EntityRecord
+
+# Defaults for MemoryGraph.conversations
+CONVERSATION_MAX_ENTRIES = 20_000
+CONVERSATION_MEMORY_BUDGET = 32 * 1024 * 1024  # bytes
+CONVERSATION_TTL = 24 * 60 * 60  # seconds
+
+
+class ConversationTier:
+    """Bounded, in-process tier for "conversation" entities of a MemoryGraph
+
+    Chat turns used to become permanent graph entities. They now live here
+    instead, keyed by conversation id and linked to the startup they
+    discuss, and are evicted least-recently-used first once the tier
+    exceeds max_entries or memory_budget_bytes, or an entry goes unread for
+    ttl_seconds. Nothing here goes into the GraphStore, snapshots or the
+    change log; the exchanges themselves are persisted in the conversations
+    table.
+    """
+
+    def __init__(self,
+                 max_entries: int = CONVERSATION_MAX_ENTRIES,
+                 memory_budget_bytes: int = CONVERSATION_MEMORY_BUDGET,
+                 ttl_seconds: float = CONVERSATION_TTL):
+        self.max_entries = max_entries
+        self.memory_budget_bytes = memory_budget_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()  # conversation id -> [record, startup id, size, last used], LRU first
+        self._by_startup: Dict[str, OrderedDict] = {}  # startup id -> conversation ids, oldest first
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {"added": 0, "evictions": 0, "expired": 0}
+
+    def _size(self, conversation_id: str, properties: Dict[str, Any]) -> int:
+        """Approximate footprint of one entry (text payload plus record and index overhead)"""
+        return 400 + len(conversation_id) + sum(
+            len(key) + (len(value) if isinstance(value, str) else 16) for key, value in properties.items()
+        )
+
+    def add(self, conversation_id: str, properties: Dict[str, Any], startup_id: str = None) -> EntityRecord:
+        """Store a conversation, replacing one with the same id, then re-check the limits"""
+        now = time.time()
+        record = EntityRecord("conversation", properties, now)
+        with self._lock:
+            self._remove(conversation_id)
+            size = self._size(conversation_id, properties)
+            self._entries[conversation_id] = [record, startup_id, size, time.monotonic()]
+            self._total_bytes += size
+            if startup_id:
+                self._by_startup.setdefault(startup_id, OrderedDict())[conversation_id] = None
+            self._stats["added"] += 1
+            self._enforce_budget(keep=conversation_id)
+        return record
+
+    def get(self, conversation_id: str) -> Optional[EntityRecord]:
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is None:
+                return None
+            self._entries.move_to_end(conversation_id)
+            entry[3] = time.monotonic()
+            return entry[0]
+
+    def for_startup(self, startup_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most recent conversations about a startup, newest first"""
+        with self._lock:
+            self._evict_expired()
+            conversation_ids = list(self._by_startup.get(startup_id, ()))
+            return [
+                {"entity_id": conversation_id, "entity": self._entries[conversation_id][0]}
+                for conversation_id in reversed(conversation_ids[-limit:])
+            ] if limit > 0 else []
+
+    def remove(self, conversation_id: str) -> bool:
+        with self._lock:
+            return self._remove(conversation_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_startup.clear()
+            self._total_bytes = 0
+
+    def _remove(self, conversation_id: str) -> bool:
+        """Drop an entry and its accounting. Caller holds the lock"""
+        entry = self._entries.pop(conversation_id, None)
+        if entry is None:
+            return False
+        _, startup_id, size, _ = entry
+        self._total_bytes -= size
+        if startup_id:
+            linked = self._by_startup.get(startup_id)
+            if linked is not None:
+                linked.pop(conversation_id, None)
+                if not linked:
+                    del self._by_startup[startup_id]
+        return True
+
+    def _evict_expired(self) -> int:
+        """Evict from the LRU end while entries are past the TTL. Caller holds the lock"""
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = 0
+        while self._entries:
+            conversation_id, entry = next(iter(self._entries.items()))
+            if entry[3] > cutoff:
+                break
+            self._remove(conversation_id)
+            expired += 1
+        self._stats["expired"] += expired
+        return expired
+
+    def _enforce_budget(self, keep: str = None):
+        """Expire old entries, then evict least-recently-used ones until under both limits"""
+        self._evict_expired()
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._total_bytes > self.memory_budget_bytes):
+            conversation_id = next(iter(self._entries))
+            if conversation_id == keep and len(self._entries) == 1:
+                break
+            self._remove(conversation_id)
+            self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and memory usage against the budget"""
+        with self._lock:
+            return {
+                "conversations": len(self._entries),
+                "startups": len(self._by_startup),
+                "max_entries": self.max_entries,
+                "approx_bytes": self._total_bytes,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                **self._stats
+            }
+
+    def __contains__(self, conversation_id: str) -> bool:
+        with self._lock:
+            return conversation_id in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
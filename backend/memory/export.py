@@ -0,0 +1,400 @@
+import json
+import math
+import time
+from datetime import datetime
+from json.encoder import encode_basestring_ascii
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from memory.graph_store import _iso
+
+EXPORT_BATCH_SIZE = 5_000  # Rows per NDJSON chunk / Arrow record batch
+IMPORT_BATCH_SIZE = 100_000  # Relationships buffered before a bulk upsert
+PARQUET_MAGIC = b"PAR1"
+
+ENTITY_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("type", pa.dictionary(pa.int32(), pa.string())),
+    ("properties", pa.string()),  # JSON
+    ("created_at", pa.timestamp("us", tz="UTC")),
+    ("updated_at", pa.timestamp("us", tz="UTC")),
+])
+
+RELATIONSHIP_SCHEMA = pa.schema([
+    ("source", pa.string()),
+    ("target", pa.string()),
+    ("type", pa.dictionary(pa.int32(), pa.string())),
+    ("weight", pa.float64()),
+    ("properties", pa.string()),  # JSON
+    ("created_at", pa.timestamp("us", tz="UTC")),
+])
+
+SCHEMAS = {"entities": ENTITY_SCHEMA, "relationships": RELATIONSHIP_SCHEMA}
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+
+def _micros(timestamps: List[float]) -> np.ndarray:
+    return np.rint(np.asarray(timestamps, dtype=np.float64) * 1_000_000).astype(np.int64)
+
+
+class GraphExporter:
+    """Streams a GraphStore out in bounded batches instead of one export_graph dict
+
+    The column references are captured when the exporter is created, so a
+    vacuum during a long download (which renumbers edges into new arrays)
+    does not shift the rows being read. Entities are exported by node id
+    and relationships by edge id. A relationship is only exported when
+    both of its endpoints pass the entity type filter.
+    """
+
+    def __init__(self, store, entity_types: Iterable[str] = None, relation_types: Iterable[str] = None,
+                 batch_size: int = EXPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.ids = store.ids
+        self.records = store.records
+        self.node_count = len(store.ids)
+        self.rel_names = list(store.rel_names)
+        self.prop_keys = list(store.prop_keys)
+        self.entity_types = set(entity_types) if entity_types else None
+        self.relation_codes = store.rel_filter(relation_types)
+        if relation_types and not self.relation_codes:
+            self.relation_codes = set()  # Filter names no relationship type: export none
+
+        self.node_mask = None
+        if self.entity_types is not None:
+            self.node_mask = np.zeros(self.node_count, dtype=bool)
+            for entity_type in self.entity_types:
+                members = [node for node in store.type_members.get(entity_type, ()) if node < self.node_count]
+                self.node_mask[members] = True
+
+        self.edge_total = len(store.src)
+        self._columns = {name: getattr(store, name) for name in
+                         ("src", "dst", "rel", "weight", "created", "weight_key", "alive")}
+        self._props = store.props
+
+    # ---- row batches ----
+
+    def entity_batches(self) -> Iterator[Tuple[List[str], List[Any]]]:
+        """(ids, records) per batch of live entities that pass the type filter"""
+        for start in range(0, self.node_count, self.batch_size):
+            nodes = range(start, min(start + self.batch_size, self.node_count))
+            if self.node_mask is not None:
+                nodes = np.flatnonzero(self.node_mask[nodes.start:nodes.stop]) + start
+            ids, records = [], []
+            for node in nodes:
+                record = self.records[node]
+                if record is not None and (self.entity_types is None or record.type in self.entity_types):
+                    ids.append(self.ids[node])
+                    records.append(record)
+            if ids:
+                yield ids, records
+
+    def relationship_batches(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Edge column slices per batch, with dead and filtered edges removed"""
+        columns = self._columns
+        for start in range(0, self.edge_total, self.batch_size):
+            stop = min(start + self.batch_size, self.edge_total)
+            edges = np.arange(start, stop)
+            src = np.array(columns["src"][start:stop], dtype=np.int64)
+            dst = np.array(columns["dst"][start:stop], dtype=np.int64)
+            rel = np.array(columns["rel"][start:stop], dtype=np.int64)
+            keep = np.frombuffer(bytes(columns["alive"][start:stop]), dtype=np.uint8) == 1
+            if self.relation_codes is not None:
+                keep &= np.isin(rel, list(self.relation_codes))
+            if self.node_mask is not None:
+                keep &= self.node_mask[src] & self.node_mask[dst]
+            if not keep.any():
+                continue
+            yield {
+                "edge": edges[keep],
+                "src": src[keep],
+                "dst": dst[keep],
+                "rel": rel[keep],
+                "weight": np.array(columns["weight"][start:stop], dtype=np.float64)[keep],
+                "created": np.array(columns["created"][start:stop], dtype=np.float64)[keep],
+                "weight_key": np.array(columns["weight_key"][start:stop], dtype=np.int64)[keep],
+            }
+
+    def _edge_properties(self, batch: Dict[str, np.ndarray]) -> List[str]:
+        """Each edge's properties as JSON. {weight_key: weight} is formatted directly, skipping json.dumps"""
+        prefixes = [f"{{{encode_basestring_ascii(key)}:" for key in self.prop_keys]
+        properties = []
+        for edge, key, weight in zip(batch["edge"].tolist(), batch["weight_key"].tolist(), batch["weight"].tolist()):
+            stored = self._props.get(edge)
+            if stored is not None:
+                properties.append(_dumps(stored))
+            elif key >= 0:
+                properties.append(prefixes[key] + (repr(weight) if math.isfinite(weight) else _dumps(weight)) + "}")
+            else:
+                properties.append("{}")
+        return properties
+
+    # ---- NDJSON ----
+
+    def ndjson(self) -> Iterator[bytes]:
+        """Entities, then relationships, one JSON object per line, in chunks of batch_size lines"""
+        for ids, records in self.entity_batches():
+            yield "".join(
+                _dumps({"kind": "entity", "id": entity_id, "type": record.type, "properties": record.properties,
+                        "created_at": _iso(record.created), "updated_at": _iso(record.updated)}) + "\n"
+                for entity_id, record in zip(ids, records)
+            ).encode("utf-8")
+        # Relationship lines are assembled from pre-escaped parts, in the same key order as json.dumps
+        ids = self.ids
+        rel_names = [encode_basestring_ascii(name) for name in self.rel_names]
+        for batch in self.relationship_batches():
+            created_iso = {created: encode_basestring_ascii(_iso(created)) for created in np.unique(batch["created"]).tolist()}
+            yield "".join(
+                f'{{"kind":"relationship","source":{encode_basestring_ascii(ids[src])},'
+                f'"target":{encode_basestring_ascii(ids[dst])},"type":{rel_names[rel]},'
+                f'"weight":{repr(weight) if math.isfinite(weight) else _dumps(weight)},'
+                f'"properties":{properties},"created_at":{created_iso[created]}}}\n'
+                for src, dst, rel, weight, created, properties in zip(
+                    batch["src"].tolist(), batch["dst"].tolist(), batch["rel"].tolist(),
+                    batch["weight"].tolist(), batch["created"].tolist(), self._edge_properties(batch))
+            ).encode("utf-8")
+
+    # ---- Arrow ----
+
+    def record_batches(self, kind: str) -> Iterator[pa.RecordBatch]:
+        """Arrow record batches of "entities" or "relationships" """
+        if kind == "entities":
+            for ids, records in self.entity_batches():
+                yield pa.RecordBatch.from_arrays([
+                    pa.array(ids, pa.string()),
+                    pa.array([record.type for record in records], pa.string()).dictionary_encode(),
+                    pa.array([_dumps(record.properties) for record in records], pa.string()),
+                    pa.array(_micros([record.created for record in records]), pa.timestamp("us", tz="UTC")),
+                    pa.array(_micros([record.updated for record in records]), pa.timestamp("us", tz="UTC")),
+                ], schema=ENTITY_SCHEMA)
+        elif kind == "relationships":
+            ids = np.asarray(self.ids, dtype=object)
+            for batch in self.relationship_batches():
+                yield pa.RecordBatch.from_arrays([
+                    pa.array(ids[batch["src"]], pa.string()),
+                    pa.array(ids[batch["dst"]], pa.string()),
+                    pa.DictionaryArray.from_arrays(pa.array(batch["rel"].astype(np.int32)),
+                                                   pa.array(self.rel_names, pa.string())),
+                    pa.array(batch["weight"], pa.float64()),
+                    pa.array(self._edge_properties(batch), pa.string()),
+                    pa.array(_micros(batch["created"]), pa.timestamp("us", tz="UTC")),
+                ], schema=RELATIONSHIP_SCHEMA)
+        else:
+            raise ValueError(f"Unknown export kind {kind!r}, expected 'entities' or 'relationships'")
+
+    def arrow_ipc(self, kind: str) -> Iterator[bytes]:
+        """Arrow IPC stream format, one chunk per record batch"""
+        sink = _ChunkSink()
+        with ipc.new_stream(sink, SCHEMAS[kind]) as writer:
+            yield sink.drain()
+            for batch in self.record_batches(kind):
+                writer.write_batch(batch)
+                yield sink.drain()
+        yield sink.drain()
+
+    def parquet(self, kind: str) -> Iterator[bytes]:
+        """Parquet file, one row group per record batch, streamed as row groups are written"""
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, SCHEMAS[kind], compression="zstd") as writer:
+            for batch in self.record_batches(kind):
+                writer.write_batch(batch)
+                yield sink.drain()
+        yield sink.drain()
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# =================== IMPORT ===================
+
+def _timestamp(value) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+class GraphImporter:
+    """Loads exported entities and relationships back into a MemoryGraph
+
+    On an unlogged graph (no change log, not forwarding to a shared-graph
+    builder) rows go straight into the GraphStore. Relationships are
+    buffered and upserted per type with GraphStore.add_edges, and their
+    creation times are kept. Save a snapshot afterwards to persist the
+    result. On a snapshot-backed or forwarding graph every row goes through
+    add_entity / add_relationship, so it is logged like any other write.
+    """
+
+    def __init__(self, graph, batch_size: int = IMPORT_BATCH_SIZE):
+        self.graph = graph
+        self.batch_size = batch_size
+        self.bulk = graph.change_log is None and graph.forward_changes is None
+        self._pending: List[Tuple[str, str, str, float, Dict, Optional[float]]] = []
+        self.counts = {"entities": 0, "relationships": 0, "skipped": 0}
+        self.started = time.perf_counter()
+
+    def entity(self, entity_id: str, entity_type: str, properties: Dict,
+               created_at=None, updated_at=None):
+        if not entity_id or not entity_type:
+            self.counts["skipped"] += 1
+            return
+        properties = properties or {}
+        if not self.bulk or entity_type == "conversation":
+            self.graph.add_entity(entity_id, entity_type, properties)
+        else:
+            store = self.graph.store
+            created = _timestamp(created_at)
+            node = store.put_entity(entity_id, entity_type, properties, now=created)
+            record = store.records[node]
+            record.updated = _timestamp(updated_at) or record.created
+            if entity_type == "startup":
+                self.graph.similarity.set(node, properties)
+        self.counts["entities"] += 1
+
+    def relationship(self, source: str, target: str, relation_type: str, weight: float = 1.0,
+                     properties: Dict = None, created_at=None):
+        if not source or not target or not relation_type:
+            self.counts["skipped"] += 1
+            return
+        weight = 1.0 if weight is None else float(weight)
+        if not self.bulk:
+            self.graph.add_relationship(source, target, relation_type, properties or None, weight)
+        else:
+            self._pending.append((source, target, relation_type, weight, properties or {}, _timestamp(created_at)))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+        self.counts["relationships"] += 1
+
+    def flush(self):
+        """Upsert buffered relationships, one add_edges call per (type, weight key)"""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        store = self.graph.store
+        groups: Dict[Tuple[str, Optional[str]], List] = {}
+        for source, target, relation_type, weight, properties, created in pending:
+            weight_key = None
+            if properties:
+                key, value = next(iter(properties.items()))
+                if len(properties) == 1 and type(value) is float and value == weight:
+                    weight_key = key
+                else:
+                    # Arbitrary properties keep their dict on the single-edge path
+                    store.add_edge(source, target, relation_type, properties, weight, now=created)
+                    continue
+            groups.setdefault((relation_type, weight_key), []).append(
+                (store.intern(source), store.intern(target), weight, created or time.time())
+            )
+        for (relation_type, weight_key), rows in groups.items():
+            sources, targets, weights, created = (np.asarray(column) for column in zip(*rows))
+            store.add_edges(sources, targets, relation_type, weights, weight_key=weight_key, created=created)
+
+    def finish(self) -> Dict[str, Any]:
+        self.flush()
+        return {**self.counts, "seconds": round(time.perf_counter() - self.started, 3)}
+
+
+def import_ndjson(graph, lines: Iterable, batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, Any]:
+    """Import lines written by GraphExporter.ndjson (bytes or str, blank lines ignored)"""
+    importer = GraphImporter(graph, batch_size)
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            importer.counts["skipped"] += 1
+            continue
+        kind = row.get("kind")
+        if kind == "entity":
+            importer.entity(row.get("id"), row.get("type"), row.get("properties"),
+                            row.get("created_at"), row.get("updated_at"))
+        elif kind == "relationship":
+            importer.relationship(row.get("source"), row.get("target"), row.get("type"), row.get("weight"),
+                                  row.get("properties"), row.get("created_at"))
+        else:
+            importer.counts["skipped"] += 1
+    return importer.finish()
+
+
+def _arrow_batches(source) -> Iterator[pa.RecordBatch]:
+    """Record batches from an Arrow IPC stream or a Parquet file (path or binary file object)"""
+    handle = open(source, "rb") if isinstance(source, str) else source
+    try:
+        magic = handle.read(len(PARQUET_MAGIC))
+        handle.seek(0)
+        if magic == PARQUET_MAGIC:
+            yield from pq.ParquetFile(handle).iter_batches(batch_size=EXPORT_BATCH_SIZE)
+        else:
+            yield from ipc.open_stream(handle)
+    finally:
+        if handle is not source:
+            handle.close()
+
+
+def import_arrow(graph, source, batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, Any]:
+    """Import an entities or relationships table written by GraphExporter.arrow_ipc / parquet"""
+    importer = GraphImporter(graph, batch_size)
+    for batch in _arrow_batches(source):
+        columns = batch.to_pydict()
+        created = [value.timestamp() if value is not None else None for value in columns["created_at"]]
+        properties = [json.loads(value) if value else {} for value in columns["properties"]]
+        if "source" in columns:
+            for row in zip(columns["source"], columns["target"], columns["type"], columns["weight"],
+                           properties, created):
+                importer.relationship(*row)
+        else:
+            updated = [value.timestamp() if value is not None else None for value in columns["updated_at"]]
+            for row in zip(columns["id"], columns["type"], properties, created, updated):
+                importer.entity(*row)
+    return importer.finish()
+
+
+def import_file(graph, path: str, batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, Any]:
+    """Import a backup file, telling NDJSON from Arrow IPC / Parquet by its first bytes"""
+    with open(path, "rb") as f:
+        head = f.read(len(PARQUET_MAGIC))
+        f.seek(0)
+        if head == PARQUET_MAGIC or head == b"\xff\xff\xff\xff":  # Parquet magic / IPC continuation marker
+            return import_arrow(graph, f, batch_size)
+        return import_ndjson(graph, f, batch_size)
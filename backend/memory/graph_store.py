@@ -0,0 +1,633 @@
+import sys
+import threading
+import time
+from array import array
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable, Set
+
+import numpy as np
+
+
+# Edge keys pack (source node, relation code, target node) into one uint64
+NODE_BITS = 26
+REL_BITS = 12
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+class EntityRecord:
+    """One graph entity. Reads like the {"type", "properties", "created_at", "updated_at"} dict it replaces
+
+    Timestamps are kept as epoch floats and only rendered to ISO strings when read.
+    """
+
+    __slots__ = ("type", "properties", "created", "updated")
+    _KEYS = ("type", "properties", "created_at", "updated_at")
+
+    def __init__(self, entity_type: str, properties: Dict, created: float):
+        self.type = entity_type
+        self.properties = properties
+        self.created = created
+        self.updated = created
+
+    def __getitem__(self, key: str):
+        if key == "type":
+            return self.type
+        if key == "properties":
+            return self.properties
+        if key == "created_at":
+            return _iso(self.created)
+        if key == "updated_at":
+            return _iso(self.updated)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        return key in self._KEYS
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def keys(self):
+        return list(self._KEYS)
+
+    def items(self):
+        return [(key, self[key]) for key in self._KEYS]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"EntityRecord({self.to_dict()!r})"
+
+
+_UNLOADED = object()
+
+
+class RecordTable:
+    """node -> EntityRecord list for a store loaded from a snapshot
+
+    Entries start unloaded and are decoded from the snapshot on first access,
+    so loading does not pay for entities that are never read.
+    """
+
+    __slots__ = ("_items", "_source")
+
+    def __init__(self, size: int, source):
+        self._items = [_UNLOADED] * size
+        self._source = source
+
+    def __getitem__(self, node: int) -> Optional[EntityRecord]:
+        item = self._items[node]
+        if item is _UNLOADED:
+            item = self._items[node] = self._source.record(node)
+        return item
+
+    def __setitem__(self, node: int, record: Optional[EntityRecord]):
+        self._items[node] = record
+
+    def append(self, record: Optional[EntityRecord]):
+        self._items.append(record)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return (self[node] for node in range(len(self._items)))
+
+
+class EdgeIndex:
+    """CSR/CSC adjacency and sorted key index over edges [0, indexed_edges), plus the overflow added since
+
+    compact() builds a new EdgeIndex and swaps it in with one assignment, so
+    a reader that takes store.index once never pairs new offsets with old
+    edge arrays or loses edges that moved from the overflow into the CSR.
+    """
+
+    __slots__ = ("out_offsets", "out_edges", "in_offsets", "in_edges", "key_sorted", "key_edges",
+                 "indexed_edges", "dead_indexed", "out_overflow", "in_overflow", "key_overflow")
+
+    def __init__(self, out_offsets: np.ndarray = None, out_edges: np.ndarray = None,
+                 in_offsets: np.ndarray = None, in_edges: np.ndarray = None,
+                 key_sorted: np.ndarray = None, key_edges: np.ndarray = None, indexed_edges: int = 0):
+        self.out_offsets = np.zeros(1, dtype=np.int64) if out_offsets is None else out_offsets
+        self.out_edges = np.zeros(0, dtype=np.int32) if out_edges is None else out_edges
+        self.in_offsets = np.zeros(1, dtype=np.int64) if in_offsets is None else in_offsets
+        self.in_edges = np.zeros(0, dtype=np.int32) if in_edges is None else in_edges
+        self.key_sorted = np.zeros(0, dtype=np.uint64) if key_sorted is None else key_sorted
+        self.key_edges = np.zeros(0, dtype=np.int32) if key_edges is None else key_edges
+        self.indexed_edges = indexed_edges
+        self.dead_indexed = 0  # Tombstones still present in the CSR/CSC arrays
+        self.out_overflow: Dict[int, List[int]] = defaultdict(list)
+        self.in_overflow: Dict[int, List[int]] = defaultdict(list)
+        self.key_overflow: Dict[int, int] = {}
+
+    def nbytes(self) -> int:
+        return (self.out_offsets.nbytes + self.out_edges.nbytes + self.in_offsets.nbytes + self.in_edges.nbytes
+                + self.key_sorted.nbytes + self.key_edges.nbytes)
+
+
+class GraphStore:
+    """Array-backed storage behind MemoryGraph
+
+    Entity ids are interned to dense ints (nodes). Edges live in parallel typed
+    arrays (source, target, relation code, weight, created), relation types are
+    interned to small ints and per-edge property dicts are only kept for edges
+    that need one. Outgoing and incoming lookups go through CSR/CSC offset
+    arrays built with NumPy; edges added since the last build sit in small
+    per-node overflow lists and are folded in once they reach a quarter of the
+    indexed edges. Removed edges are tombstoned in an alive bitmap and left
+    out of the rebuilt CSR/CSC arrays; they stay in the edge arrays until the
+    next snapshot, which writes only live edges.
+
+    Writes (entity and edge upserts, removals and the compaction they
+    trigger) take a store lock, reads do not. Edge ids never change while a
+    store is live and the edge arrays are only appended to, so an edge id a
+    reader got from the EdgeIndex it took stays valid for src/dst/rel and the
+    graph can be read from request threads while the hydration thread or a
+    signup writes to it.
+
+    Edges are unique per (source, relation type, target): adding an existing
+    edge updates its weight and properties in place. The key index is a
+    sorted uint64 key array rebuilt with the CSR arrays, plus a dict for
+    edges added since.
+    """
+
+    COMPACT_MIN_EDGES = 1024
+
+    def __init__(self):
+        # Nodes
+        self.ids: List[str] = []
+        self.node_of: Dict[str, int] = {}
+        self.records = []  # node -> EntityRecord, None for ids only seen as edge endpoints (or a RecordTable)
+        self.type_members: Dict[str, Set[int]] = defaultdict(set)
+        self.entity_count = 0
+
+        # Edges
+        self.rel_names: List[str] = []
+        self.rel_codes: Dict[str, int] = {}
+        self.src = array('i')
+        self.dst = array('i')
+        self.rel = array('H')
+        self.weight = array('d')
+        self.created = array('d')
+        # Properties: {key: weight} is stored as just the key code, anything else as a dict
+        self.prop_keys: List[str] = []
+        self.prop_key_codes: Dict[str, int] = {}
+        self.weight_key = array('h')
+        self.props: Dict[int, Dict] = {}
+        self.alive = bytearray()
+        self.dead_edges = 0
+
+        # Adjacency and keyed edge index
+        self.index = EdgeIndex()
+        self._write_lock = threading.RLock()
+
+        self.version = 0  # Bumped on every mutation, for derived caches
+        self.watchers = []  # Objects with touch(nodes), told which nodes' edges or entity types changed
+        self.readonly = False  # Set for stores mapped from a shared snapshot
+
+    def check_writable(self):
+        if self.readonly:
+            raise RuntimeError("Memory graph is a read-only snapshot")
+
+    def _touch(self, nodes):
+        for watcher in self.watchers:
+            watcher.touch(nodes)
+
+    # ---- nodes ----
+
+    def intern(self, entity_id: str) -> int:
+        node = self.node_of.get(entity_id)
+        if node is None:
+            node = len(self.ids)
+            if node >= 1 << NODE_BITS:
+                raise OverflowError("Memory graph node limit reached")
+            self.ids.append(entity_id)
+            self.node_of[entity_id] = node
+            self.records.append(None)
+        return node
+
+    def record(self, entity_id: str) -> Optional[EntityRecord]:
+        node = self.node_of.get(entity_id)
+        return self.records[node] if node is not None else None
+
+    def put_entity(self, entity_id: str, entity_type: str, properties: Dict, now: float = None) -> int:
+        self.check_writable()
+        with self._write_lock:
+            return self._put_entity(entity_id, entity_type, properties, now)
+
+    def _put_entity(self, entity_id: str, entity_type: str, properties: Dict, now: float = None) -> int:
+        node = self.intern(entity_id)
+        previous = self.records[node]
+        if previous is None:
+            self.entity_count += 1
+        elif previous.type != entity_type:
+            self.type_members[previous.type].discard(node)
+        entity_type = sys.intern(entity_type)
+        self.records[node] = EntityRecord(entity_type, properties, now or time.time())
+        self.type_members[entity_type].add(node)
+        if self.watchers:
+            if previous is None or previous.type != entity_type:
+                # Neighbors see a new (or retyped) entity at the end of their edges
+                self._touch([node] + [self.dst[edge] for edge in self.out_edges(node)]
+                            + [self.src[edge] for edge in self.in_edges(node)])
+            else:
+                self._touch((node,))
+        self.version += 1
+        return node
+
+    def remove_entity(self, entity_id: str) -> int:
+        """Drop an entity and every edge touching it. Returns the number of edges removed"""
+        self.check_writable()
+        with self._write_lock:
+            node = self.node_of.get(entity_id)
+            if node is None:
+                return 0
+            removed = 0
+            for edge in self.out_edges(node) + self.in_edges(node):
+                removed += self.remove_edge(edge)
+            record = self.records[node]
+            if record is not None:
+                self.type_members[record.type].discard(node)
+                self.records[node] = None
+                self.entity_count -= 1
+            self._touch((node,))
+            self.version += 1
+            return removed
+
+    # ---- edges ----
+
+    def rel_code(self, relation_type: str) -> int:
+        code = self.rel_codes.get(relation_type)
+        if code is None:
+            code = len(self.rel_names)
+            if code >= 1 << REL_BITS:
+                raise OverflowError("Memory graph relation type limit reached")
+            self.rel_names.append(sys.intern(relation_type))
+            self.rel_codes[relation_type] = code
+        return code
+
+    def rel_filter(self, relation_types: Optional[Iterable[str]]) -> Optional[Set[int]]:
+        """Relation codes for a type filter, None when unfiltered"""
+        if not relation_types:
+            return None
+        return {self.rel_codes[name] for name in relation_types if name in self.rel_codes}
+
+    def _prop_key_code(self, key: str) -> int:
+        code = self.prop_key_codes.get(key)
+        if code is None:
+            code = len(self.prop_keys)
+            self.prop_keys.append(key)
+            self.prop_key_codes[key] = code
+        return code
+
+    @staticmethod
+    def edge_key(src: int, code: int, dst: int) -> int:
+        return (src << (NODE_BITS + REL_BITS)) | (code << NODE_BITS) | dst
+
+    @staticmethod
+    def _edge_keys(src: np.ndarray, rel: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        return ((src.astype(np.uint64) << np.uint64(NODE_BITS + REL_BITS))
+                | (rel.astype(np.uint64) << np.uint64(NODE_BITS)) | dst.astype(np.uint64))
+
+    def find_edge(self, src: int, code: int, dst: int) -> Optional[int]:
+        """Live edge id for (source node, relation code, target node), or None"""
+        key = self.edge_key(src, code, dst)
+        index = self.index
+        edge = index.key_overflow.get(key)
+        if edge is not None:
+            return edge
+        keys = index.key_sorted
+        position = int(np.searchsorted(keys, np.uint64(key), side='right')) - 1
+        if position >= 0 and keys[position] == key:
+            edge = int(index.key_edges[position])
+            if self.alive[edge]:
+                return edge
+        return None
+
+    def find(self, source: str, target: str, relation_type: str) -> Optional[int]:
+        """Live edge id for (source id, relation type, target id), or None"""
+        src, dst = self.node_of.get(source), self.node_of.get(target)
+        code = self.rel_codes.get(relation_type)
+        if src is None or dst is None or code is None:
+            return None
+        return self.find_edge(src, code, dst)
+
+    def _property_code(self, edge: int, properties: Optional[Dict], weight: float) -> int:
+        """weight_key code for an edge's properties; anything but {key: weight} goes to props"""
+        self.props.pop(edge, None)
+        if not properties:
+            return -1
+        if len(properties) == 1:
+            key, value = next(iter(properties.items()))
+            if type(value) is float and value == weight:
+                return self._prop_key_code(key)
+        self.props[edge] = properties
+        return -1
+
+    def add_edge(self, source: str, target: str, relation_type: str,
+                 properties: Dict = None, weight: float = 1.0, now: float = None) -> int:
+        """Insert an edge, or update the weight and properties of the existing one"""
+        self.check_writable()
+        with self._write_lock:
+            return self._add_edge(source, target, relation_type, properties, weight, now)
+
+    def _add_edge(self, source: str, target: str, relation_type: str,
+                  properties: Optional[Dict], weight: float, now: Optional[float]) -> int:
+        src, dst = self.intern(source), self.intern(target)
+        code = self.rel_code(relation_type)
+        edge = self.find_edge(src, code, dst)
+        if edge is not None:
+            self.weight[edge] = weight
+            self.weight_key[edge] = self._property_code(edge, properties, weight)
+            self.version += 1
+            return edge
+
+        edge = len(self.src)
+        self.src.append(src)
+        self.dst.append(dst)
+        self.rel.append(code)
+        self.weight.append(weight)
+        self.created.append(now or time.time())
+        self.weight_key.append(self._property_code(edge, properties, weight))
+        self.alive.append(1)
+
+        index = self.index
+        index.out_overflow[src].append(edge)
+        index.in_overflow[dst].append(edge)
+        index.key_overflow[self.edge_key(src, code, dst)] = edge
+        self._touch((src, dst))
+        self.version += 1
+        self._maybe_compact()
+        return edge
+
+    def add_edges(self, sources: np.ndarray, targets: np.ndarray, relation_type: str,
+                  weights: np.ndarray, weight_key: str = None, now: float = None, created: np.ndarray = None):
+        """Upsert many edges of one type from node arrays, then rebuild adjacency once
+
+        weight_key stores each edge's properties as {weight_key: weight}.
+        created optionally gives each new edge its own creation time instead
+        of now. Existing edges keep their id and creation time; within the
+        batch the last occurrence of a key wins.
+        """
+        self.check_writable()
+        if not len(sources):
+            return
+        with self._write_lock:
+            self._add_edges(sources, targets, relation_type, weights, weight_key, now, created)
+
+    def _add_edges(self, sources, targets, relation_type: str, weights, weight_key: Optional[str],
+                   now: Optional[float], created):
+        if len(self.src) > self.index.indexed_edges:
+            self.compact()  # Empties the key overflow so lookups are one searchsorted
+        code = self.rel_code(relation_type)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        created = np.full(len(sources), now or time.time(), dtype=np.float64) if created is None \
+            else np.asarray(created, dtype=np.float64)
+        keys = self._edge_keys(sources, np.full(len(sources), code), targets)
+        order = np.argsort(keys, kind='stable')
+        repeated = keys[order][1:] == keys[order][:-1]
+        if repeated.any():
+            keep = np.sort(order[np.r_[~repeated, True]])  # Last of each run of equal keys
+            sources, targets, weights, keys = sources[keep], targets[keep], weights[keep], keys[keep]
+            created = created[keep]
+
+        existing = np.full(len(keys), -1, dtype=np.int64)
+        key_sorted, key_edges = self.index.key_sorted, self.index.key_edges
+        if len(key_sorted):
+            positions = np.searchsorted(key_sorted, keys, side='right') - 1
+            clipped = np.maximum(positions, 0)
+            found = (positions >= 0) & (key_sorted[clipped] == keys)
+            existing = np.where(found, key_edges[clipped], -1)
+            if found.any():
+                alive = np.frombuffer(bytes(self.alive), dtype=np.uint8)
+                existing[found & (alive[np.maximum(existing, 0)] == 0)] = -1
+
+        key = self._prop_key_code(weight_key) if weight_key else -1
+        update = existing >= 0
+        for edge, weight in zip(existing[update].tolist(), weights[update].tolist()):
+            self.weight[edge] = weight
+            self.weight_key[edge] = key
+            self.props.pop(edge, None)
+
+        fresh = ~update
+        count = int(fresh.sum())
+        if count:
+            self.src.frombytes(sources[fresh].astype(np.int32).tobytes())
+            self.dst.frombytes(targets[fresh].astype(np.int32).tobytes())
+            self.rel.frombytes(np.full(count, code, dtype=np.uint16).tobytes())
+            self.weight.frombytes(weights[fresh].tobytes())
+            self.created.frombytes(created[fresh].tobytes())
+            self.weight_key.frombytes(np.full(count, key, dtype=np.int16).tobytes())
+            self.alive.extend(b"\x01" * count)
+            self._touch(np.unique(np.concatenate((sources[fresh], targets[fresh]))))
+        self.version += 1
+        self.compact()
+
+    def remove_edge(self, edge: int) -> bool:
+        """Tombstone an edge, returns False if it was already removed"""
+        self.check_writable()
+        with self._write_lock:
+            if not self.alive[edge]:
+                return False
+            self.alive[edge] = 0
+            self.dead_edges += 1
+            self.props.pop(edge, None)
+            index = self.index
+            if edge >= index.indexed_edges:
+                src, dst = self.src[edge], self.dst[edge]
+                index.out_overflow[src].remove(edge)
+                index.in_overflow[dst].remove(edge)
+                index.key_overflow.pop(self.edge_key(src, self.rel[edge], dst), None)
+            else:
+                index.dead_indexed += 1
+            self._touch((self.src[edge], self.dst[edge]))
+            self.version += 1
+            self._maybe_compact()
+            return True
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.src) - self.dead_edges
+
+    def edge_ids(self) -> Sequence:
+        """Live edge ids in insertion order"""
+        if not self.dead_edges:
+            return range(len(self.src))
+        return np.flatnonzero(np.frombuffer(bytes(self.alive), dtype=np.uint8)).tolist()
+
+    def edge_properties(self, edge: int) -> Dict:
+        properties = self.props.get(edge)
+        if properties is not None:
+            return properties
+        key = self.weight_key[edge]
+        return {self.prop_keys[key]: self.weight[edge]} if key >= 0 else {}
+
+    def edge_dict(self, edge: int) -> Dict[str, Any]:
+        """Edge in the original relationship dict shape"""
+        return {
+            "source": self.ids[self.src[edge]],
+            "target": self.ids[self.dst[edge]],
+            "type": self.rel_names[self.rel[edge]],
+            "properties": self.edge_properties(edge),
+            "weight": self.weight[edge],
+            "created_at": _iso(self.created[edge])
+        }
+
+    # ---- adjacency ----
+
+    def _build_csr(self, keys: np.ndarray, live: np.ndarray, n: int):
+        """Offsets and live edge ids grouped by key, insertion order kept within a group"""
+        live_keys = keys[live]
+        order = live[np.argsort(live_keys, kind='stable')].astype(np.int32)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(live_keys, minlength=n), out=offsets[1:])
+        return offsets, order
+
+    def compact(self):
+        """Fold overflow edges into the CSR/CSC arrays and key index and drop tombstones from them"""
+        with self._write_lock:
+            n = len(self.ids)
+            live = np.flatnonzero(np.frombuffer(bytes(self.alive), dtype=np.uint8))
+            src, dst = np.array(self.src, dtype=np.int32), np.array(self.dst, dtype=np.int32)
+            out_offsets, out_edges = self._build_csr(src, live, n)
+            in_offsets, in_edges = self._build_csr(dst, live, n)
+            keys = self._edge_keys(src[live], np.array(self.rel, dtype=np.uint16)[live], dst[live])
+            order = np.argsort(keys, kind='stable')
+            self.index = EdgeIndex(out_offsets, out_edges, in_offsets, in_edges,
+                                   keys[order], live[order].astype(np.int32), len(src))
+
+    def _maybe_compact(self):
+        """Compact once the overflow and indexed tombstones outgrow a quarter of the index"""
+        index = self.index
+        pending = len(self.src) - index.indexed_edges + index.dead_indexed
+        if pending > max(self.COMPACT_MIN_EDGES, index.indexed_edges // 4):
+            self.compact()
+
+    def _edges(self, node: int, index: EdgeIndex, offsets: np.ndarray, edges: np.ndarray,
+               overflow: Dict[int, List[int]]) -> List[int]:
+        found = edges[offsets[node]:offsets[node + 1]].tolist() if node + 1 < len(offsets) else []
+        if index.dead_indexed:
+            alive = self.alive
+            found = [edge for edge in found if alive[edge]]
+        extra = overflow.get(node)
+        return found + extra if extra else found
+
+    def out_edges(self, node: int) -> List[int]:
+        """Outgoing edge ids of a node, oldest first"""
+        index = self.index
+        return self._edges(node, index, index.out_offsets, index.out_edges, index.out_overflow)
+
+    def in_edges(self, node: int) -> List[int]:
+        """Incoming edge ids of a node, oldest first"""
+        index = self.index
+        return self._edges(node, index, index.in_offsets, index.in_edges, index.in_overflow)
+
+    def degree(self, node: int) -> int:
+        return len(self.out_edges(node)) + len(self.in_edges(node))
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the edge arrays and adjacency indexes"""
+        columns = (self.src, self.dst, self.rel, self.weight, self.created, self.weight_key)
+        return sum(column.itemsize * len(column) for column in columns) + len(self.alive) + self.index.nbytes()
+
+
+class EntityView(Mapping):
+    """Read-only entity_id -> EntityRecord mapping (MemoryGraph.entities)"""
+
+    def __init__(self, store: GraphStore):
+        self._store = store
+
+    def __getitem__(self, entity_id: str) -> EntityRecord:
+        record = self._store.record(entity_id)
+        if record is None:
+            raise KeyError(entity_id)
+        return record
+
+    def __contains__(self, entity_id) -> bool:
+        return self._store.record(entity_id) is not None
+
+    def __iter__(self):
+        store = self._store
+        return (store.ids[node] for node, record in enumerate(store.records) if record is not None)
+
+    def __len__(self) -> int:
+        return self._store.entity_count
+
+
+class RelationshipView(Sequence):
+    """Read-only list of relationship dicts, materialized on access (MemoryGraph.relationships)"""
+
+    def __init__(self, store: GraphStore):
+        self._store = store
+
+    def __getitem__(self, index):
+        live = self._store.edge_ids()
+        if isinstance(index, slice):
+            return [self._store.edge_dict(edge) for edge in live[index]]
+        return self._store.edge_dict(live[index])
+
+    def __iter__(self):
+        return (self._store.edge_dict(edge) for edge in self._store.edge_ids())
+
+    def __len__(self) -> int:
+        return self._store.edge_count
+
+
+class AdjacencyView(Mapping):
+    """entity_id -> relationship dicts (MemoryGraph.relationship_index / reverse_relationship_index)"""
+
+    def __init__(self, store: GraphStore, outgoing: bool = True):
+        self._store = store
+        self._outgoing = outgoing
+
+    def _edge_ids(self, node: int) -> List[int]:
+        return self._store.out_edges(node) if self._outgoing else self._store.in_edges(node)
+
+    def __getitem__(self, entity_id: str) -> List[Dict]:
+        node = self._store.node_of.get(entity_id)
+        edges = self._edge_ids(node) if node is not None else []
+        if not edges:
+            raise KeyError(entity_id)
+        return [self._store.edge_dict(edge) for edge in edges]
+
+    def __iter__(self):
+        store = self._store
+        return (store.ids[node] for node in range(len(store.ids)) if self._edge_ids(node))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class TypeIndexView(Mapping):
+    """entity_type -> set of entity ids (MemoryGraph.entity_index)"""
+
+    def __init__(self, store: GraphStore):
+        self._store = store
+
+    def __getitem__(self, entity_type: str) -> Set[str]:
+        members = self._store.type_members.get(entity_type)
+        if not members:
+            raise KeyError(entity_type)
+        return {self._store.ids[node] for node in members}
+
+    def __iter__(self):
+        return (entity_type for entity_type, members in self._store.type_members.items() if members)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
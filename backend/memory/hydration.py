@@ -0,0 +1,102 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Callable, Optional
+
+_DONE = object()
+
+
+class GraphHydrator:
+    """Loads every active startup into a MemoryGraph page by page
+
+    A fetcher thread walks startup_profiles with keyset pagination and hands
+    each page to a bounded thread pool to attach founders/team_members (a
+    no-op when they came embedded). Pages wait in a bounded queue, so fetching
+    the next pages overlaps with building the graph from the current one
+    without reading the whole table into memory.
+    """
+
+    def __init__(self, graph, db_manager, page_size: int = 500, prefetch_pages: int = 2,
+                 max_workers: int = 2, progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.graph = graph
+        self.db_manager = db_manager
+        self.page_size = page_size
+        self.prefetch_pages = prefetch_pages
+        self.max_workers = max_workers
+        self.progress = progress or self._print_progress
+        self.stats = {"pages": 0, "startups": 0, "fetch_seconds": 0.0, "build_seconds": 0.0,
+                      "similarity_seconds": 0.0, "competitor_seconds": 0.0, "total_seconds": 0.0, "error": None}
+
+    @staticmethod
+    def _print_progress(stats: Dict[str, Any]):
+        print(f"   … {stats['startups']:,} startups in {stats['pages']} pages "
+              f"(fetch {stats['fetch_seconds']:.1f}s, build {stats['build_seconds']:.1f}s)")
+
+    def _fetch_pages(self, pages: queue.Queue, pool: ThreadPoolExecutor, stop):
+        """Fetcher thread: queue one future per page, then _DONE (or the exception)"""
+        after_id = None
+        try:
+            while not stop():
+                started = time.perf_counter()
+                rows = self.db_manager.get_startup_graph_page(after_id=after_id, limit=self.page_size)
+                self.stats["fetch_seconds"] += time.perf_counter() - started
+                if not rows:
+                    break
+                pages.put(pool.submit(self._attach_people, rows))
+                if len(rows) < self.page_size:
+                    break
+                after_id = rows[-1]['startup_id']
+            pages.put(_DONE)
+        except Exception as e:
+            pages.put(e)
+
+    def _attach_people(self, rows):
+        started = time.perf_counter()
+        rows = self.db_manager.attach_founders_and_team(rows)
+        self.stats["fetch_seconds"] += time.perf_counter() - started
+        return rows
+
+    def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        pages = queue.Queue(maxsize=self.prefetch_pages)
+        stopped = []
+
+        with ThreadPoolExecutor(max_workers=max(2, self.max_workers), thread_name_prefix="graph-hydrate") as pool:
+            pool.submit(self._fetch_pages, pages, pool, lambda: bool(stopped))
+            while True:
+                item = pages.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    self.stats["error"] = str(item)
+                    print(f" Error fetching startups for the memory graph: {str(item)}")
+                    break
+                try:
+                    rows = item.result() if isinstance(item, Future) else item
+                except Exception as e:
+                    self.stats["error"] = str(e)
+                    print(f" Error loading founders/team members: {str(e)}")
+                    stopped.append(True)
+                    break
+
+                build_started = time.perf_counter()
+                for row in rows:
+                    self.graph.add_startup_from_row(row)
+                self.stats["build_seconds"] += time.perf_counter() - build_started
+                self.stats["pages"] += 1
+                self.stats["startups"] += len(rows)
+                self.progress(dict(self.stats))
+
+            # Unblock the fetcher if we stopped early
+            stopped.append(True)
+            while not pages.empty():
+                pages.get_nowait()
+
+        similarity_started = time.perf_counter()
+        self.graph._build_similarity_relationships()
+        self.stats["similarity_seconds"] = time.perf_counter() - similarity_started
+        competitor_started = time.perf_counter()
+        self.graph.build_competitor_relationships()
+        self.stats["competitor_seconds"] = time.perf_counter() - competitor_started
+        self.stats["total_seconds"] = time.perf_counter() - started
+        return self.stats
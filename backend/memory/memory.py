@@ -1,60 +1,300 @@
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime
-import json
-from collections import defaultdict, deque
-import math
+from collections import deque
+import os
+import threading
+import time
+
+import numpy as np
+
+from memory.graph_store import GraphStore, EntityView, RelationshipView, AdjacencyView, TypeIndexView
+from memory.similarity import StartupSimilarityEngine, SIMILARITY_THRESHOLD
+from memory.hydration import GraphHydrator
+from memory.snapshot import write_snapshot, load_store, GraphChangeLog
+from memory.signatures import NeighborSignatureIndex
+from memory.paths import PathFinder, MAX_EXPANSIONS, TIME_LIMIT
+from memory.context import ChatContextBuilder
+from memory.conversations import ConversationTier
+from memory.portfolio import PortfolioAnalytics
+from memory.recommend import RecommendationEngine, RESTART_PROBABILITY
+from memory.export import GraphExporter, import_file
+from memory.competitors import CompetitorIndex, COMPETITOR_TOP_K, COMPETITOR_THRESHOLD, COMPETITOR_WEIGHT_KEY
+
+# How many similar startups chat context includes
+SIMILAR_STARTUPS_LIMIT = 10
 
 class MemoryGraph:
     """Enhanced knowledge graph for startup investment platform"""
     
-    def __init__(self):
+    def __init__(self, conversations: ConversationTier = None):
         self._state = "initialized" 
-        self.entities = {}
-        self.relationships = []
-        self.entity_index = defaultdict(set)  # Index entities by type
-        self.relationship_index = defaultdict(list)  # Index relationships by source
-        self.reverse_relationship_index = defaultdict(list)  # Index by target
+        # Interned ids, typed edge arrays and CSR/CSC adjacency (see memory/graph_store.py)
+        self.store = GraphStore()
+        # Shared with every store loaded into this graph: writers take it before reading self.store,
+        # so a write racing load_snapshot lands in the loaded store instead of the replaced one
+        self._write_lock = self.store._write_lock
+        self.similarity = StartupSimilarityEngine()
+        self._attach_indexes()
+        self.generation = 0  # Snapshot generation the graph was loaded from or last saved as
+        self.change_log = None  # GraphChangeLog once the graph is backed by a snapshot
+        # Changes made before a snapshot or change log backs the graph, re-applied on top of a loaded snapshot
+        self._unsaved: Optional[List[Dict[str, Any]]] = []
+        self._replay = threading.local()  # ts (original timestamp) and replaying, for the thread applying a log entry
+        # Callable(op, args, ts) that receives mutations instead of this graph, set on
+        # read-only workers of a shared graph (see memory/shared_graph.py)
+        self.forward_changes = None
+        # Chat turns live in a bounded side tier, not in the store (see memory/conversations.py)
+        self.conversations = conversations if conversations is not None else ConversationTier()
+
+    # Read-only views that keep the original dict/list attribute API
+    @property
+    def entities(self) -> EntityView:
+        return EntityView(self.store)
+
+    @property
+    def relationships(self) -> RelationshipView:
+        return RelationshipView(self.store)
+
+    @property
+    def entity_index(self) -> TypeIndexView:
+        return TypeIndexView(self.store)
+
+    @property
+    def relationship_index(self) -> AdjacencyView:
+        return AdjacencyView(self.store, outgoing=True)
+
+    @property
+    def reverse_relationship_index(self) -> AdjacencyView:
+        return AdjacencyView(self.store, outgoing=False)
         
     def add_entity(self, entity_id: str, entity_type: str, properties: Dict):
         """Add an entity to the knowledge graph with indexing"""
-        self.entities[entity_id] = {
-            "type": entity_type,
-            "properties": properties,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
-        }
-        
-        # Index by type for fast lookup
-        self.entity_index[entity_type].add(entity_id)
+        if entity_type == "conversation":
+            self.add_conversation(entity_id, properties, properties.get("startup_id"))
+            return
+        if self._forwarded("add_entity", entity_id, entity_type, properties):
+            return
+        now = self._now()
+        with self._write_lock:
+            node = self.store.put_entity(entity_id, entity_type, properties, now=now)
+            if entity_type == "startup":
+                self.similarity.set(node, properties)
+            self._log(now, "add_entity", entity_id, entity_type, properties)
     
+    def add_conversation(self, conversation_id: str, properties: Dict, startup_id: str = None):
+        """Record a chat turn in the bounded conversation tier, linked to the startup it discusses"""
+        return self.conversations.add(conversation_id, properties, startup_id)
+
     def update_entity(self, entity_id: str, properties: Dict):
         """Update existing entity properties"""
-        if entity_id in self.entities:
-            self.entities[entity_id]["properties"].update(properties)
-            self.entities[entity_id]["updated_at"] = datetime.now().isoformat()
+        if self._forwarded("update_entity", entity_id, properties):
+            return
+        # Under the write lock so a checkpoint cannot snapshot before the change and reset the log after it
+        with self._write_lock:
+            record = self.store.record(entity_id)
+            if record is not None:
+                self.store.check_writable()
+                record.properties.update(properties)
+                record.updated = now = self._now()
+                self.store.version += 1
+                # Properties change in place, so watchers that read them are told directly
+                self.portfolio.touch((self.store.node_of[entity_id],))
+                if record.type == "startup":
+                    self.similarity.set(self.store.node_of[entity_id], record.properties)
+                self._log(now, "update_entity", entity_id, properties)
     
     def add_relationship(self, source: str, target: str, relation_type: str, 
                         properties: Dict = None, weight: float = 1.0):
-        """Add a weighted relationship between entities with indexing"""
-        relationship = {
-            "source": source,
-            "target": target,
-            "type": relation_type,
-            "properties": properties or {},
-            "weight": weight,
-            "created_at": datetime.now().isoformat()
+        """Add a weighted relationship, or update it if (source, relation_type, target) exists"""
+        if self._forwarded("add_relationship", source, target, relation_type, properties, weight):
+            return
+        now = self._now()
+        with self._write_lock:
+            self.store.add_edge(source, target, relation_type, properties, weight, now=now)
+            self._log(now, "add_relationship", source, target, relation_type, properties, weight)
+
+    def remove_relationship(self, source: str, target: str, relation_type: str) -> bool:
+        """Delete the (source, relation_type, target) relationship if it exists"""
+        if self._forwarded("remove_relationship", source, target, relation_type):
+            return False
+        with self._write_lock:
+            edge = self.store.find(source, target, relation_type)
+            if edge is None:
+                return False
+            self.store.remove_edge(edge)
+            self._log(self._now(), "remove_relationship", source, target, relation_type)
+            return True
+
+    def replace_relationships(self, source: str, relation_type: str, targets: Dict[str, float],
+                              properties: Dict[str, Dict] = None) -> int:
+        """Make targets ({target_id: weight}) the complete set of relation_type edges out of source
+
+        Edges to targets not listed are deleted, the rest are upserted.
+        properties optionally maps target_id to that edge's properties.
+        Returns the number of edges deleted.
+        """
+        if self._forwarded("replace_relationships", source, relation_type, targets, properties):
+            return 0
+        now = self._now()
+        removed = 0
+        with self._write_lock:
+            store = self.store
+            node, code = store.node_of.get(source), store.rel_codes.get(relation_type)
+            if node is not None and code is not None:
+                for edge in store.out_edges(node):
+                    if store.rel[edge] == code and store.ids[store.dst[edge]] not in targets:
+                        removed += store.remove_edge(edge)
+            properties = properties or {}
+            for target, weight in targets.items():
+                store.add_edge(source, target, relation_type, properties.get(target), weight, now=now)
+            self._log(now, "replace_relationships", source, relation_type, targets, properties)
+        return removed
+
+    def remove_entity(self, entity_id: str) -> int:
+        """Remove an entity and every relationship touching it. Returns the number of relationships removed"""
+        if self._forwarded("remove_entity", entity_id):
+            return 0
+        with self._write_lock:
+            if entity_id not in self.store.node_of:
+                return 0
+            removed = self.store.remove_entity(entity_id)
+            self._log(self._now(), "remove_entity", entity_id)
+            return removed
+
+    def _attach_indexes(self):
+        """(Re)create the derived indexes that watch self.store"""
+        self.signatures = NeighborSignatureIndex(self.store)
+        self.paths = PathFinder(self.store)
+        self.chat_context = ChatContextBuilder(self)
+        self.portfolio = PortfolioAnalytics(self.store)
+        self.recommender = RecommendationEngine(self.store)
+        self.competitors = CompetitorIndex(self.store)
+
+    # =================== PERSISTENCE ===================
+
+    def _now(self) -> float:
+        return getattr(self._replay, "ts", None) or time.time()
+
+    def _log(self, now: float, op: str, *args):
+        if getattr(self._replay, "replaying", False):
+            return
+        if self.change_log is not None:
+            self.change_log.append(op, list(args), now)
+        elif self._unsaved is not None:
+            self._unsaved.append({"op": op, "args": list(args), "ts": now})
+
+    def _forwarded(self, op: str, *args) -> bool:
+        if self.forward_changes is None or getattr(self._replay, "ts", None) is not None:
+            return False
+        self.forward_changes(op, list(args), time.time())
+        return True
+
+    def save_snapshot(self, path: str) -> Dict[str, Any]:
+        """Write the graph to a binary snapshot and start a fresh change log for it
+
+        Writes wait on the write lock until both are done, so no change falls
+        between the snapshot and the new log.
+        """
+        started = time.perf_counter()
+        with self._write_lock:
+            size = write_snapshot(self.store, self.similarity, path, self.generation + 1)
+            self.generation += 1
+            self.attach_change_log(f"{path}.log", reset=True)
+        return {"generation": self.generation, "bytes": size,
+                "seconds": round(time.perf_counter() - started, 3)}
+
+    def checkpoint(self, path: str, max_entries: int, max_age: float) -> Optional[Dict[str, Any]]:
+        """Re-snapshot to path once the change log has max_entries entries or is max_age seconds old
+
+        Bounds the log and so restart replay time (replay re-runs logged batch
+        jobs such as build_similarity). Returns save_snapshot stats, or None.
+        """
+        log = self.change_log
+        if log is None or self.store.readonly or not log.entries:
+            return None
+        if log.entries < max_entries and log.age() < max_age:
+            return None
+        return self.save_snapshot(path)
+
+    def load_snapshot(self, path: str, readonly: bool = False) -> Dict[str, Any]:
+        """Replace the graph with a memory-mapped snapshot plus the changes logged since it was written
+
+        Holds the write lock throughout, so concurrent writes wait and land in
+        the loaded graph. Writes made before any snapshot or change log backed
+        this graph are applied on top and logged.
+        """
+        started = time.perf_counter()
+        with self._write_lock:
+            store, similarity, generation = load_store(path, readonly=readonly)
+            store._write_lock = self._write_lock
+            self.store, self.similarity, self.generation = store, similarity, generation
+            self._attach_indexes()
+            loaded = time.perf_counter()
+
+            replayed = 0
+            if not readonly:
+                unsaved, self._unsaved = self._unsaved or [], None
+                self.change_log = None
+                for entry in GraphChangeLog(f"{path}.log").read(generation):
+                    self._apply_logged(entry)
+                    replayed += 1
+                self.attach_change_log(f"{path}.log")
+                for entry in unsaved:
+                    self._apply_logged(entry, record=True)
+        return {"generation": generation, "entities": len(self.entities), "relationships": store.edge_count,
+                "load_ms": round((loaded - started) * 1000, 2), "replayed": replayed,
+                "replay_ms": round((time.perf_counter() - loaded) * 1000, 2)}
+
+    def restore(self, path: str) -> Optional[Dict[str, Any]]:
+        """Load path if a snapshot exists there, otherwise start logging changes for a first snapshot"""
+        if os.path.exists(path):
+            try:
+                return self.load_snapshot(path)
+            except Exception as e:
+                print(f" Error loading memory graph snapshot {path}: {str(e)}")
+        self.attach_change_log(f"{path}.log", reset=True)
+        return None
+
+    def attach_change_log(self, path: str, reset: bool = False):
+        """Record every mutation to path from now on"""
+        if self.change_log is None or self.change_log.path != path:
+            if self.change_log is not None:
+                self.change_log.close()
+            self.change_log = GraphChangeLog(path)
+        self.change_log.open(self.generation, reset=reset)
+        self._unsaved = None
+
+    def close(self):
+        """Stop logging changes"""
+        if self.change_log is not None:
+            self.change_log.close()
+
+    def _apply_logged(self, entry: Dict[str, Any], record: bool = False):
+        """Re-run one change log entry with its original timestamp. record=True logs it again"""
+        handlers = {
+            "add_entity": self.add_entity,
+            "update_entity": self.update_entity,
+            "add_relationship": self.add_relationship,
+            "remove_relationship": self.remove_relationship,
+            "replace_relationships": self.replace_relationships,
+            "remove_entity": self.remove_entity,
+            "refresh_startup_similarity": self.refresh_startup_similarity,
+            "build_similarity": self._build_similarity_relationships,
+            "build_competitors": self.build_competitor_relationships,
+            "refresh_startup_competitors": self.refresh_startup_competitors,
         }
-        
-        self.relationships.append(relationship)
-        
-        # Index for fast lookup
-        self.relationship_index[source].append(relationship)
-        self.reverse_relationship_index[target].append(relationship)
+        self._replay.ts = entry.get("ts") or time.time()
+        self._replay.replaying = not record
+        try:
+            handlers[entry["op"]](*entry.get("args", []))
+        finally:
+            self._replay.ts = None
+            self._replay.replaying = False
     
     def get_entities_by_type(self, entity_type: str) -> Dict[str, Dict]:
         """Get all entities of a specific type"""
-        entity_ids = self.entity_index.get(entity_type, set())
-        return {eid: self.entities[eid] for eid in entity_ids if eid in self.entities}
+        store = self.store
+        return {store.ids[node]: store.records[node] for node in store.type_members.get(entity_type, ())}
     
     def get_related_entities(self, entity_id: str, relation_types: List[str] = None,
                            max_depth: int = 1) -> List[Dict]:
@@ -66,35 +306,30 @@ class MemoryGraph:
     
     def _get_direct_relations(self, entity_id: str, relation_types: List[str] = None) -> List[Dict]:
         """Get directly connected entities"""
+        store = self.store
+        node = store.node_of.get(entity_id)
+        if node is None:
+            return []
+        codes = store.rel_filter(relation_types)
         related = []
         
-        # Outgoing relationships
-        for rel in self.relationship_index.get(entity_id, []):
-            if relation_types and rel["type"] not in relation_types:
-                continue
-            if rel["target"] in self.entities:
-                related.append({
-                    "entity": self.entities[rel["target"]],
-                    "entity_id": rel["target"],
-                    "relationship": rel["type"],
-                    "direction": "outgoing",
-                    "weight": rel["weight"],
-                    "properties": rel["properties"]
-                })
-        
-        # Incoming relationships
-        for rel in self.reverse_relationship_index.get(entity_id, []):
-            if relation_types and rel["type"] not in relation_types:
-                continue
-            if rel["source"] in self.entities:
-                related.append({
-                    "entity": self.entities[rel["source"]],
-                    "entity_id": rel["source"],
-                    "relationship": rel["type"],
-                    "direction": "incoming",
-                    "weight": rel["weight"],
-                    "properties": rel["properties"]
-                })
+        # Outgoing relationships, then incoming
+        for direction, edges, endpoints in (("outgoing", store.out_edges(node), store.dst),
+                                            ("incoming", store.in_edges(node), store.src)):
+            for edge in edges:
+                if codes is not None and store.rel[edge] not in codes:
+                    continue
+                other = endpoints[edge]
+                record = store.records[other]
+                if record is not None:
+                    related.append({
+                        "entity": record,
+                        "entity_id": store.ids[other],
+                        "relationship": store.rel_names[store.rel[edge]],
+                        "direction": direction,
+                        "weight": store.weight[edge],
+                        "properties": store.edge_properties(edge)
+                    })
         
         return related
     
@@ -125,39 +360,51 @@ class MemoryGraph:
         
         return results
     
-    def find_paths(self, source: str, target: str, max_depth: int = 3) -> List[List[str]]:
-        """Find all paths between two entities"""
-        paths = []
-        visited = set()
-        
-        def dfs(current: str, path: List[str], depth: int):
-            if depth > max_depth:
-                return
-            if current == target and len(path) > 1:
-                paths.append(path[:])
-                return
-            if current in visited:
-                return
-                
-            visited.add(current)
-            
-            for rel in self.relationship_index.get(current, []):
-                if rel["target"] not in visited:
-                    path.append(rel["target"])
-                    dfs(rel["target"], path, depth + 1)
-                    path.pop()
-            
-            visited.remove(current)
-        
-        dfs(source, [source], 0)
-        return paths
+    def find_paths(self, source: str, target: str, max_depth: int = 3, max_paths: int = 50) -> List[List[str]]:
+        """Find paths between two entities along edge direction, fewest hops first
+
+        Bounded: at most max_paths loop-free paths of up to max_depth hops,
+        within the default expansion and time limits of memory/paths.py.
+        """
+        result = self.paths.k_shortest_paths(source, target, k=max_paths, directed=True,
+                                             weighted=False, max_depth=max_depth)
+        return [path["nodes"] for path in result["paths"]]
+
+    def shortest_path(self, source: str, target: str, relation_types: List[str] = None,
+                      directed: bool = False, max_depth: int = 6, max_expansions: int = MAX_EXPANSIONS,
+                      time_limit: float = TIME_LIMIT) -> Dict[str, Any]:
+        """Fewest-hop connection between two entities (bidirectional BFS)"""
+        return self.paths.shortest_path(source, target, relation_types, directed, max_depth,
+                                        max_expansions, time_limit)
+
+    def k_shortest_paths(self, source: str, target: str, k: int = 3, relation_types: List[str] = None,
+                         directed: bool = False, weighted: bool = True, max_depth: int = 4,
+                         max_expansions: int = MAX_EXPANSIONS, time_limit: float = TIME_LIMIT) -> Dict[str, Any]:
+        """Up to k cheapest connections between two entities, strongest relationships first"""
+        return self.paths.k_shortest_paths(source, target, k, relation_types, directed, weighted, max_depth,
+                                           max_expansions, time_limit)
+
+    def find_portfolio_connections(self, investor_id: str, startup_id: str, k: int = 3,
+                                   relation_types: List[str] = None, max_depth: int = 4) -> Dict[str, Any]:
+        """How a startup connects to an investor's portfolio
+
+        Paths run from the investor through its invested_in startups to the
+        startup, over shared founders, industries, stages and similar_to edges.
+        """
+        result = self.k_shortest_paths(investor_id, startup_id, k=k, relation_types=relation_types,
+                                       max_depth=max_depth)
+        for path in result["paths"]:
+            first = path["relationships"][0] if path["relationships"] else None
+            portfolio = first and first["type"] == "invested_in" and first["source"] == investor_id
+            path["via_portfolio_startup"] = first["target"] if portfolio else None
+        return result
     
     def get_startup_context(self, startup_id: str) -> Dict[str, Any]:
         """Get comprehensive context for a startup (specialized for your platform)"""
-        if startup_id not in self.entities:
+        startup = self.store.record(startup_id)
+        if startup is None:
             return {}
         
-        startup = self.entities[startup_id]
         context = {
             "startup": startup,
             "founders": [],
@@ -197,184 +444,293 @@ class MemoryGraph:
         
         return context
     
-    def find_similar_startups(self, startup_id: str, similarity_threshold: float = 0.3) -> List[Dict]:
-        """Find startups similar to the given startup based on graph connections"""
-        if startup_id not in self.entities:
+    def find_similar_startups(self, startup_id: str, similarity_threshold: float = 0.3,
+                              limit: Optional[int] = None) -> List[Dict]:
+        """Find startups similar to the given startup based on graph connections
+
+        Jaccard similarity of (connected entity type, relationship) sets, read
+        from the incrementally maintained signature index (memory/signatures.py).
+        """
+        store = self.store
+        node = store.node_of.get(startup_id)
+        if node is None or store.records[node] is None:
             return []
-        
-        startup = self.entities[startup_id]
-        startup_connections = set()
-        
-        # Get all connected entities
-        for rel in self.get_related_entities(startup_id):
-            startup_connections.add((rel["entity"]["type"], rel["relationship"]))
-        
-        similar_startups = []
-        
-        # Compare with other startups
-        for other_id in self.entity_index.get("startup", set()):
-            if other_id == startup_id:
-                continue
-            
-            other_connections = set()
-            for rel in self.get_related_entities(other_id):
-                other_connections.add((rel["entity"]["type"], rel["relationship"]))
-            
-            # Calculate Jaccard similarity
-            intersection = len(startup_connections & other_connections)
-            union = len(startup_connections | other_connections)
-            
-            if union > 0:
-                similarity = intersection / union
-                if similarity >= similarity_threshold:
-                    similar_startups.append({
-                        "startup_id": other_id,
-                        "startup": self.entities[other_id],
-                        "similarity_score": similarity,
-                        "common_connections": intersection
-                    })
-        
-        return sorted(similar_startups, key=lambda x: x["similarity_score"], reverse=True)
+        return [
+            {
+                "startup_id": store.ids[other],
+                "startup": store.records[other],
+                "similarity_score": score,
+                "common_connections": common
+            }
+            for other, score, common in self.signatures.similar(node, similarity_threshold, limit)
+        ]
     
+    def recommend_startups(self, investor_id: str = None, viewed_startup_ids: List[str] = None, k: int = 10,
+                           restart_probability: float = RESTART_PROBABILITY) -> Dict[str, Any]:
+        """"For you" startups by personalized PageRank (see memory/recommend.py)
+
+        Walks restart at the investor's invested_in startups plus any viewed
+        startups, or at the investor itself when both are empty. Seeds are
+        never recommended back.
+        """
+        store = self.store
+        seeds = set()
+        investor = store.node_of.get(investor_id) if investor_id else None
+        if investor is not None and store.records[investor] is not None:
+            invested_in = store.rel_codes.get("invested_in")
+            seeds.update(store.dst[edge] for edge in store.out_edges(investor) if store.rel[edge] == invested_in)
+        for startup_id in viewed_startup_ids or ():
+            node = store.node_of.get(startup_id)
+            if node is not None and store.records[node] is not None:
+                seeds.add(node)
+        if not seeds and investor is not None and store.records[investor] is not None:
+            seeds.add(investor)
+        if not seeds:
+            return {"seeds": [], "recommendations": [], "cached": False, "rounds": 0, "elapsed_ms": 0.0}
+
+        result = self.recommender.rank(seeds, "startup", k, restart_probability)
+        return {
+            "seeds": [store.ids[node] for node in sorted(seeds)],
+            "recommendations": [
+                {"startup_id": store.ids[node], "startup": store.records[node], "score": round(score, 8)}
+                for node, score in result.pop("ranking")
+            ],
+            **result
+        }
+
     def get_investor_portfolio_insights(self, investor_id: str) -> Dict[str, Any]:
         """Get insights about an investor's portfolio based on graph connections"""
-        if investor_id not in self.entities:
+        node = self.store.node_of.get(investor_id)
+        if node is None or self.store.records[node] is None:
             return {}
-        
-        portfolio_startups = []
-        industries = defaultdict(int)
-        stages = defaultdict(int)
-        founders = set()
-        
-        # Get invested startups
-        for rel in self.relationship_index.get(investor_id, []):
-            if rel["type"] == "invested_in" and rel["target"] in self.entities:
-                startup = self.entities[rel["target"]]
-                portfolio_startups.append(startup)
-                
-                # Analyze industry distribution
-                industry = startup["properties"].get("industry_sector", "Unknown")
-                industries[industry] += 1
-                
-                # Analyze stage distribution
-                stage = startup["properties"].get("stage", "Unknown")
-                stages[stage] += 1
-                
-                # Get founders of portfolio companies
-                startup_founders = self.get_related_entities(rel["target"], ["founded_by"])
-                for founder_rel in startup_founders:
-                    founders.add(founder_rel["entity_id"])
-        
-        return {
-            "portfolio_size": len(portfolio_startups),
-            "industry_distribution": dict(industries),
-            "stage_distribution": dict(stages),
-            "unique_founders": len(founders),
-            "portfolio_startups": portfolio_startups
-        }
+        return self.portfolio.insights(node)
+
+    def _investor_nodes(self, investor_ids: List[str] = None) -> Optional[List[int]]:
+        if investor_ids is None:
+            return None
+        node_of = self.store.node_of
+        return [node_of[investor_id] for investor_id in investor_ids if investor_id in node_of]
+
+    def get_fund_portfolio_summary(self, investor_ids: List[str] = None) -> Dict[str, Any]:
+        """Industry/stage distributions across every investor (or the given ones) plus a row per investor"""
+        return self.portfolio.summary(self._investor_nodes(investor_ids))
+
+    def compare_investor_portfolios(self, investor_ids: List[str]) -> Dict[str, Any]:
+        """Side-by-side industry/stage mix and co-investment overlap of several investors"""
+        return self.portfolio.compare(self._investor_nodes(investor_ids))
     
-    def build_startup_graph_from_db(self, db_manager):
-        """Build the memory graph from database data"""
+    def build_startup_graph_from_db(self, db_manager, page_size: int = 500, max_workers: int = 2,
+                                    progress=None) -> Dict[str, Any]:
+        """Build the memory graph from database data, returns page counts and timings"""
         print("🔄 Building memory graph from database...")
+        self._unsaved = None  # The build writes into this graph, so nothing saved earlier needs re-applying
         
-        # Get all startups
-        startups = db_manager.get_all_startups(limit=1000)
+        stats = GraphHydrator(self, db_manager, page_size=page_size, max_workers=max_workers,
+                              progress=progress).run()
         
-        for startup in startups:
-            startup_id = startup["startup_id"]
-            
-            # Add startup entity
+        print(f"✅ Memory graph built: {len(self.entities)} entities, {len(self.relationships)} relationships "
+              f"({stats['startups']} startups in {stats['total_seconds']:.1f}s: fetch {stats['fetch_seconds']:.1f}s, "
+              f"build {stats['build_seconds']:.1f}s, similarity {stats['similarity_seconds']:.1f}s, "
+              f"competitors {stats['competitor_seconds']:.1f}s)")
+        return stats
+    
+    def add_startup_from_row(self, startup: Dict[str, Any]):
+        """Add one startup_profiles row (with founders/team_members lists) and its connections"""
+        startup = dict(startup)
+        founders = startup.pop("founders", None) or []
+        team_members = startup.pop("team_members", None) or []
+        startup_id = startup["startup_id"]
+        
+        # Add startup entity
+        self.add_entity(
+            entity_id=startup_id,
+            entity_type="startup",
+            properties=startup
+        )
+        
+        # Add founders
+        for founder in founders:
+            founder_id = f"founder_{founder.get('name', '').replace(' ', '_').lower()}"
             self.add_entity(
-                entity_id=startup_id,
-                entity_type="startup",
-                properties=startup
+                entity_id=founder_id,
+                entity_type="founder",
+                properties=founder
             )
+            self.add_relationship(startup_id, founder_id, "founded_by")
             
-            # Get detailed startup info
-            detailed_startup = db_manager.get_startup_profile(startup_id)
-            if not detailed_startup:
-                continue
-            
-            # Add founders
-            for founder in detailed_startup.get("founders", []):
-                founder_id = f"founder_{founder.get('name', '').replace(' ', '_').lower()}"
-                self.add_entity(
-                    entity_id=founder_id,
-                    entity_type="founder",
-                    properties=founder
-                )
-                self.add_relationship(startup_id, founder_id, "founded_by")
-                
-                # Add founder experience connections
-                if founder.get("professional_experience"):
-                    exp_id = f"experience_{founder.get('professional_experience', '').replace(' ', '_').lower()}"
-                    self.add_entity(
-                        entity_id=exp_id,
-                        entity_type="experience",
-                        properties={"description": founder.get("professional_experience")}
-                    )
-                    self.add_relationship(founder_id, exp_id, "has_experience")
-            
-            # Add industry connections
-            industry = startup.get("industry_sector")
-            if industry:
-                industry_id = f"industry_{industry.replace(' ', '_').lower()}"
+            # Add founder experience connections
+            if founder.get("professional_experience"):
+                exp_id = f"experience_{founder.get('professional_experience', '').replace(' ', '_').lower()}"
                 self.add_entity(
-                    entity_id=industry_id,
-                    entity_type="industry",
-                    properties={"name": industry}
+                    entity_id=exp_id,
+                    entity_type="experience",
+                    properties={"description": founder.get("professional_experience")}
                 )
-                self.add_relationship(startup_id, industry_id, "operates_in")
-            
-            # Add stage connections
-            stage = startup.get("stage")
-            if stage:
-                stage_id = f"stage_{stage.replace(' ', '_').lower()}"
-                self.add_entity(
-                    entity_id=stage_id,
-                    entity_type="stage",
-                    properties={"name": stage}
-                )
-                self.add_relationship(startup_id, stage_id, "in_stage")
-            
-            # Add location connections
-            city = startup.get("location_city")
-            if city:
-                location_id = f"location_{city.replace(' ', '_').lower()}"
-                self.add_entity(
-                    entity_id=location_id,
-                    entity_type="location",
-                    properties={"city": city, "state": startup.get("location_state")}
-                )
-                self.add_relationship(startup_id, location_id, "located_in")
+                self.add_relationship(founder_id, exp_id, "has_experience")
+        
+        # Add team members
+        for member in team_members:
+            member_id = f"team_member_{member.get('name', '').replace(' ', '_').lower()}"
+            self.add_entity(
+                entity_id=member_id,
+                entity_type="team_member",
+                properties=member
+            )
+            self.add_relationship(startup_id, member_id, "employs")
         
-        # Build similarity relationships
-        self._build_similarity_relationships()
+        # Add industry connections
+        industry = startup.get("industry_sector")
+        if industry:
+            industry_id = f"industry_{industry.replace(' ', '_').lower()}"
+            self.add_entity(
+                entity_id=industry_id,
+                entity_type="industry",
+                properties={"name": industry}
+            )
+            self.add_relationship(startup_id, industry_id, "operates_in")
+        
+        # Add stage connections
+        stage = startup.get("stage")
+        if stage:
+            stage_id = f"stage_{stage.replace(' ', '_').lower()}"
+            self.add_entity(
+                entity_id=stage_id,
+                entity_type="stage",
+                properties={"name": stage}
+            )
+            self.add_relationship(startup_id, stage_id, "in_stage")
         
-        print(f"✅ Memory graph built: {len(self.entities)} entities, {len(self.relationships)} relationships")
+        # Add location connections
+        city = startup.get("location_city")
+        if city:
+            location_id = f"location_{city.replace(' ', '_').lower()}"
+            self.add_entity(
+                entity_id=location_id,
+                entity_type="location",
+                properties={"city": city, "state": startup.get("location_state")}
+            )
+            self.add_relationship(startup_id, location_id, "located_in")
     
     def _build_similarity_relationships(self):
         """Build similarity relationships between startups"""
-        startups = list(self.entity_index.get("startup", set()))
-        
-        for i, startup1 in enumerate(startups):
-            for startup2 in startups[i+1:]:
-                similarity_score = self._calculate_startup_similarity(startup1, startup2)
-                
-                if similarity_score > 0.3:  # Threshold for similarity
-                    self.add_relationship(
-                        startup1, startup2, "similar_to", 
-                        properties={"similarity_score": similarity_score},
-                        weight=similarity_score
-                    )
+        store = self.store
+        startups = list(store.type_members.get("startup", ()))
+        
+        # Blocked, vectorized equivalent of scoring every pair with _calculate_startup_similarity
+        self.similarity.load(startups, [store.records[node].properties for node in startups])
+        sources, targets, scores = self.similarity.similar_pairs(startups, SIMILARITY_THRESHOLD)
+        now = self._now()
+        with self._write_lock:
+            self.store.add_edges(sources, targets, "similar_to", scores, weight_key="similarity_score", now=now)
+            self._log(now, "build_similarity")
+    
+    def refresh_startup_similarity(self, startup_id: str) -> int:
+        """Recompute one startup's similar_to edges without rebuilding the graph
+
+        Scores the startup against its candidate block only, replaces its
+        previous similar_to edges and returns how many it now has.
+        """
+        if self._forwarded("refresh_startup_similarity", startup_id):
+            return 0
+        # One write-lock hold: the startup set it scores against and the edges it replaces can't change midway
+        with self._write_lock:
+            store = self.store
+            record = store.record(startup_id)
+            if record is None or record.type != "startup":
+                return 0
+            node = store.node_of[startup_id]
+            self.similarity.set(node, record.properties)
+
+            others = np.fromiter((other for other in store.type_members["startup"] if other != node), dtype=np.int64)
+            matches, scores = self.similarity.similar_to(node, others, SIMILARITY_THRESHOLD)
+            # Same orientation as the bulk build: earlier node -> later node
+            wanted = {((node, other) if node < other else (other, node)): score
+                      for other, score in zip(matches.tolist(), scores.tolist())}
+
+            # Drop similarity edges that no longer pass, in both directions, and upsert the rest
+            similar_to = store.rel_codes.get("similar_to")
+            if similar_to is not None:
+                for edge in store.out_edges(node) + store.in_edges(node):
+                    if store.rel[edge] == similar_to and (store.src[edge], store.dst[edge]) not in wanted:
+                        store.remove_edge(edge)
+            now = self._now()
+            for (source, target), score in wanted.items():
+                store.add_edge(store.ids[source], store.ids[target], "similar_to",
+                               properties={"similarity_score": score}, weight=score, now=now)
+            self._log(now, "refresh_startup_similarity", startup_id)
+            return len(matches)
     
+    def _text_competitor_edges(self, nodes: List[int] = None) -> List[int]:
+        """Live competes_with edges written from profile text, optionally only those touching nodes"""
+        store = self.store
+        code = store.rel_codes.get("competes_with")
+        key = store.prop_key_codes.get(COMPETITOR_WEIGHT_KEY)
+        if code is None or key is None:
+            return []
+        if nodes is not None:
+            edges = [edge for node in nodes for edge in store.out_edges(node) + store.in_edges(node)]
+            return [edge for edge in edges if store.rel[edge] == code and store.weight_key[edge] == key]
+        total = len(store.src)
+        matches = (np.frombuffer(store.alive, dtype=np.uint8, count=total).astype(bool)
+                   & (np.frombuffer(store.rel, dtype=np.uint16, count=total) == code)
+                   & (np.frombuffer(store.weight_key, dtype=np.int16, count=total) == key))
+        return np.flatnonzero(matches).tolist()
+
+    def build_competitor_relationships(self, top_k: int = COMPETITOR_TOP_K,
+                                       threshold: float = COMPETITOR_THRESHOLD) -> int:
+        """Batch job: replace every text-derived competes_with edge from profile TF-IDF neighbors
+
+        Each startup is linked to its top_k most similar startups by
+        problem_statement, solution_description and target_market (cosine
+        at least threshold). competes_with edges added by other means are
+        left alone. Returns the number of edges written.
+        """
+        if self._forwarded("build_competitors", top_k, threshold):
+            return 0
+        sources, targets, scores = self.competitors.build(top_k, threshold)
+        now = self._now()
+        with self._write_lock:
+            store = self.store
+            for edge in self._text_competitor_edges():
+                store.remove_edge(edge)
+            store.add_edges(sources, targets, "competes_with", scores, weight_key=COMPETITOR_WEIGHT_KEY, now=now)
+            self._log(now, "build_competitors", top_k, threshold)
+        return len(sources)
+
+    def refresh_startup_competitors(self, startup_id: str, top_k: int = COMPETITOR_TOP_K,
+                                    threshold: float = COMPETITOR_THRESHOLD) -> int:
+        """Re-score one startup's text competitors after its profile changed, returns how many it has"""
+        if self._forwarded("refresh_startup_competitors", startup_id, top_k, threshold):
+            return 0
+        with self._write_lock:
+            store = self.store
+            record = store.record(startup_id)
+            if record is None or record.type != "startup":
+                return 0
+            node = store.node_of[startup_id]
+            competitors = self.competitors.rescore(node, top_k, threshold)
+            # Same orientation as the batch build: earlier node -> later node
+            wanted = {((node, other) if node < other else (other, node)): score
+                      for other, score in competitors.items()}
+            for edge in self._text_competitor_edges([node]):
+                if (store.src[edge], store.dst[edge]) not in wanted:
+                    store.remove_edge(edge)
+            now = self._now()
+            for (source, target), score in wanted.items():
+                store.add_edge(store.ids[source], store.ids[target], "competes_with",
+                               properties={COMPETITOR_WEIGHT_KEY: score}, weight=score, now=now)
+            self._log(now, "refresh_startup_competitors", startup_id, top_k, threshold)
+            return len(wanted)
+
     def _calculate_startup_similarity(self, startup1_id: str, startup2_id: str) -> float:
         """Calculate similarity between two startups"""
-        if startup1_id not in self.entities or startup2_id not in self.entities:
+        record1 = self.store.record(startup1_id)
+        record2 = self.store.record(startup2_id)
+        if record1 is None or record2 is None:
             return 0.0
         
-        startup1 = self.entities[startup1_id]["properties"]
-        startup2 = self.entities[startup2_id]["properties"]
+        startup1 = record1.properties
+        startup2 = record2.properties
         
         similarity_factors = []
         
@@ -405,42 +761,50 @@ class MemoryGraph:
         return sum(similarity_factors)
     
     def get_chatbot_context(self, startup_id: str, query: str) -> Dict[str, Any]:
-        """Get enhanced context for chatbot responses"""
-        context = self.get_startup_context(startup_id)
-        
-        # Add query-specific context
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ["competitor", "competition", "rival"]):
-            context["focus"] = "competitors"
-            context["competitors"] = self.get_related_entities(
-                startup_id, ["competes_with", "similar_to"], max_depth=2
-            )
-        
-        elif any(word in query_lower for word in ["similar", "like", "comparable"]):
-            context["focus"] = "similar_startups"
-            context["similar_startups"] = self.find_similar_startups(startup_id)
-        
-        elif any(word in query_lower for word in ["founder", "team", "who"]):
-            context["focus"] = "team"
-        
-        elif any(word in query_lower for word in ["funding", "investment", "investor"]):
-            context["focus"] = "funding"
-        
-        elif any(word in query_lower for word in ["market", "industry", "sector"]):
-            context["focus"] = "market"
-        
-        return context
+        """Get enhanced context for chatbot responses
+
+        Only the sections the query's intent needs are built (see
+        memory/context.py), capped per section and cached until the
+        startup's neighborhood changes.
+        """
+        return self.chat_context.get(startup_id, query)
     
+    def export_stream(self, format: str = "ndjson", kind: str = "entities", entity_types: List[str] = None,
+                      relation_types: List[str] = None) -> Iterator[bytes]:
+        """Stream the graph out in batches (see memory/export.py)
+
+        format "ndjson" writes entities then relationships. "arrow" (IPC
+        stream) and "parquet" write one table, kind "entities" or
+        "relationships".
+        """
+        exporter = GraphExporter(self.store, entity_types, relation_types)
+        if format == "ndjson":
+            return exporter.ndjson()
+        if format == "arrow":
+            return exporter.arrow_ipc(kind)
+        if format == "parquet":
+            return exporter.parquet(kind)
+        raise ValueError(f"Unknown export format {format!r}")
+
+    def import_file(self, path: str) -> Dict[str, Any]:
+        """Bulk-load an NDJSON, Arrow IPC or Parquet export into this graph"""
+        self.store.check_writable()
+        stats = import_file(self, path)
+        print(f" Imported {stats['entities']} entities and {stats['relationships']} relationships "
+              f"from {path} in {stats['seconds']}s")
+        return stats
+
     def export_graph(self) -> Dict[str, Any]:
         """Export graph for visualization or persistence"""
+        store = self.store
         return {
-            "entities": self.entities,
-            "relationships": self.relationships,
+            "entities": {entity_id: record.to_dict() for entity_id, record in self.entities.items()},
+            "relationships": [store.edge_dict(edge) for edge in store.edge_ids()],
             "stats": {
                 "total_entities": len(self.entities),
-                "total_relationships": len(self.relationships),
-                "entity_types": {etype: len(entities) for etype, entities in self.entity_index.items()},
+                "total_relationships": store.edge_count,
+                "entity_types": {etype: len(nodes) for etype, nodes in store.type_members.items() if nodes},
+                "conversations": len(self.conversations),
                 "created_at": datetime.now().isoformat()
             }
         }
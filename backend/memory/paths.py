@@ -0,0 +1,263 @@
+import heapq
+import time
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple
+
+# Defaults that keep a single path query from pinning a worker
+MAX_EXPANSIONS = 50_000
+TIME_LIMIT = 0.5  # seconds
+
+
+class SearchBudgetExceeded(Exception):
+    """Raised inside a search when it runs out of expansions or time"""
+
+
+class _Budget:
+    CLOCK_EVERY = 256  # Check the clock every N expansions
+
+    def __init__(self, max_expansions: int, time_limit: float):
+        self.max_expansions = max_expansions
+        self.deadline = time.perf_counter() + time_limit
+        self.started = time.perf_counter()
+        self.expansions = 0
+
+    def spend(self):
+        self.expansions += 1
+        if self.expansions > self.max_expansions:
+            raise SearchBudgetExceeded("expansion limit")
+        if self.expansions % self.CLOCK_EVERY == 0 and time.perf_counter() > self.deadline:
+            raise SearchBudgetExceeded("time limit")
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 2)
+
+
+class _Path:
+    """A path as parallel node and edge id lists"""
+
+    __slots__ = ("nodes", "edges", "cost")
+
+    def __init__(self, nodes: List[int], edges: List[int], cost: float):
+        self.nodes = nodes
+        self.edges = edges
+        self.cost = cost
+
+    def __lt__(self, other: "_Path") -> bool:
+        return (self.cost, len(self.edges)) < (other.cost, len(other.edges))
+
+
+class PathFinder:
+    """Bounded path queries over a GraphStore
+
+    Replaces the exhaustive simple-path DFS. shortest_path is a bidirectional
+    BFS. k_shortest_paths is Yen's algorithm over a hop-bounded Dijkstra.
+    Both take relation type filters, can follow edges in either direction
+    (the default) or only forwards, and stop at max_expansions node
+    expansions or time_limit seconds, returning whatever they found with
+    complete=False.
+
+    Weighted costs are 1 / weight, so strong relationships (similarity 0.9)
+    are shorter than weak ones (0.3). Edges with a non-positive weight are
+    not traversed when weighted.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    # ---- traversal ----
+
+    def _steps(self, node: int, codes: Optional[Set[int]], directed: bool, forward: bool
+               ) -> Iterator[Tuple[int, int]]:
+        """(edge, neighbor) pairs leaving node. Backward steps walk incoming edges when directed"""
+        store = self.store
+        if forward or not directed:
+            for edge in store.out_edges(node):
+                if codes is None or store.rel[edge] in codes:
+                    yield edge, store.dst[edge]
+        if not forward or not directed:
+            for edge in store.in_edges(node):
+                if codes is None or store.rel[edge] in codes:
+                    yield edge, store.src[edge]
+
+    def _cost(self, edge: int, weighted: bool) -> float:
+        if not weighted:
+            return 1.0
+        weight = self.store.weight[edge]
+        return 1.0 / weight if weight > 0 else float("inf")
+
+    def _describe(self, path: _Path) -> Dict[str, Any]:
+        store = self.store
+        return {
+            "nodes": [store.ids[node] for node in path.nodes],
+            "relationships": [
+                {
+                    "source": store.ids[store.src[edge]],
+                    "target": store.ids[store.dst[edge]],
+                    "type": store.rel_names[store.rel[edge]],
+                    "weight": store.weight[edge]
+                }
+                for edge in path.edges
+            ],
+            "hops": len(path.edges),
+            "cost": round(path.cost, 6)
+        }
+
+    def _result(self, paths: List[_Path], complete: bool, budget: _Budget, reason: str = None) -> Dict[str, Any]:
+        return {
+            "paths": [self._describe(path) for path in paths],
+            "complete": complete,
+            "stopped_by": reason,
+            "expansions": budget.expansions,
+            "elapsed_ms": budget.elapsed_ms()
+        }
+
+    def _endpoints(self, source: str, target: str) -> Optional[Tuple[int, int]]:
+        start, goal = self.store.node_of.get(source), self.store.node_of.get(target)
+        if start is None or goal is None:
+            return None
+        return start, goal
+
+    # ---- shortest path (bidirectional BFS) ----
+
+    def shortest_path(self, source: str, target: str, relation_types: Iterable[str] = None,
+                      directed: bool = False, max_depth: int = 6, max_expansions: int = MAX_EXPANSIONS,
+                      time_limit: float = TIME_LIMIT) -> Dict[str, Any]:
+        """Fewest-hop path between two entities, searching from both ends"""
+        budget = _Budget(max_expansions, time_limit)
+        endpoints = self._endpoints(source, target)
+        if endpoints is None:
+            return self._result([], True, budget)
+        start, goal = endpoints
+        if start == goal:
+            return self._result([_Path([start], [], 0.0)], True, budget)
+        codes = self.store.rel_filter(relation_types)
+
+        # node -> (previous node, edge) towards its own side's root
+        parents = ({start: None}, {goal: None})
+        frontiers = ([start], [goal])
+        depths = [0, 0]
+        try:
+            while frontiers[0] and frontiers[1] and depths[0] + depths[1] < max_depth:
+                side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+                seen, other_seen = parents[side], parents[1 - side]
+                next_frontier = []
+                for node in frontiers[side]:
+                    budget.spend()
+                    for edge, neighbor in self._steps(node, codes, directed, forward=(side == 0)):
+                        if neighbor in seen:
+                            continue
+                        seen[neighbor] = (node, edge)
+                        if neighbor in other_seen:
+                            return self._result([self._join(parents, neighbor)], True, budget)
+                        next_frontier.append(neighbor)
+                frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+                depths[side] += 1
+        except SearchBudgetExceeded as e:
+            return self._result([], False, budget, str(e))
+        return self._result([], True, budget)
+
+    def _join(self, parents: Tuple[Dict, Dict], meeting: int) -> _Path:
+        nodes, edges = [meeting], []
+        step = parents[0][meeting]
+        while step is not None:
+            node, edge = step
+            nodes.insert(0, node)
+            edges.insert(0, edge)
+            step = parents[0][node]
+        step = parents[1][meeting]
+        while step is not None:
+            node, edge = step
+            nodes.append(node)
+            edges.append(edge)
+            step = parents[1][node]
+        return _Path(nodes, edges, float(len(edges)))
+
+    # ---- k shortest paths (Yen) ----
+
+    def _dijkstra(self, start: int, goal: int, codes: Optional[Set[int]], directed: bool, weighted: bool,
+                  max_hops: int, banned_nodes: Set[int], banned_edges: Set[int], budget: _Budget
+                  ) -> Optional[_Path]:
+        """Cheapest path with at most max_hops edges, avoiding banned nodes and edges
+
+        States are (node, hops). A node popped again is only expanded if it
+        now has fewer hops, since anything popped later costs at least as much.
+        """
+        if max_hops < 1:
+            return None
+        heap = [(0.0, 0, start)]
+        parents = {(start, 0): None}
+        best = {(start, 0): 0.0}
+        settled_hops: Dict[int, int] = {}
+        while heap:
+            cost, hops, node = heapq.heappop(heap)
+            if node in settled_hops and settled_hops[node] <= hops:
+                continue
+            settled_hops[node] = hops
+            if node == goal:
+                nodes, edges, state = [], [], (node, hops)
+                while state is not None:
+                    nodes.append(state[0])
+                    step = parents[state]
+                    if step is not None:
+                        edges.append(step[1])
+                        state = step[0]
+                    else:
+                        state = None
+                return _Path(nodes[::-1], edges[::-1], cost)
+            if hops >= max_hops:
+                continue
+            budget.spend()
+            for edge, neighbor in self._steps(node, codes, directed, forward=True):
+                if edge in banned_edges or neighbor in banned_nodes:
+                    continue
+                step_cost = self._cost(edge, weighted)
+                if step_cost == float("inf"):
+                    continue
+                state, next_cost = (neighbor, hops + 1), cost + step_cost
+                if next_cost < best.get(state, float("inf")):
+                    best[state] = next_cost
+                    parents[state] = ((node, hops), edge)
+                    heapq.heappush(heap, (next_cost, hops + 1, neighbor))
+        return None
+
+    def k_shortest_paths(self, source: str, target: str, k: int = 3, relation_types: Iterable[str] = None,
+                         directed: bool = False, weighted: bool = True, max_depth: int = 4,
+                         max_expansions: int = MAX_EXPANSIONS, time_limit: float = TIME_LIMIT) -> Dict[str, Any]:
+        """Up to k cheapest loop-free paths with at most max_depth hops, cheapest first"""
+        budget = _Budget(max_expansions, time_limit)
+        endpoints = self._endpoints(source, target)
+        if endpoints is None or k < 1:
+            return self._result([], True, budget)
+        start, goal = endpoints
+        codes = self.store.rel_filter(relation_types)
+
+        found: List[_Path] = []
+        try:
+            first = self._dijkstra(start, goal, codes, directed, weighted, max_depth, set(), set(), budget)
+            if first is None:
+                return self._result([], True, budget)
+            found.append(first)
+            candidates: List[_Path] = []
+            seen = {tuple(first.edges)}
+            while len(found) < k:
+                previous = found[-1]
+                for i in range(len(previous.edges)):
+                    spur, root_nodes, root_edges = previous.nodes[i], previous.nodes[:i + 1], previous.edges[:i]
+                    banned_edges = {path.edges[i] for path in found
+                                    if len(path.edges) > i and path.edges[:i] == root_edges}
+                    spur_path = self._dijkstra(spur, goal, codes, directed, weighted, max_depth - i,
+                                               set(root_nodes[:-1]), banned_edges, budget)
+                    if spur_path is None:
+                        continue
+                    edges = root_edges + spur_path.edges
+                    if tuple(edges) in seen:
+                        continue
+                    seen.add(tuple(edges))
+                    root_cost = sum(self._cost(edge, weighted) for edge in root_edges)
+                    heapq.heappush(candidates, _Path(root_nodes[:-1] + spur_path.nodes, edges,
+                                                     root_cost + spur_path.cost))
+                if not candidates:
+                    break
+                found.append(heapq.heappop(candidates))
+        except SearchBudgetExceeded as e:
+            return self._result(found, False, budget, str(e))
+        return self._result(found, True, budget)
@@ -0,0 +1,296 @@
+import threading
+from itertools import combinations
+from typing import Dict, List, Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+UNKNOWN = "Unknown"
+ATTRIBUTE_COLUMNS = ("industry_sector", "stage")
+HOLDING_RELATION = "invested_in"
+FOUNDER_RELATION = "founded_by"
+# Touching more nodes than this at once re-derives every portfolio on the next lookup
+BULK_TOUCH_LIMIT = 50_000
+
+
+class PortfolioAnalytics:
+    """Columnar investor -> startup holdings behind the portfolio insight methods
+
+    Holdings (invested_in targets) are kept per investor as node arrays, and
+    the attributes of held startups as integer code columns with one
+    vocabulary per attribute. Each investor's industry and stage
+    distributions are np.bincount results over those codes. The engine
+    watches the GraphStore: a touched investor re-derives its own holdings
+    and a touched startup re-derives the investors that hold it, so a
+    lookup only redoes the portfolios that changed.
+
+    Whole-fund summaries and cross-investor comparisons run once over a
+    pandas frame of every holding (categorical attribute columns), built
+    from the arrays and cached until a portfolio changes.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._labels = {name: [] for name in ATTRIBUTE_COLUMNS}  # code -> label
+        self._vocab = {name: {} for name in ATTRIBUTE_COLUMNS}  # label -> code
+        self._codes = {name: np.zeros(0, dtype=np.int32) for name in ATTRIBUTE_COLUMNS}  # node -> code, -1 stale
+        self._holdings: Dict[int, np.ndarray] = {}  # investor node -> held nodes, edge order
+        self._founders: Dict[int, np.ndarray] = {}  # held node -> founder nodes
+        self._counts: Dict[int, Dict[str, np.ndarray]] = {}  # investor node -> attribute -> bincount
+        self._unique_founders: Dict[int, int] = {}
+        self._frame = None
+        self._dirty = set()
+        self._all_dirty = True
+        self._lock = threading.RLock()
+        store.watchers.append(self)
+
+    # ---- maintenance ----
+
+    def touch(self, nodes: Iterable[int]):
+        """Store callback (and MemoryGraph.update_entity): these nodes changed"""
+        with self._lock:
+            if self._all_dirty:
+                return
+            if isinstance(nodes, np.ndarray):
+                if len(nodes) > BULK_TOUCH_LIMIT:
+                    self._all_dirty = True
+                    self._dirty.clear()
+                    return
+                nodes = nodes.tolist()
+            self._dirty.update(nodes)
+
+    @staticmethod
+    def _label(value) -> str:
+        return UNKNOWN if value is None else value if isinstance(value, str) else str(value)
+
+    def _code(self, name: str, value) -> int:
+        label = self._label(value)
+        code = self._vocab[name].get(label)
+        if code is None:
+            code = self._vocab[name][label] = len(self._labels[name])
+            self._labels[name].append(label)
+        return code
+
+    def _attribute_codes(self, name: str, nodes: np.ndarray) -> np.ndarray:
+        """Attribute codes for held nodes, encoding any that are stale"""
+        codes = self._codes[name]
+        if len(nodes) and int(nodes.max()) >= len(codes):
+            grown = np.full(max(int(nodes.max()) + 1, 2 * len(codes), 64), -1, dtype=np.int32)
+            grown[:len(codes)] = codes
+            self._codes[name] = codes = grown
+        stale = nodes[codes[nodes] < 0]
+        for node in stale.tolist():
+            record = self.store.records[node]
+            codes[node] = self._code(name, record.properties.get(name, UNKNOWN) if record is not None else None)
+        return codes[nodes]
+
+    def _founders_of(self, node: int) -> np.ndarray:
+        founders = self._founders.get(node)
+        if founders is None:
+            store = self.store
+            code = store.rel_codes.get(FOUNDER_RELATION)
+            founders = []
+            if code is not None:
+                for edges, endpoints in ((store.out_edges(node), store.dst), (store.in_edges(node), store.src)):
+                    for edge in edges:
+                        if store.rel[edge] == code and store.records[endpoints[edge]] is not None:
+                            founders.append(endpoints[edge])
+            founders = self._founders[node] = np.asarray(founders, dtype=np.int64)
+        return founders
+
+    def _derive(self, investor: int):
+        """Re-derive one investor's holdings, distributions and founder count"""
+        store = self.store
+        code = store.rel_codes.get(HOLDING_RELATION)
+        held = [] if code is None or store.records[investor] is None else [
+            store.dst[edge] for edge in store.out_edges(investor)
+            if store.rel[edge] == code and store.records[store.dst[edge]] is not None
+        ]
+        if not held:
+            self._holdings.pop(investor, None)
+            self._counts.pop(investor, None)
+            self._unique_founders.pop(investor, None)
+            return
+        held = self._holdings[investor] = np.asarray(held, dtype=np.int64)
+        self._counts[investor] = {name: np.bincount(self._attribute_codes(name, held)) for name in ATTRIBUTE_COLUMNS}
+        founders = [self._founders_of(node) for node in held.tolist()]
+        self._unique_founders[investor] = len(np.unique(np.concatenate(founders))) if founders else 0
+
+    def refresh(self):
+        """Re-derive the portfolios touched since the last lookup"""
+        store = self.store
+        with self._lock:
+            if self._all_dirty:
+                self._holdings.clear()
+                self._counts.clear()
+                self._unique_founders.clear()
+                self._founders.clear()
+                for name in ATTRIBUTE_COLUMNS:
+                    self._codes[name][:] = -1
+                code = store.rel_codes.get(HOLDING_RELATION)
+                investors = set() if code is None else {
+                    store.src[edge] for edge in store.edge_ids() if store.rel[edge] == code
+                }
+                for investor in sorted(investors):
+                    self._derive(investor)
+                self._all_dirty = False
+                self._dirty.clear()
+                self._frame = None
+                return
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+            code = store.rel_codes.get(HOLDING_RELATION)
+            investors = set()
+            for node in dirty:
+                for name in ATTRIBUTE_COLUMNS:
+                    if node < len(self._codes[name]):
+                        self._codes[name][node] = -1
+                self._founders.pop(node, None)
+                investors.add(node)
+                if node < len(store.ids):
+                    # Investors holding a changed startup (or a startup whose founders changed)
+                    investors.update(store.src[edge] for edge in store.in_edges(node) if store.rel[edge] == code)
+            # A founder's change reaches its startups through their own touches
+            for investor in sorted(investors):
+                self._derive(investor)
+            self._frame = None
+
+    # ---- per investor ----
+
+    def _distribution(self, investor: int, name: str) -> Dict[str, int]:
+        counts = self._counts[investor][name]
+        labels = self._labels[name]
+        return {labels[code]: int(count) for code, count in enumerate(counts) if count}
+
+    def insights(self, investor: int) -> Dict[str, Any]:
+        """One investor's portfolio size, industry/stage distributions and unique founders"""
+        with self._lock:
+            self.refresh()
+            held = self._holdings.get(investor)
+            if held is None:
+                return {"portfolio_size": 0, "industry_distribution": {}, "stage_distribution": {},
+                        "unique_founders": 0, "portfolio_startups": []}
+            return {
+                "portfolio_size": len(held),
+                "industry_distribution": self._distribution(investor, "industry_sector"),
+                "stage_distribution": self._distribution(investor, "stage"),
+                "unique_founders": self._unique_founders[investor],
+                "portfolio_startups": [self.store.records[node] for node in held.tolist()]
+            }
+
+    # ---- whole fund ----
+
+    def frame(self) -> pd.DataFrame:
+        """One row per (investor, held startup) with categorical attribute columns"""
+        with self._lock:
+            self.refresh()
+            if self._frame is None:
+                investors = np.fromiter(self._holdings, dtype=np.int64, count=len(self._holdings))
+                sizes = np.fromiter((len(held) for held in self._holdings.values()), dtype=np.int64,
+                                    count=len(self._holdings))
+                held = np.concatenate(list(self._holdings.values())) if self._holdings else \
+                    np.zeros(0, dtype=np.int64)
+                frame = pd.DataFrame({"investor": np.repeat(investors, sizes), "startup": held})
+                for name in ATTRIBUTE_COLUMNS:
+                    frame[name] = pd.Categorical.from_codes(self._attribute_codes(name, held),
+                                                            categories=list(self._labels[name]))
+                self._frame = frame
+            return self._frame
+
+    def _founder_frame(self, startups: np.ndarray) -> pd.DataFrame:
+        founders = [self._founders_of(node) for node in startups.tolist()]
+        sizes = np.fromiter((len(group) for group in founders), dtype=np.int64, count=len(founders))
+        return pd.DataFrame({
+            "startup": np.repeat(startups, sizes),
+            "founder": np.concatenate(founders) if founders else np.zeros(0, dtype=np.int64)
+        })
+
+    def _select(self, investors: Optional[List[int]]) -> pd.DataFrame:
+        frame = self.frame()
+        return frame if investors is None else frame[frame["investor"].isin(investors)]
+
+    def _ids(self, nodes) -> List[str]:
+        ids = self.store.ids
+        return [ids[node] for node in nodes]
+
+    def _shares(self, holdings: pd.DataFrame, name: str) -> Dict[str, Dict[str, float]]:
+        table = pd.crosstab(holdings["investor"], holdings[name], normalize="index")
+        labels = [str(label) for label in table.columns]
+        return {
+            investor_id: {label: round(float(share), 4) for label, share in zip(labels, row) if share}
+            for investor_id, row in zip(self._ids(table.index), table.to_numpy())
+        }
+
+    def summary(self, investors: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Fund-wide distributions plus one row per investor, from a single pass over the holdings frame"""
+        with self._lock:
+            holdings = self._select(investors)
+            startups = holdings["startup"].unique()
+            founders = self._founder_frame(startups).merge(holdings[["investor", "startup"]], on="startup")
+        if holdings.empty:
+            return {"investors": 0, "holdings": 0, "unique_startups": 0, "unique_founders": 0,
+                    "industry_distribution": {}, "stage_distribution": {}, "per_investor": []}
+
+        sizes = holdings.groupby("investor").size()
+        unique_founders = founders.groupby("investor")["founder"].nunique().reindex(sizes.index, fill_value=0)
+        top = {
+            name: pd.crosstab(holdings["investor"], holdings[name]).idxmax(axis=1).reindex(sizes.index)
+            for name in ATTRIBUTE_COLUMNS
+        }
+        per_investor = [
+            {
+                "investor_id": investor_id,
+                "portfolio_size": int(size),
+                "unique_founders": int(founder_count),
+                "top_industry": str(industry),
+                "top_stage": str(stage)
+            }
+            for investor_id, size, founder_count, industry, stage in zip(
+                self._ids(sizes.index), sizes.to_numpy(), unique_founders.to_numpy(),
+                top["industry_sector"], top["stage"]
+            )
+        ]
+        per_investor.sort(key=lambda row: row["portfolio_size"], reverse=True)
+
+        def distribution(name):
+            counts = holdings[name].value_counts()
+            return {str(label): int(count) for label, count in counts.items() if count}
+
+        return {
+            "investors": len(sizes),
+            "holdings": len(holdings),
+            "unique_startups": len(startups),
+            "unique_founders": int(founders["founder"].nunique()),
+            "industry_distribution": distribution("industry_sector"),
+            "stage_distribution": distribution("stage"),
+            "per_investor": per_investor
+        }
+
+    def compare(self, investors: List[int]) -> Dict[str, Any]:
+        """Industry and stage mix of each investor plus pairwise co-investment overlap"""
+        with self._lock:
+            holdings = self._select(investors)
+        if holdings.empty:
+            return {"investors": [], "portfolio_size": {}, "industry_share": {}, "stage_share": {}, "overlap": []}
+        sizes = holdings.groupby("investor").size()
+        pairs = holdings[["investor", "startup"]].merge(holdings[["investor", "startup"]], on="startup")
+        pairs = pairs[pairs["investor_x"] < pairs["investor_y"]]
+        shared = pairs.groupby(["investor_x", "investor_y"]).size()
+        overlap = []
+        for left, right in combinations(sorted(sizes.index), 2):
+            common = int(shared.get((left, right), 0))
+            union = int(sizes[left] + sizes[right]) - common
+            overlap.append({
+                "investors": self._ids((left, right)),
+                "shared_startups": common,
+                "jaccard": round(common / union, 4) if union else 0.0
+            })
+        overlap.sort(key=lambda row: row["shared_startups"], reverse=True)
+        return {
+            "investors": self._ids(sizes.index),
+            "portfolio_size": dict(zip(self._ids(sizes.index), sizes.astype(int).tolist())),
+            "industry_share": self._shares(holdings, "industry_sector"),
+            "stage_share": self._shares(holdings, "stage"),
+            "overlap": overlap
+        }
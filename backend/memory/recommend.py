@@ -0,0 +1,200 @@
+import threading
+import time
+from typing import Dict, Any, Iterable, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+
+RESTART_PROBABILITY = 0.15
+PUSH_TOLERANCE = 1e-6  # Residual per transition left unpushed
+MAX_ROUNDS = 200
+MATRIX_MAX_AGE = 30.0  # Seconds a matrix is reused after the graph changes
+RANKING_DEPTH = 200  # Candidates cached per seed set
+RANKING_CACHE_SIZE = 2048
+
+
+class RecommendationEngine:
+    """Personalized PageRank (random walk with restart) over a GraphStore
+
+    Live edges between live entities are turned into a weighted, undirected
+    transition matrix in CSR form (NumPy indptr, target and probability
+    arrays, each row summing to one), so no SciPy is needed. Edges with a
+    non-positive weight are skipped, and similar_to edges count by their
+    similarity score.
+
+    Every walk restarts at a seed set (an investor's holdings, startups
+    they viewed) with probability restart_probability. Scores come from
+    the residual push approximation (Andersen, Chung and Lang), vectorized
+    by rounds: every node whose residual exceeds tolerance times its
+    degree pushes at once, via one gather and one np.bincount. Work is
+    bounded by the seeds' neighborhood rather than the graph, and the top
+    ranks match a fully converged power iteration up to near-ties. Mass
+    that reaches a node with no edges returns to the seeds. Rankings are
+    cached per (seed set, candidate type, restart probability).
+
+    The matrix and the cache are rebuilt when the store changes, at most
+    every MATRIX_MAX_AGE seconds, so rankings may trail the newest edges by
+    that much.
+    """
+
+    def __init__(self, store, max_age: float = MATRIX_MAX_AGE, cache_size: int = RANKING_CACHE_SIZE):
+        self.store = store
+        self.max_age = max_age
+        self._matrix = None  # (indptr, targets, probabilities, node count)
+        self._built_version = None
+        self._built_at = 0.0
+        self._rankings = LRUCache(maxsize=cache_size)
+        self._lock = threading.Lock()
+        self.stats = {"builds": 0, "hits": 0, "misses": 0, "last_build_ms": 0.0, "last_walk_ms": 0.0}
+
+    # ---- matrix ----
+
+    def _live_nodes(self, n: int) -> np.ndarray:
+        """Caller holds the store's write lock"""
+        alive = np.zeros(n, dtype=bool)
+        for members in self.store.type_members.values():
+            if members:
+                alive[np.fromiter(members, dtype=np.int64, count=len(members))] = True
+        return alive
+
+    def _members(self, entity_type: str) -> np.ndarray:
+        """Copy of one type's member nodes, taken under the store's write lock"""
+        with self.store._write_lock:
+            members = self.store.type_members.get(entity_type, ())
+            return np.fromiter(members, dtype=np.int64, count=len(members))
+
+    def _build(self):
+        """Coordinate-form transition matrix of the store's live edges"""
+        started = time.perf_counter()
+        store = self.store
+        # Copies taken under the write lock: writers neither tear the columns nor hit exported buffers
+        with store._write_lock:
+            n = len(store.ids)
+            total = len(store.src)
+            src = np.frombuffer(store.src, dtype=np.int32, count=total).astype(np.int64)
+            dst = np.frombuffer(store.dst, dtype=np.int32, count=total).astype(np.int64)
+            weight = np.frombuffer(store.weight, dtype=np.float64, count=total).copy()
+            alive = np.frombuffer(store.alive, dtype=np.uint8, count=total).astype(bool)
+            alive_nodes = self._live_nodes(n)
+            version = store.version
+        keep = alive & (weight > 0) & alive_nodes[src] & alive_nodes[dst] & (src != dst)
+        src, dst, weight = src[keep], dst[keep], weight[keep]
+
+        # Walks follow relationships both ways
+        sources = np.concatenate((src, dst))
+        targets = np.concatenate((dst, src))
+        weights = np.concatenate((weight, weight))
+        out_weight = np.bincount(sources, weights=weights, minlength=n)
+        order = np.argsort(sources, kind='stable')
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+        probabilities = weights[order] / out_weight[sources[order]]
+
+        self._matrix = (indptr, targets[order], probabilities, n)
+        self._built_version = version
+        self._built_at = time.time()
+        self._rankings.clear()
+        self.stats["builds"] += 1
+        self.stats["last_build_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    def _current_matrix(self):
+        """Caller holds the lock"""
+        stale = self._built_version != self.store.version
+        if self._matrix is None or (stale and time.time() - self._built_at >= self.max_age):
+            self._build()
+        return self._matrix
+
+    # ---- walks ----
+
+    def personalized_pagerank(self, seeds: Iterable[int], restart_probability: float = RESTART_PROBABILITY,
+                              tolerance: float = PUSH_TOLERANCE) -> Tuple[np.ndarray, int]:
+        """Approximate visit probabilities of a walk restarting uniformly at the seeds, and push rounds used"""
+        with self._lock:
+            indptr, targets, probabilities, n = self._current_matrix()
+        seeds = np.unique(np.asarray(list(seeds), dtype=np.int64))
+        seeds = seeds[seeds < n]
+        restart = np.zeros(n, dtype=np.float64)
+        if not len(seeds):
+            return restart, 0
+        restart[seeds] = 1.0 / len(seeds)
+
+        degree = np.maximum(np.diff(indptr), 1)
+        scores = np.zeros(n, dtype=np.float64)
+        residual = restart.copy()
+        rounds = 0
+        while rounds < MAX_ROUNDS:
+            active = np.flatnonzero(residual > tolerance * degree)
+            if not len(active):
+                break
+            rounds += 1
+            mass = residual[active]
+            residual[active] = 0.0
+            scores[active] += restart_probability * mass
+            spread = (1.0 - restart_probability) * mass
+
+            # Positions of every active node's row, concatenated
+            starts = indptr[active]
+            counts = indptr[active + 1] - starts
+            total = int(counts.sum())
+            rows = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+            residual += np.bincount(targets[rows], weights=np.repeat(spread, counts) * probabilities[rows],
+                                    minlength=n)
+            stranded = spread[counts == 0].sum()
+            if stranded:
+                residual += stranded * restart
+        # Every remaining residual will at least restart here
+        return scores + restart_probability * residual, rounds
+
+    def rank(self, seeds: Iterable[int], candidate_type: str = "startup", k: int = 10,
+             restart_probability: float = RESTART_PROBABILITY) -> Dict[str, Any]:
+        """Top k entities of candidate_type by personalized PageRank from the seeds, seeds excluded"""
+        started = time.perf_counter()
+        seeds = tuple(sorted(set(seeds)))
+        key = (seeds, candidate_type, restart_probability)
+        with self._lock:
+            self._current_matrix()
+            ranking = self._rankings.get(key)
+        # A cached ranking serves any k up to its depth, or any k once it holds every reachable candidate
+        cached = ranking is not None and (k <= len(ranking[0]) or ranking[1])
+        rounds = 0
+        if cached:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            scores, rounds = self.personalized_pagerank(seeds, restart_probability)
+            candidates = np.zeros(len(scores), dtype=bool)
+            members = self._members(candidate_type)
+            candidates[members[members < len(scores)]] = True
+            candidates[[seed for seed in seeds if seed < len(scores)]] = False
+            depth = max(k, RANKING_DEPTH)
+            reached = np.flatnonzero(candidates & (scores > 0))
+            complete = len(reached) <= depth
+            if not complete:
+                reached = reached[np.argpartition(scores[reached], -depth)[-depth:]]
+            order = reached[np.lexsort((reached, -scores[reached]))]
+            ranking = ([(int(node), float(scores[node])) for node in order], complete)
+            with self._lock:
+                self._rankings[key] = ranking
+
+        # Drop entities removed or retyped since the matrix was built
+        records = self.store.records
+        top = []
+        for node, score in ranking[0]:
+            record = records[node]
+            if record is not None and record.type == candidate_type:
+                top.append((node, score))
+                if len(top) == k:
+                    break
+        elapsed = round((time.perf_counter() - started) * 1000, 2)
+        self.stats["last_walk_ms"] = elapsed
+        return {"ranking": top, "cached": cached, "rounds": rounds, "elapsed_ms": elapsed}
+
+    def status(self) -> Dict[str, Any]:
+        matrix = self._matrix
+        return {
+            "nodes": matrix[3] if matrix else 0,
+            "transitions": len(matrix[1]) if matrix else 0,
+            "stale": self._built_version != self.store.version,
+            "cached_rankings": len(self._rankings),
+            **self.stats
+        }
@@ -0,0 +1,241 @@
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Any, Callable, Optional
+
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = "builder.lock"
+CHANGES_FILE = "changes.log"
+SNAPSHOT_PATTERN = re.compile(r"^memory_graph\.(\d+)\.snapshot$")
+
+
+class SharedMemoryGraph:
+    """One memory graph shared by every worker process through mmapped snapshots
+
+    The first process to take builder.lock in the directory becomes the
+    builder: it owns the writable graph and publishes immutable generations
+    (memory_graph.<generation>.snapshot) by atomically replacing CURRENT.
+    Every other process attaches read-only. Its adjacency and edge arrays
+    are views of the same page-cache pages, so N workers do not hold N
+    copies, and it swaps to a new generation when CURRENT changes.
+
+    Readers forward writes to changes.log, which the builder drains into
+    its graph before the next publish, so writes show up in every worker
+    within about publish_interval seconds. When the builder exits, the next
+    reader to take the lock promotes itself.
+    """
+
+    def __init__(self, graph, directory: str, poll_interval: float = 2.0,
+                 publish_interval: float = 30.0, keep_generations: int = 2):
+        self.graph = graph
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.publish_interval = publish_interval
+        self.keep_generations = max(2, keep_generations)
+        self.role = None
+        self.attached = None  # Snapshot file name the graph currently reflects
+        self._lock_file = None
+        self._published_version = None
+        self._published_at = 0.0
+        self._build_failed_at = None  # Set while the initial build has not completed; nothing is published
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"publishes": 0, "attaches": 0, "forwarded": 0, "applied": 0, "last_error": None}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # ---- roles ----
+
+    def start(self, build: Optional[Callable[[Any], None]] = None) -> str:
+        """Join the directory as builder or reader and start the background loop"""
+        os.makedirs(self.directory, exist_ok=True)
+        self._build = build
+        if self._try_lock():
+            self._become_builder()
+        else:
+            self._become_reader()
+        self._thread = threading.Thread(target=self._run, name="shared-memory-graph", daemon=True)
+        self._thread.start()
+        return self.role
+
+    def _try_lock(self) -> bool:
+        lock_file = open(self._path(LOCK_FILE), "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _become_builder(self):
+        self.role = "builder"
+        self.graph.forward_changes = None
+        current = self.current()
+        if current:
+            # Writable load of the newest generation plus the builder's own change log
+            stats = self.graph.load_snapshot(self._path(current))
+            print(f" Shared memory graph: builder resumed generation {stats['generation']} "
+                  f"({stats['replayed']} logged changes replayed)")
+            if not stats["replayed"]:
+                self.attached = current
+                self._published_version = self.graph.store.version
+        elif self._build is not None and not self._try_build():
+            return
+        self._drain_changes()
+        if self.graph.store.version != self._published_version:
+            self.publish()
+
+    def _try_build(self) -> bool:
+        """Run the build callback; a build that returns False is retried instead of published"""
+        if self._build(self.graph) is False:
+            self._build_failed_at = time.time()
+            print(" Shared memory graph: build did not complete, retrying before the first publish")
+            return False
+        self._build_failed_at = None
+        return True
+
+    def _become_reader(self):
+        self.role = "reader"
+        self.graph.forward_changes = self.forward
+        self._attach_current()
+
+    # ---- builder ----
+
+    def publish(self) -> Optional[str]:
+        """Write the builder's graph as the next generation and point CURRENT at it
+
+        Runs under the graph's write lock, so request threads writing to the
+        builder wait instead of racing the snapshot, and the version recorded
+        as published is the one the snapshot holds.
+        """
+        with self.graph._write_lock:
+            name = f"memory_graph.{self.graph.generation + 1:06d}.snapshot"
+            self.graph.save_snapshot(self._path(name))
+            temp_path = self._path(f"{CURRENT_FILE}.tmp")
+            with open(temp_path, "w") as f:
+                f.write(name)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self._path(CURRENT_FILE))
+            self.attached = name
+            self._published_version = self.graph.store.version
+        self._published_at = time.time()
+        self.stats["publishes"] += 1
+        self._remove_old_generations()
+        return name
+
+    def _remove_old_generations(self):
+        """Unlink generations past keep_generations. Readers still mapping them keep their pages"""
+        generations = sorted(
+            int(match.group(1)) for match in map(SNAPSHOT_PATTERN.match, os.listdir(self.directory)) if match
+        )
+        for generation in generations[:-self.keep_generations]:
+            for suffix in ("", ".log"):
+                try:
+                    os.remove(self._path(f"memory_graph.{generation:06d}.snapshot{suffix}"))
+                except FileNotFoundError:
+                    pass
+
+    def _drain_changes(self) -> int:
+        """Apply the writes readers forwarded since the last drain"""
+        path = self._path(CHANGES_FILE)
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            lines = f.read().splitlines()
+            f.seek(0)
+            f.truncate()
+        applied = 0
+        # One batch under the write lock, so a publish or local write never sees it half applied
+        with self.graph._write_lock:
+            for line in lines:
+                try:
+                    self.graph._apply_logged(json.loads(line), record=True)
+                    applied += 1
+                except ValueError:
+                    continue
+                except Exception as e:
+                    print(f" Error applying forwarded memory graph change: {str(e)}")
+        self.stats["applied"] += applied
+        return applied
+
+    # ---- reader ----
+
+    def current(self) -> Optional[str]:
+        """Snapshot file name CURRENT points at"""
+        try:
+            with open(self._path(CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _attach_current(self) -> bool:
+        current = self.current()
+        if not current or current == self.attached:
+            return False
+        try:
+            self.graph.load_snapshot(self._path(current), readonly=True)
+        except FileNotFoundError:
+            return False  # Replaced again between reading CURRENT and opening it
+        self.attached = current
+        self.stats["attaches"] += 1
+        return True
+
+    def forward(self, op: str, args: List[Any], ts: float):
+        """Queue a write for the builder (MemoryGraph.forward_changes hook)"""
+        line = json.dumps({"op": op, "args": args, "ts": ts}, default=str, separators=(",", ":"))
+        with open(self._path(CHANGES_FILE), "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.write(line.encode("utf-8") + b"\n")
+        self.stats["forwarded"] += 1
+
+    # ---- background loop ----
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if self.role == "builder":
+                    if self._build_failed_at is not None:
+                        if time.time() - self._build_failed_at < self.publish_interval or not self._try_build():
+                            continue
+                    self._drain_changes()
+                    changed = self.graph.store.version != self._published_version
+                    if changed and time.time() - self._published_at >= self.publish_interval:
+                        self.publish()
+                else:
+                    self._attach_current()
+                    if self._try_lock():
+                        print(" Shared memory graph: builder exited, promoting this worker")
+                        self._become_builder()
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                print(f" Error in shared memory graph loop: {str(e)}")
+
+    def status(self) -> Dict[str, Any]:
+        return {"role": self.role, "directory": self.directory, "generation": self.graph.generation,
+                "snapshot": self.attached, "pid": os.getpid(), **self.stats}
+
+    def close(self):
+        """Stop the loop; a builder publishes pending changes and releases the lock"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 5)
+        if self.role == "builder":
+            try:
+                # An unfinished build is never published; readers' forwarded changes stay in changes.log
+                if self._build_failed_at is None:
+                    self._drain_changes()
+                    if self.graph.store.version != self._published_version:
+                        self.publish()
+            except Exception as e:
+                print(f" Error publishing memory graph on shutdown: {str(e)}")
+            self.graph.close()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
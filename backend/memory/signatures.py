@@ -0,0 +1,154 @@
+import threading
+from typing import Dict, List, Iterable, Optional, Tuple
+
+import numpy as np
+
+# Touching more nodes than this at once just re-derives every signature on the next lookup
+BULK_TOUCH_LIMIT = 50_000
+
+
+class NeighborSignatureIndex:
+    """Connection signatures behind MemoryGraph.find_similar_startups
+
+    A startup's signature is the set of (neighbor type, relationship) pairs
+    among its direct relations, stored as an int bitset. The index watches
+    the GraphStore: edge and entity-type changes mark their endpoints dirty
+    and only dirty startups are re-derived on the next lookup, at O(degree)
+    each. Startups with equal signatures are grouped, and similarity is
+    ranked once per distinct signature. That ranking stays cached until a
+    signature group appears or disappears, so a lookup walks k results
+    instead of every startup's edges.
+
+    Maintenance and lookups share one lock, so request threads and store
+    writers never see the groups mid-update.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._bits: Dict[Tuple[str, int], int] = {}  # (neighbor type, relation code) -> bit
+        self._signature: Dict[int, int] = {}  # startup node -> bitset
+        self._groups: Dict[int, Dict[int, None]] = {}  # bitset -> startup nodes, insertion ordered
+        self._rankings: Dict[Tuple[int, float], List[Tuple[float, int, int]]] = {}
+        self._dirty = set()
+        self._all_dirty = True
+        self._lock = threading.Lock()
+        store.watchers.append(self)
+
+    # ---- maintenance ----
+
+    def touch(self, nodes: Iterable[int]):
+        """Store callback: these nodes' edges or entity types changed"""
+        if isinstance(nodes, np.ndarray):
+            if len(nodes) > BULK_TOUCH_LIMIT:
+                with self._lock:
+                    self._all_dirty = True
+                    self._dirty.clear()
+                return
+            nodes = nodes.tolist()
+        with self._lock:
+            if not self._all_dirty:
+                self._dirty.update(nodes)
+
+    def _bit(self, entity_type: str, code: int) -> int:
+        bit = self._bits.get((entity_type, code))
+        if bit is None:
+            bit = self._bits[(entity_type, code)] = len(self._bits)
+        return bit
+
+    def signature_of(self, node: int) -> int:
+        """Signature derived from the node's current edges"""
+        store = self.store
+        signature = 0
+        for edges, endpoints in ((store.out_edges(node), store.dst), (store.in_edges(node), store.src)):
+            for edge in edges:
+                record = store.records[endpoints[edge]]
+                if record is not None:
+                    signature |= 1 << self._bit(record.type, store.rel[edge])
+        return signature
+
+    def _place(self, node: int, signature: Optional[int]):
+        """Move a startup to its new signature group (None removes it)"""
+        previous = self._signature.pop(node, None)
+        if previous is not None:
+            group = self._groups[previous]
+            del group[node]
+            if not group:
+                del self._groups[previous]
+                self._rankings.clear()
+        if signature is not None:
+            self._signature[node] = signature
+            if signature not in self._groups:
+                self._groups[signature] = {}
+                self._rankings.clear()
+            self._groups[signature][node] = None
+
+    def refresh(self):
+        """Re-derive signatures of startups touched since the last lookup"""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        """Caller holds the lock"""
+        store = self.store
+        startups = store.type_members.get("startup", ())
+        if self._all_dirty:
+            self._signature.clear()
+            self._groups.clear()
+            self._rankings.clear()
+            for node in sorted(startups):
+                self._place(node, self.signature_of(node))
+            self._all_dirty = False
+            self._dirty.clear()
+            return
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        for node in sorted(dirty):
+            if node in startups:
+                signature = self.signature_of(node)
+                if self._signature.get(node) != signature:
+                    self._place(node, signature)
+            elif node in self._signature:
+                self._place(node, None)
+
+    # ---- lookups ----
+
+    def _ranking(self, signature: int, threshold: float) -> List[Tuple[float, int, int]]:
+        """(score, common, group signature) for every group at or above threshold, best first. Caller holds the lock"""
+        key = (signature, threshold)
+        ranking = self._rankings.get(key)
+        if ranking is None:
+            ranking = []
+            for other in self._groups:
+                union = (signature | other).bit_count()
+                if union:
+                    common = (signature & other).bit_count()
+                    score = common / union
+                    if score >= threshold:
+                        ranking.append((score, common, other))
+            ranking.sort(key=lambda item: item[0], reverse=True)
+            self._rankings[key] = ranking
+        return ranking
+
+    def similar(self, node: int, threshold: float, limit: Optional[int] = None
+                ) -> List[Tuple[int, float, int]]:
+        """(startup node, Jaccard score, common pairs) best first, ties in group order"""
+        found = []
+        with self._lock:
+            self._refresh()
+            signature = self._signature.get(node)
+            if signature is None:
+                signature = self.signature_of(node)  # Not a startup: derive on the fly
+            for score, common, other in self._ranking(signature, threshold):
+                for member in self._groups.get(other, ()):
+                    if member == node:
+                        continue
+                    found.append((member, score, common))
+                    if limit is not None and len(found) >= limit:
+                        return found
+        return found
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"startups": len(self._signature), "signatures": len(self._groups),
+                    "pairs": len(self._bits), "cached_rankings": len(self._rankings), "dirty": len(self._dirty)}
@@ -0,0 +1,216 @@
+from typing import Dict, List, Any, Iterator, Tuple
+
+import numpy as np
+
+SIMILARITY_THRESHOLD = 0.3
+CATEGORY_COLUMNS = ("industry_sector", "stage", "funding_stage", "location_city")
+INDUSTRY, STAGE, FUNDING, CITY = range(4)
+REVENUE = 4  # Pseudo-column: equal, positive monthly_revenue
+
+# Attribute combinations a pair must share to score above the threshold.
+# Without a shared industry (0.4) a pair needs stage or funding stage (0.2)
+# plus one more factor: 0.2 + 0.1 already rounds to 0.30000000000000004,
+# and the revenue factor only reaches 0.1 when both revenues are equal.
+# city + revenue alone tops out at 0.2.
+CANDIDATE_BLOCKS = (
+    (INDUSTRY,),
+    (STAGE, FUNDING),
+    (STAGE, CITY),
+    (FUNDING, CITY),
+    (STAGE, REVENUE),
+    (FUNDING, REVENUE),
+)
+
+
+class StartupSimilarityEngine:
+    """Columnar, blocked version of MemoryGraph._calculate_startup_similarity
+
+    Startup attributes are encoded once into integer code columns (plus a
+    float revenue column) indexed by graph node. Candidate pairs are only
+    generated inside CANDIDATE_BLOCKS, each pair once, and scored with NumPy
+    using the same factor order as the scalar version, so scores are
+    bit-for-bit identical.
+    """
+
+    CHUNK_PAIRS = 2_000_000
+
+    def __init__(self):
+        self._vocab = [{} for _ in CATEGORY_COLUMNS]  # value -> code, None included
+        self._codes = np.zeros((len(CATEGORY_COLUMNS), 0), dtype=np.int32)
+        self._revenue = np.zeros(0, dtype=np.float64)
+
+    def _code(self, column: int, value) -> int:
+        vocab = self._vocab[column]
+        try:
+            key = value
+            code = vocab.get(key)
+        except TypeError:
+            # Unhashable values (lists, dicts) compare by content
+            key = ("__unhashable__", repr(value))
+            code = vocab.get(key)
+        if code is None:
+            code = len(vocab)
+            vocab[key] = code
+        return code
+
+    @staticmethod
+    def _revenue_value(properties: Dict[str, Any]) -> float:
+        try:
+            return float(properties.get("monthly_revenue", 0) or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _reserve(self, size: int):
+        if size <= len(self._revenue):
+            return
+        capacity = max(size, 2 * len(self._revenue), 64)
+        codes = np.zeros((len(CATEGORY_COLUMNS), capacity), dtype=np.int32)
+        codes[:, :self._codes.shape[1]] = self._codes
+        revenue = np.zeros(capacity, dtype=np.float64)
+        revenue[:len(self._revenue)] = self._revenue
+        self._codes, self._revenue = codes, revenue
+
+    def set(self, node: int, properties: Dict[str, Any]):
+        """Encode (or re-encode) one startup's attributes"""
+        self._reserve(node + 1)
+        for column, name in enumerate(CATEGORY_COLUMNS):
+            self._codes[column, node] = self._code(column, properties.get(name))
+        self._revenue[node] = self._revenue_value(properties)
+
+    def load(self, nodes: List[int], properties: List[Dict[str, Any]]):
+        """Encode many startups at once"""
+        if nodes:
+            self._reserve(max(nodes) + 1)
+        for node, props in zip(nodes, properties):
+            self.set(node, props)
+
+    # ---- scoring ----
+
+    def score(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Similarity for node pairs, same factors and summation order as the scalar version"""
+        codes, revenue = self._codes, self._revenue
+        scores = np.where(codes[INDUSTRY, left] == codes[INDUSTRY, right], 0.4, 0.0)
+        scores += np.where(codes[STAGE, left] == codes[STAGE, right], 0.2, 0.0)
+        scores += np.where(codes[FUNDING, left] == codes[FUNDING, right], 0.2, 0.0)
+        scores += np.where(codes[CITY, left] == codes[CITY, right], 0.1, 0.0)
+
+        revenue_left, revenue_right = revenue[left], revenue[right]
+        both = (revenue_left > 0) & (revenue_right > 0)
+        high = np.maximum(revenue_left, revenue_right)
+        ratio = np.divide(np.minimum(revenue_left, revenue_right), high, out=np.zeros_like(high), where=both)
+        scores += np.where(both, 0.1 * ratio, 0.0)
+        return scores
+
+    def score_against(self, node: int, others: np.ndarray) -> np.ndarray:
+        """Similarity of one node against many"""
+        return self.score(np.full(len(others), node, dtype=np.int64), others)
+
+    def similar_to(self, node: int, others: np.ndarray, threshold: float = SIMILARITY_THRESHOLD
+                   ) -> Tuple[np.ndarray, np.ndarray]:
+        """(other_nodes, scores) above threshold for one node, scoring only its candidate block"""
+        others = np.asarray(others, dtype=np.int64)
+        anchor = np.full(len(others), node, dtype=np.int64)
+        candidate = np.zeros(len(others), dtype=bool)
+        for block in CANDIDATE_BLOCKS:
+            candidate |= self._in_block(block, anchor, others)
+        others = others[candidate]
+        scores = self.score(anchor[:len(others)], others)
+        keep = scores > threshold
+        return others[keep], scores[keep]
+
+    # ---- blocking ----
+
+    def _block_keys(self, nodes: np.ndarray, block: Tuple[int, ...]) -> Tuple[np.ndarray, np.ndarray]:
+        """Group key per position for a block, and which positions take part in it"""
+        key = np.zeros(len(nodes), dtype=np.int64)
+        member = np.ones(len(nodes), dtype=bool)
+        for column in block:
+            if column == REVENUE:
+                values = self._revenue[nodes]
+                member &= values > 0
+                _, part = np.unique(values, return_inverse=True)
+                cardinality = len(values) + 1
+            else:
+                part = self._codes[column, nodes]
+                cardinality = len(self._vocab[column]) + 1
+            key = key * cardinality + part
+        return key, member
+
+    def _in_block(self, block: Tuple[int, ...], left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Whether node pairs share every attribute of a block"""
+        shared = np.ones(len(left), dtype=bool)
+        for column in block:
+            if column == REVENUE:
+                shared &= (self._revenue[left] == self._revenue[right]) & (self._revenue[left] > 0)
+            else:
+                shared &= self._codes[column, left] == self._codes[column, right]
+        return shared
+
+    def _block_pairs(self, key: np.ndarray, positions: np.ndarray) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """All (earlier, later) position pairs that share a key, in bounded chunks
+
+        The stable sort keeps positions ascending inside each group, so the
+        left side of every pair is the earlier position.
+        """
+        order = np.argsort(key, kind='stable')
+        sorted_keys = key[order]
+        sorted_positions = positions[order]
+        n = len(order)
+        if n < 2:
+            return
+
+        # End (exclusive) of each element's group in sorted order
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        group_ends = np.repeat(np.r_[starts[1:], n], np.diff(np.r_[starts, n]))
+        counts = group_ends - np.arange(n) - 1
+
+        row = 0
+        while row < n:
+            # Take rows until the chunk holds about CHUNK_PAIRS pairs
+            cumulative = np.cumsum(counts[row:])
+            stop = row + max(1, int(np.searchsorted(cumulative, self.CHUNK_PAIRS, side='right')))
+            chunk_counts = counts[row:stop]
+            total = int(chunk_counts.sum())
+            if total:
+                rows = np.arange(row, stop)
+                left = np.repeat(rows, chunk_counts)
+                offsets = np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+                right = left + 1 + (np.arange(total) - offsets)
+                yield sorted_positions[left], sorted_positions[right]
+            row = stop
+
+    def iter_similar_pairs(self, nodes: List[int], threshold: float = SIMILARITY_THRESHOLD
+                           ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Yield (left_position, right_position, score) chunks for pairs scoring above threshold
+
+        Positions index into nodes and left < right. Each pair is produced by
+        the first block it belongs to only.
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        for index, block in enumerate(CANDIDATE_BLOCKS):
+            key, member = self._block_keys(nodes, block)
+            positions = np.flatnonzero(member)
+            for left_pos, right_pos in self._block_pairs(key[positions], positions):
+                left, right = nodes[left_pos], nodes[right_pos]
+                fresh = np.ones(len(left), dtype=bool)
+                for earlier in CANDIDATE_BLOCKS[:index]:
+                    fresh &= ~self._in_block(earlier, left, right)
+                if not fresh.all():
+                    left_pos, right_pos, left, right = left_pos[fresh], right_pos[fresh], left[fresh], right[fresh]
+                scores = self.score(left, right)
+                keep = scores > threshold
+                yield left_pos[keep], right_pos[keep], scores[keep]
+
+    def similar_pairs(self, nodes: List[int], threshold: float = SIMILARITY_THRESHOLD
+                      ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """All (left_node, right_node, score) above threshold, ordered like the nested loop over nodes"""
+        chunks = list(self.iter_similar_pairs(nodes, threshold))
+        if not chunks:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=np.float64)
+        left_pos = np.concatenate([c[0] for c in chunks])
+        right_pos = np.concatenate([c[1] for c in chunks])
+        scores = np.concatenate([c[2] for c in chunks])
+        order = np.lexsort((right_pos, left_pos))
+        nodes = np.asarray(nodes, dtype=np.int64)
+        return nodes[left_pos[order]], nodes[right_pos[order]], scores[order]
@@ -0,0 +1,327 @@
+import json
+import mmap
+import os
+import threading
+import time
+from array import array
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+from memory.graph_store import GraphStore, EdgeIndex, EntityRecord, RecordTable
+from memory.similarity import StartupSimilarityEngine
+
+SNAPSHOT_MAGIC = b"MGRAPH01"
+SNAPSHOT_FORMAT = 2
+READABLE_FORMATS = (1, 2)  # Format 1 has no edge key index; it is rebuilt on load
+ALIGNMENT = 64
+
+# Edge columns: (attribute, array typecode, numpy dtype)
+EDGE_COLUMNS = (
+    ("src", 'i', np.int32),
+    ("dst", 'i', np.int32),
+    ("rel", 'H', np.uint16),
+    ("weight", 'd', np.float64),
+    ("created", 'd', np.float64),
+    ("weight_key", 'h', np.int16),
+)
+
+
+def _encode_json(value) -> bytes:
+    return json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _blob(chunks: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate byte strings into (offsets, data) arrays"""
+    offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+    np.cumsum([len(chunk) for chunk in chunks], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(chunks), dtype=np.uint8)
+
+
+class SnapshotRecords:
+    """Decodes entity records from snapshot sections on first access"""
+
+    def __init__(self, sections: Dict[str, np.ndarray], type_names: List[str]):
+        self._types = sections["node_type"]
+        self._created = sections["node_created"]
+        self._updated = sections["node_updated"]
+        self._offsets = sections["prop_offsets"]
+        self._data = sections["prop_data"]
+        self._type_names = type_names
+
+    def record(self, node: int):
+        code = int(self._types[node])
+        if code < 0:
+            return None
+        start, end = int(self._offsets[node]), int(self._offsets[node + 1])
+        record = EntityRecord(self._type_names[code], json.loads(self._data[start:end].tobytes()),
+                              float(self._created[node]))
+        record.updated = float(self._updated[node])
+        return record
+
+
+def _live_edges(store: GraphStore) -> Dict[str, np.ndarray]:
+    """Copies of the edge columns and adjacency without tombstones, edge ids renumbered densely
+
+    The store itself keeps its edge ids (readers may hold them), so
+    tombstones are only dropped from what goes into the file.
+    """
+    store.compact()
+    index = store.index
+    alive = np.frombuffer(bytes(store.alive), dtype=np.uint8).astype(bool)
+    renumber = (np.cumsum(alive) - 1).astype(np.int32)
+    sections = {
+        "out_offsets": np.array(index.out_offsets, dtype=np.int64),
+        "out_edges": renumber[index.out_edges],
+        "in_offsets": np.array(index.in_offsets, dtype=np.int64),
+        "in_edges": renumber[index.in_edges],
+        "edge_keys": np.array(index.key_sorted, dtype=np.uint64),
+        "edge_key_ids": renumber[index.key_edges],
+        "edge_props": np.frombuffer(_encode_json({str(renumber[edge]): props for edge, props in store.props.items()}),
+                                    dtype=np.uint8),
+    }
+    for name, _, dtype in EDGE_COLUMNS:
+        column = getattr(store, name)
+        sections[name] = np.frombuffer(column, dtype=dtype)[alive] if len(column) else np.zeros(0, dtype=dtype)
+    return sections
+
+
+def write_snapshot(store: GraphStore, similarity: StartupSimilarityEngine, path: str, generation: int) -> int:
+    """Write the graph to a versioned binary snapshot, atomically replacing path. Returns bytes written
+
+    Everything is copied out of the store under its write lock, so writers
+    neither tear the snapshot nor run into arrays it is still reading; only
+    the file write happens after the lock is released.
+    """
+    with store._write_lock:
+        edges = _live_edges(store)
+        n = len(store.ids)
+        type_names = sorted({record.type for record in store.records if record is not None})
+        type_codes = {name: code for code, name in enumerate(type_names)}
+        node_type = np.full(n, -1, dtype=np.int16)
+        node_created = np.zeros(n, dtype=np.float64)
+        node_updated = np.zeros(n, dtype=np.float64)
+        properties = []
+        for node, record in enumerate(store.records):
+            if record is None:
+                properties.append(b"")
+                continue
+            node_type[node] = type_codes[record.type]
+            node_created[node] = record.created
+            node_updated[node] = record.updated
+            properties.append(_encode_json(record.properties))
+        prop_offsets, prop_data = _blob(properties)
+
+        similarity_codes = similarity._codes[:, :n] if similarity._codes.shape[1] >= n else \
+            np.pad(similarity._codes, ((0, 0), (0, n - similarity._codes.shape[1])))
+        similarity_revenue = np.zeros(n, dtype=np.float64)
+        similarity_revenue[:min(n, len(similarity._revenue))] = similarity._revenue[:n]
+
+        sections = {
+            "node_type": node_type,
+            "node_created": node_created,
+            "node_updated": node_updated,
+            "prop_offsets": prop_offsets,
+            "prop_data": prop_data,
+            "out_offsets": edges.pop("out_offsets"),
+            "out_edges": edges.pop("out_edges"),
+            "in_offsets": edges.pop("in_offsets"),
+            "in_edges": edges.pop("in_edges"),
+            "edge_keys": edges.pop("edge_keys"),
+            "edge_key_ids": edges.pop("edge_key_ids"),
+            "similarity_codes": np.array(similarity_codes, dtype=np.int32),
+            "similarity_revenue": similarity_revenue,
+            "ids": np.frombuffer(_encode_json(store.ids), dtype=np.uint8),
+            **edges,
+        }
+
+        # Lay sections out at aligned offsets after the header
+        layout, offset = {}, 0
+        for name, values in sections.items():
+            layout[name] = [offset, values.dtype.str, list(values.shape)]
+            offset += -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+
+        header = _encode_json({
+            "format": SNAPSHOT_FORMAT,
+            "generation": generation,
+            "created": time.time(),
+            "nodes": n,
+            "edges": len(sections["src"]),
+            "type_names": type_names,
+            "rel_names": store.rel_names,
+            "prop_keys": store.prop_keys,
+            "similarity_vocab": [list(vocab) for vocab in similarity._vocab],
+            "sections": layout,
+        })
+    data_start = -(-(len(SNAPSHOT_MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for name, values in sections.items():
+            f.seek(data_start + layout[name][0])
+            f.write(values.tobytes())
+        f.truncate(data_start + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return data_start + offset
+
+
+def read_snapshot(path: str) -> Tuple[Dict[str, Any], Dict[str, np.ndarray], mmap.mmap]:
+    """Memory-map a snapshot and return (header, section arrays, mmap). Arrays are zero-copy and read-only"""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a memory graph snapshot")
+    header_length = int.from_bytes(mapped[len(SNAPSHOT_MAGIC):len(SNAPSHOT_MAGIC) + 8], "little")
+    header_start = len(SNAPSHOT_MAGIC) + 8
+    header = json.loads(mapped[header_start:header_start + header_length])
+    if header.get("format") not in READABLE_FORMATS:
+        raise ValueError(f"Unsupported memory graph snapshot format {header.get('format')}")
+    data_start = -(-(header_start + header_length) // ALIGNMENT) * ALIGNMENT
+
+    sections = {}
+    for name, (offset, dtype, shape) in header["sections"].items():
+        count = int(np.prod(shape)) if shape else 1
+        sections[name] = np.frombuffer(mapped, dtype=np.dtype(dtype), count=count,
+                                       offset=data_start + offset).reshape(shape)
+    return header, sections, mapped
+
+
+def load_store(path: str, readonly: bool = False) -> Tuple[GraphStore, StartupSimilarityEngine, int]:
+    """Rebuild a GraphStore and similarity engine from a snapshot
+
+    Adjacency arrays stay memory-mapped. Entity properties are decoded lazily
+    on first access. With readonly=False the edge columns are copied into
+    appendable arrays (a memcpy); with readonly=True they stay as zero-copy
+    views of the mapping and the store rejects writes.
+    """
+    header, sections, mapped = read_snapshot(path)
+    store = GraphStore()
+    store._mapping = mapped  # Keep the mapping alive as long as the store
+
+    store.ids = json.loads(sections["ids"].tobytes())
+    store.node_of = {entity_id: node for node, entity_id in enumerate(store.ids)}
+    node_type = sections["node_type"]
+    store.records = RecordTable(len(store.ids), SnapshotRecords(sections, header["type_names"]))
+    for code, name in enumerate(header["type_names"]):
+        store.type_members[name] = set(np.flatnonzero(node_type == code).tolist())
+    store.entity_count = int(np.count_nonzero(node_type >= 0))
+
+    store.rel_names = header["rel_names"]
+    store.rel_codes = {name: code for code, name in enumerate(store.rel_names)}
+    store.prop_keys = header["prop_keys"]
+    store.prop_key_codes = {name: code for code, name in enumerate(store.prop_keys)}
+    store.props = {int(edge): props for edge, props in json.loads(sections["edge_props"].tobytes()).items()}
+
+    for name, typecode, _ in EDGE_COLUMNS:
+        column = sections[name]
+        if readonly:
+            setattr(store, name, memoryview(column).cast('B').cast(typecode) if len(column) else array(typecode))
+        else:
+            setattr(store, name, array(typecode, column.tobytes()))
+    edge_total = len(sections["src"])
+    store.alive = bytearray(b"\x01" * edge_total)
+    if "edge_keys" in sections:
+        store.index = EdgeIndex(sections["out_offsets"], sections["out_edges"], sections["in_offsets"],
+                                sections["in_edges"], sections["edge_keys"], sections["edge_key_ids"], edge_total)
+    else:
+        store.index = EdgeIndex(sections["out_offsets"], sections["out_edges"], sections["in_offsets"],
+                                sections["in_edges"], indexed_edges=edge_total)
+        if not readonly:
+            store.compact()
+    store.readonly = readonly
+
+    similarity = StartupSimilarityEngine()
+    for column, values in enumerate(header["similarity_vocab"]):
+        similarity._vocab[column] = {
+            (tuple(value) if isinstance(value, list) else value): code for code, value in enumerate(values)
+        }
+    codes, revenue = sections["similarity_codes"], sections["similarity_revenue"]
+    similarity._codes = codes if readonly else codes.copy()
+    similarity._revenue = revenue if readonly else revenue.copy()
+    return store, similarity, header["generation"]
+
+
+class GraphChangeLog:
+    """Append-only JSON-lines log of MemoryGraph mutations since the last snapshot
+
+    The first line names the snapshot generation the log applies to. A log
+    for an older generation is ignored on load, which covers a crash between
+    writing a new snapshot and resetting the log.
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+        self.entries = 0
+        self.created = time.time()  # When the log's snapshot generation started
+
+    def age(self) -> float:
+        return time.time() - self.created
+
+    def read(self, generation: int) -> List[Dict[str, Any]]:
+        """Logged operations for a snapshot generation, skipping a torn last line"""
+        if not os.path.exists(self.path):
+            return []
+        operations = []
+        with open(self.path, "rb") as f:
+            lines = f.read().splitlines()
+        if not lines:
+            return []
+        try:
+            if json.loads(lines[0]).get("generation") != generation:
+                return []
+        except ValueError:
+            return []
+        for line in lines[1:]:
+            try:
+                operations.append(json.loads(line))
+            except ValueError:
+                break
+        return operations
+
+    def open(self, generation: int, reset: bool = False):
+        """Start appending. reset=True starts a fresh log for a new snapshot generation"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            if reset or not os.path.exists(self.path):
+                self.created = time.time()
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(_encode_json({"generation": generation, "created": self.created}) + b"\n")
+                os.replace(temp_path, self.path)
+                self.entries = 0
+            else:
+                # Reopened after a restart: pick up the existing log's size and age for checkpointing
+                with open(self.path, "rb") as f:
+                    lines = f.read().splitlines()
+                try:
+                    self.created = json.loads(lines[0]).get("created") or self.created
+                except (ValueError, IndexError):
+                    pass
+                self.entries = max(len(lines) - 1, 0)
+            self._file = open(self.path, "ab")
+
+    def append(self, op: str, args: List[Any], ts: float = None):
+        line = _encode_json({"op": op, "args": args, "ts": ts or time.time()}) + b"\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.entries += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
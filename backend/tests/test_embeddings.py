@@ -0,0 +1,80 @@
+import numpy as np
+from agno.vectordb.search import SearchType
+
+from database.embeddings import HashingEmbedder, NumpyVectorIndex, StartupEmbeddingPipeline
+
+PROFILES = [
+    {
+        'startup_id': 'cold-chain',
+        'company_name': 'FrostRoute',
+        'problem_statement': 'Pharma shipments spoil when the cold chain breaks in transit',
+        'solution_description': 'Cold chain logistics with sensor tracked refrigerated trucks for pharma',
+        'target_market': 'Pharmaceutical distributors'
+    },
+    {
+        'startup_id': 'payroll',
+        'company_name': 'PayDay',
+        'problem_statement': 'Small businesses lose hours running payroll by hand',
+        'solution_description': 'Automated payroll and tax filing software',
+        'target_market': 'Small businesses'
+    },
+    {
+        'startup_id': 'tutoring',
+        'company_name': 'MathMate',
+        'problem_statement': 'Students fall behind in maths without one to one help',
+        'solution_description': 'An adaptive tutoring app for secondary school maths',
+        'target_market': 'Secondary schools and parents'
+    }
+]
+
+
+def make_pipeline():
+    embedder = HashingEmbedder(256)
+    return StartupEmbeddingPipeline(embedder, NumpyVectorIndex(embedder.dimensions))
+
+
+def test_hashing_embedder_is_normalized_and_deterministic():
+    embedder = HashingEmbedder(256)
+    vectors = embedder.embed(['cold chain logistics', 'payroll software', ''])
+
+    assert vectors.shape == (3, 256)
+    assert vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors[:2], axis=1), 1.0)
+    assert not vectors[2].any()
+    assert np.array_equal(vectors, embedder.embed(['cold chain logistics', 'payroll software', '']))
+
+
+def test_embed_startups_upserts_once_per_changed_field():
+    pipeline = make_pipeline()
+
+    assert pipeline.embed_startups(PROFILES) == {"embedded": 9, "skipped": 0}
+    assert len(pipeline.index) == 9
+    assert pipeline.embed_startups(PROFILES) == {"embedded": 0, "skipped": 9}
+
+    changed = {**PROFILES[1], 'target_market': 'Accounting firms'}
+    assert pipeline.embed_startups([changed]) == {"embedded": 1, "skipped": 2}
+    assert len(pipeline.index) == 9
+
+
+def test_search_ranks_the_matching_startup_first():
+    pipeline = make_pipeline()
+    pipeline.embed_startups(PROFILES)
+
+    for search_type in (SearchType.vector, SearchType.keyword, SearchType.hybrid):
+        results = pipeline.search('cold chain logistics for pharma', limit=3, search_type=search_type)
+        assert results[0]['startup_id'] == 'cold-chain'
+        assert results[0]['company_name'] == 'FrostRoute'
+
+    results = pipeline.search('payroll software', limit=3, search_type=SearchType.vector)
+    assert results[0]['startup_id'] == 'payroll'
+    assert results[0]['similarity'] > results[-1]['similarity']
+
+
+def test_removed_startup_is_not_returned():
+    pipeline = make_pipeline()
+    pipeline.embed_startups(PROFILES)
+    pipeline.index.remove_startup('cold-chain')
+
+    results = pipeline.search('cold chain logistics for pharma', limit=3)
+    assert 'cold-chain' not in [r['startup_id'] for r in results]
+    assert len(pipeline.index) == 6
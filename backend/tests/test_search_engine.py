@@ -0,0 +1,77 @@
+import pytest
+
+from database.search_engine import SQLiteStartupSearch, decode_cursor
+
+STARTUPS = [
+    {
+        'startup_id': 's1',
+        'company_name': 'Solar Grid',
+        'industry_sector': 'Energy',
+        'problem_statement': 'Rural villages lack reliable power',
+        'solution_description': 'Community microgrids',
+        'stage': 'seed'
+    },
+    {
+        'startup_id': 's2',
+        'company_name': 'FarmSense',
+        'industry_sector': 'Agriculture',
+        'problem_statement': 'Farmers overwater their crops',
+        'solution_description': 'Soil sensors powered by solar panels'
+    },
+    {
+        'startup_id': 's3',
+        'company_name': 'LedgerLite',
+        'industry_sector': 'Fintech',
+        'problem_statement': 'Freelancers struggle with invoicing',
+        'solution_description': 'Invoicing and bookkeeping app'
+    }
+]
+
+
+@pytest.fixture
+def engine():
+    engine = SQLiteStartupSearch()
+    engine.index_startups(STARTUPS)
+    return engine
+
+
+def ids(page):
+    return [row['startup_id'] for row in page['results']]
+
+
+def test_matches_stemmed_terms_and_requires_all_of_them(engine):
+    assert ids(engine.search('invoices')) == ['s3']
+    assert ids(engine.search('solar sensors')) == ['s2']
+    assert ids(engine.search('solar blockchain')) == []
+    assert engine.search('  !! ') == {"results": [], "next_cursor": None}
+
+
+def test_name_matches_outrank_solution_matches(engine):
+    page = engine.search('solar')
+
+    assert ids(page) == ['s1', 's2']
+    assert page['results'][0]['rank'] > page['results'][1]['rank']
+    assert page['results'][0]['stage'] == 'seed'
+    assert '<mark>' in page['results'][1]['snippet']
+
+
+def test_keyset_cursor_pages_through_every_result(engine):
+    first = engine.search('solar', limit=1)
+    assert ids(first) == ['s1']
+    assert decode_cursor(first['next_cursor'])[1] == 's1'
+
+    second = engine.search('solar', limit=1, cursor=first['next_cursor'])
+    assert ids(second) == ['s2']
+    assert ids(engine.search('solar', limit=1, cursor=second['next_cursor'])) == []
+
+    with pytest.raises(ValueError):
+        engine.search('solar', cursor='not-a-cursor')
+
+
+def test_reindex_replaces_and_remove_drops_rows(engine):
+    engine.index_startups([{**STARTUPS[2], 'company_name': 'Solar Books'}])
+    assert sorted(ids(engine.search('solar'))) == ['s1', 's2', 's3']
+    assert ids(engine.search('ledgerlite')) == []
+
+    engine.remove_startup('s1')
+    assert 's1' not in ids(engine.search('solar'))